@@ -1,10 +1,31 @@
 # Simulação muito simples de Context Engineering em Python
+import os
+from armazenamento import abrir_armazenamento
+from indice_aho_corasick import IndiceAhoCorasick
+from roteador_ferramentas import RoteadorFerramentas
 
 # Memória de longo prazo simulada (ex.: bancos de dados, documentos, histórico)
-long_term_memory = {
-    "openai": "OpenAI é uma empresa de pesquisa em inteligência artificial.",
-    "python": "Python é uma linguagem de programação de alto nível."
-}
+# Dict em memória por padrão; defina MEMORIA_LONGO_PRAZO_DB para persistir em SQLite
+long_term_memory = abrir_armazenamento(os.getenv("MEMORIA_LONGO_PRAZO_DB"))
+if not long_term_memory:
+    long_term_memory.update({
+        "openai": "OpenAI é uma empresa de pesquisa em inteligência artificial.",
+        "python": "Python é uma linguagem de programação de alto nível."
+    })
+
+# Índice de palavras-chave da memória de longo prazo (uma passada por consulta),
+# construído na primeira busca
+indice_rag = None
+
+def obter_indice_rag():
+    global indice_rag
+    if indice_rag is None:
+        indice_rag = IndiceAhoCorasick(long_term_memory)
+    return indice_rag
+
+# Ferramentas registradas com seus padrões de disparo (roteadas em uma só busca)
+ferramentas = RoteadorFerramentas()
+ferramentas.registrar("calculadora", lambda query, match: "A resposta de 2 + 2 é 4.", palavras="2 + 2")
 
 # Memória de curto prazo (histórico da conversa atual)
 short_term_memory = []
@@ -13,18 +34,16 @@ def rag_search(query):
     """
     Simula o RAG: busca na memória de longo prazo.
     """
-    for key, value in long_term_memory.items():
-        if key in query.lower():
-            return value
+    chaves = obter_indice_rag().buscar(query.lower())
+    if chaves:
+        return long_term_memory[chaves[0]]
     return None
 
 def action_tool(query):
     """
     Simula ferramentas externas (ex.: calculadora, API externa, etc).
     """
-    if "2 + 2" in query:
-        return "A resposta de 2 + 2 é 4."
-    return None
+    return ferramentas.rotear(query)
 
 def agent_reasoning(prompt):
     """
@@ -49,6 +68,8 @@ def add_to_long_term_memory(entry):
     """
     key = entry.lower().split()[0]  # usa primeira palavra como chave simples
     long_term_memory[key] = entry
+    if indice_rag is not None:
+        indice_rag.adicionar(key)
 
 def main():
     """
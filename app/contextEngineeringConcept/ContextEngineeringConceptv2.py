@@ -1,47 +1,257 @@
 # Simulação educativa completa de Context Engineering
+import atexit
+import os
+import re
+import string
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from armazenamento import abrir_armazenamento
+from indice_aho_corasick import IndiceAhoCorasick
+from roteador_ferramentas import RoteadorFerramentas
+
+def estimate_tokens(text):
+    """
+    Estimativa simples de tokens (~4 caracteres por token). Pode ser trocada
+    por um tokenizador real, ex.: len(tiktoken.encoding_for_model(...).encode(text)).
+    """
+    return max(1, len(text) // 4)
 
 class ShortTermMemory:
     """
-    Memória de curto prazo: armazena o histórico da conversa atual.
+    Memória de curto prazo: armazena o histórico recente da conversa dentro
+    de um orçamento de tokens (e não de um número fixo de mensagens).
+
+    As mensagens ficam em um buffer circular com a contagem de tokens de
+    cada entrada. O contexto é montado uma vez por alteração, na primeira
+    chamada a get_context() depois de um store(). Mensagens que saem da janela
+    podem ser compactadas pelo hook opcional `summarize(resumo_atual, removidas) -> novo resumo`.
+    A mensagem mais nova nunca sai da janela: se sozinha passar do orçamento, é truncada.
     """
-    def __init__(self):
-        self.history = []
+    def __init__(self, max_tokens=512, count_tokens=estimate_tokens, summarize=None):
+        self.max_tokens = max_tokens
+        self.count_tokens = count_tokens
+        self.summarize = summarize
+        self.summary = ""
+        self._summary_tokens = 0
+        self._entries = deque()  # (mensagem, tokens)
+        self._tokens = 0
+        self._context = None     # resumo + janela, montado sob demanda
+
+    @property
+    def history(self):
+        return [message for message, _ in self._entries]
+
+    @property
+    def tokens(self):
+        return self._tokens + self._summary_tokens
 
     def store(self, message):
-        self.history.append(message)
+        tokens = self.count_tokens(message)
+        self._entries.append((message, tokens))
+        self._tokens += tokens
+
+        while self.tokens > self.max_tokens and len(self._entries) > 1:
+            evicted = []
+            while self.tokens > self.max_tokens and len(self._entries) > 1:
+                old, old_tokens = self._entries.popleft()
+                self._tokens -= old_tokens
+                evicted.append(old)
+            if self.summarize:
+                # O resumo também ocupa o orçamento; se crescer, novas mensagens saem da janela
+                self.summary = self.summarize(self.summary, evicted)
+                self._summary_tokens = self.count_tokens(self.summary) if self.summary else 0
+
+        if self.tokens > self.max_tokens:
+            self._truncate_newest()
+        self._context = None
+
+    def _truncate_newest(self):
+        if self._summary_tokens >= self.max_tokens:
+            # Sem espaço nem para a mensagem atual: ela vale mais que o resumo
+            self.summary, self._summary_tokens = "", 0
+        budget = self.max_tokens - self._summary_tokens
+        message, tokens = self._entries.pop()
+        if tokens > budget:
+            # Maior prefixo que cabe no orçamento (busca binária no tamanho)
+            low, high = 0, len(message)
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self.count_tokens(message[:middle]) <= budget:
+                    low = middle
+                else:
+                    high = middle - 1
+            message = message[:low]
+            tokens = self.count_tokens(message)
+        self._entries.append((message, tokens))
+        self._tokens = tokens
 
     def get_context(self):
-        return " ".join(self.history[-5:])  # últimos 5 itens (exemplo)
+        if self._context is None:
+            window = " ".join(message for message, _ in self._entries)
+            self._context = f"Resumo: {self.summary}\n{window}" if self.summary else window
+        return self._context
+
+    def snapshot(self):
+        """
+        Estado serializável (JSON), usado para salvar sessões inativas em disco.
+        """
+        return {
+            "max_tokens": self.max_tokens,
+            "summary": self.summary,
+            "entries": [[message, tokens] for message, tokens in self._entries],
+        }
+
+    @classmethod
+    def from_snapshot(cls, data, **kwargs):
+        memory = cls(max_tokens=data["max_tokens"], **kwargs)
+        memory.summary = data["summary"]
+        memory._summary_tokens = memory.count_tokens(memory.summary) if memory.summary else 0
+        for message, tokens in data["entries"]:
+            memory._entries.append((message, tokens))
+            memory._tokens += tokens
+        return memory
+
+def query_words(query):
+    """
+    {palavra: posição da primeira ocorrência} das palavras da consulta, como
+    aparecem (ex.: "c++") e sem a pontuação das bordas (ex.: "python?" -> "python").
+    """
+    positions = {}
+    for match in re.finditer(r"\S+", query.lower()):
+        word = match.group()
+        positions.setdefault(word, match.start())
+        stripped = word.strip(string.punctuation + "¿¡«»“”‘’")
+        if stripped:
+            positions.setdefault(stripped, match.start() + word.index(stripped))
+    return positions
 
 class LongTermMemory:
     """
     Memória de longo prazo (simulação RAG + knowledge base).
+
+    Por padrão os fatos ficam em um dict em memória; passe `storage`
+    (ex.: ArmazenamentoSQLite) para mantê-los entre execuções.
+
+    A chave de um fato é a sua primeira palavra (add). Com o dict, as chaves são
+    encontradas em qualquer ponto da consulta por um índice Aho-Corasick; com
+    um storage que oferece buscar_chaves (SQLite), as palavras da consulta são
+    procuradas direto pela chave primária, sem carregar as chaves em memória.
+
+    Com `semantic_index` (ex.: IndiceVetorial), perguntas que não contêm
+    nenhuma chave ainda encontram o fato mais parecido por similaridade. Ao
+    abrir, só os fatos que faltam no índice são convertidos em vetores; se o
+    índice foi salvo na mesma versão do storage, nada é percorrido.
+
+    Pode ser compartilhada entre threads: add() é serializado por uma trava,
+    que as buscas só tomam para ler os índices em memória (Aho-Corasick e
+    semântico), alterados por add(). A busca por chave primária no SQLite
+    não passa pela trava (o storage tem a sua).
     """
-    def __init__(self):
-        self.knowledge = {
-            "openai": "OpenAI é uma empresa de pesquisa em IA.",
-            "python": "Python é uma linguagem de programação popular.",
-            "claude": "Claude é um modelo de linguagem da Anthropic."
-        }
+    def __init__(self, storage=None, semantic_index=None, min_score=0.3):
+        self.knowledge = {} if storage is None else storage
+        if not self.knowledge:
+            self.knowledge.update({
+                "openai": "OpenAI é uma empresa de pesquisa em IA.",
+                "python": "Python é uma linguagem de programação popular.",
+                "claude": "Claude é um modelo de linguagem da Anthropic."
+            })
+        self._index = None
+        self._lock = threading.Lock()
+        self.semantic_index = semantic_index
+        self.min_score = min_score
+        if semantic_index is not None:
+            self.sync_semantic_index()
+
+    def sync_semantic_index(self, batch_size=1000):
+        """
+        Adiciona ao índice semântico os fatos que ele ainda não tem. Compara as
+        chaves (e não só a quantidade), então uma chave apagada e outra criada
+        não passam despercebidas.
+        """
+        version = getattr(self.knowledge, "versao", None)
+        if version is not None and version == self.semantic_index.versao_armazenamento:
+            return 0
+        missing = [key for key in self.knowledge if key not in self.semantic_index]
+        for i in range(0, len(missing), batch_size):
+            keys = missing[i:i + batch_size]
+            if hasattr(self.knowledge, "buscar_chaves"):
+                found = self.knowledge.buscar_chaves(keys)
+                keys = [key for key in keys if key in found]
+                facts = [found[key] for key in keys]
+            else:
+                facts = [self.knowledge[key] for key in keys]
+            self.semantic_index.adicionar_lote(keys, facts)
+        self.semantic_index.versao_armazenamento = version
+        return len(missing)
+
+    def save_semantic_index(self, prefix):
+        """
+        Grava o índice semântico (incluindo os fatos de add()) marcado com a versão atual do storage.
+        """
+        if hasattr(self.knowledge, "flush"):
+            self.knowledge.flush()
+        self.semantic_index.versao_armazenamento = getattr(self.knowledge, "versao", None)
+        self.semantic_index.salvar(prefix)
+
+    @property
+    def index(self):
+        # Índice Aho-Corasick (só para o dict em memória): encontra todas as chaves
+        # em uma passada pela consulta. Construído na primeira busca.
+        if self._index is None:
+            self._index = IndiceAhoCorasick(self.knowledge)
+        return self._index
 
     def search(self, query):
-        for key, value in self.knowledge.items():
-            if key in query.lower():
-                return value
+        results = self.search_all(query)
+        if results:
+            return results[0]
+        if self.semantic_index is not None:
+            results = self.search_semantic(query, k=1)
+            return results[0] if results else None
         return None
 
+    def search_semantic(self, query, k=3):
+        with self._lock:
+            matches = self.semantic_index.buscar(query, k)
+        # O índice pode ter chaves que já saíram de knowledge (ex.: apagadas do SQLite): são ignoradas
+        facts = (self.knowledge.get(key) for key, score in matches if score >= self.min_score)
+        return [fact for fact in facts if fact is not None]
+
+    def search_all(self, query):
+        # Chaves mais longas (mais específicas) vêm primeiro
+        if hasattr(self.knowledge, "buscar_chaves"):
+            positions = query_words(query)
+            found = self.knowledge.buscar_chaves(positions)
+            return [found[key] for key in sorted(found, key=lambda key: (-len(key), positions[key]))]
+        with self._lock:
+            return [self.knowledge[key] for key in self.index.buscar(query.lower())]
+
     def add(self, fact):
-        key = fact.lower().split()[0]
-        self.knowledge[key] = fact
+        words = fact.lower().split()
+        if not words:
+            raise ValueError("Fato vazio: nada para adicionar à memória")
+        key = words[0]
+        with self._lock:
+            self.knowledge[key] = fact
+            if self._index is not None and not hasattr(self.knowledge, "buscar_chaves"):
+                self._index.adicionar(key)
+            if self.semantic_index is not None:
+                self.semantic_index.adicionar(key, fact)
 
-class ActionTools:
+class ActionTools(RoteadorFerramentas):
     """
     Ferramentas externas (simples exemplo de ferramenta de cálculo).
+
+    Cada ferramenta é registrada com seus padrões de disparo; todos viram uma
+    única regex, então o roteamento é uma só passada pelo prompt.
     """
+    def __init__(self):
+        super().__init__()
+        self.registrar("calculadora", lambda query, match: "A resposta de 2 + 2 é 4.", palavras="2 + 2")
+
     def execute(self, query):
-        if "2 + 2" in query:
-            return "A resposta de 2 + 2 é 4."
-        return None
+        return self.rotear(query)
 
 class Prompt:
     """
@@ -57,18 +267,49 @@ class Agent:
     """
     Agente principal: coordena RAG, ferramentas e raciocínio.
     """
-    def __init__(self, long_term_memory, tools):
+    _executor = None
+    _executor_lock = threading.Lock()
+
+    def __init__(self, long_term_memory, tools, parallel=False):
         self.memory = long_term_memory
         self.tools = tools
+        # parallel=True: busca na memória enquanto as ferramentas são roteadas
+        # (útil quando a memória faz I/O, ex.: ArmazenamentoSQLite)
+        self.parallel = parallel
+        if parallel:
+            Agent._get_executor()
+
+    @classmethod
+    def _get_executor(cls):
+        with cls._executor_lock:
+            if cls._executor is None:
+                cls._executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="rag")
+                atexit.register(cls.shutdown)
+            return cls._executor
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Encerra o executor compartilhado das buscas em paralelo (recriado se outro Agent pedir).
+        """
+        with cls._executor_lock:
+            executor, cls._executor = cls._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
 
     def decide(self, prompt_text):
+        rag_future = None
+        if self.parallel:
+            executor = Agent._executor or Agent._get_executor()
+            rag_future = executor.submit(self.memory.search, prompt_text)
+
         # Tenta ferramenta primeiro
         tool_result = self.tools.execute(prompt_text)
         if tool_result:
             return tool_result
         
         # Depois tenta RAG
-        rag_result = self.memory.search(prompt_text)
+        rag_result = rag_future.result() if rag_future else self.memory.search(prompt_text)
         if rag_result:
             return rag_result
 
@@ -85,6 +326,33 @@ class User:
     def send_input(self):
         return input(f"{self.name}: ")
 
+def process_turn(agent, short_term_memory, long_term_memory, user_input):
+    """
+    Executa um turno completo (Etapas 1 a 6) e devolve (resposta, fato_adicionado).
+    Usado tanto pelo loop interativo quanto pelo servidor de sessões.
+    """
+    # Etapa 1: guarda entrada na memória de curto prazo
+    short_term_memory.store(user_input)
+
+    # Etapa 2: monta prompt com histórico recente
+    prompt = Prompt(user_input, short_term_memory.get_context())
+
+    # Etapa 3: agente decide resposta
+    answer = agent.decide(prompt.get())
+
+    # Etapa 5: adiciona resposta na memória de curto prazo
+    short_term_memory.store(answer)
+
+    # Etapa 6: opção de adicionar manualmente à memória de longo prazo
+    fact_added = False
+    if "adicionar memória:" in user_input.lower():
+        new_fact = user_input.split(":", 1)[1].strip()
+        if new_fact:
+            long_term_memory.add(new_fact)
+            fact_added = True
+
+    return answer, fact_added
+
 def main():
     """
     Fluxo completo simulando o diagrama Context Engineering.
@@ -94,35 +362,39 @@ def main():
     # Inicializa os componentes
     user = User("Você")
     short_term_memory = ShortTermMemory()
-    long_term_memory = LongTermMemory()
+    semantic_index = None
+    # MEMORIA_SEMANTICA_INDICE=prefixo: o índice é aberto de <prefixo>.npy (memory-map)
+    # e salvo ao sair, então os embeddings não são recalculados a cada execução
+    semantic_prefix = os.getenv("MEMORIA_SEMANTICA_INDICE")
+    if os.getenv("MEMORIA_SEMANTICA") or semantic_prefix:
+        # Busca semântica local (NumPy + embedder por hashing, sem API externa)
+        from busca_vetorial import EmbedderHash, IndiceVetorial
+        if semantic_prefix and IndiceVetorial.existe(semantic_prefix):
+            semantic_index = IndiceVetorial.carregar(semantic_prefix, EmbedderHash(), mmap=True)
+        else:
+            semantic_index = IndiceVetorial(EmbedderHash())
+    storage_path = os.getenv("MEMORIA_LONGO_PRAZO_DB")
+    long_term_memory = LongTermMemory(abrir_armazenamento(storage_path), semantic_index=semantic_index)
     tools = ActionTools()
-    agent = Agent(long_term_memory, tools)
-
-    while True:
-        user_input = user.send_input()
-        if user_input.lower() == "sair":
-            break
-
-        # Etapa 1: guarda entrada na memória de curto prazo
-        short_term_memory.store(user_input)
+    # Com SQLite a busca faz I/O: roda em paralelo com o roteamento das ferramentas
+    agent = Agent(long_term_memory, tools, parallel=bool(storage_path))
 
-        # Etapa 2: monta prompt com histórico recente
-        prompt = Prompt(user_input, short_term_memory.get_context())
+    try:
+        while True:
+            user_input = user.send_input()
+            if user_input.lower() == "sair":
+                break
 
-        # Etapa 3: agente decide resposta
-        answer = agent.decide(prompt.get())
+            # Etapas 1 a 6: memória, prompt, decisão do agente
+            answer, fact_added = process_turn(agent, short_term_memory, long_term_memory, user_input)
 
-        # Etapa 4: mostra resposta
-        print(f"Agente: {answer}\n")
-
-        # Etapa 5: adiciona resposta na memória de curto prazo
-        short_term_memory.store(answer)
-
-        # Etapa 6: opção de adicionar manualmente à memória de longo prazo
-        if "adicionar memória:" in user_input.lower():
-            new_fact = user_input.split(":", 1)[1].strip()
-            long_term_memory.add(new_fact)
-            print("📥 Fato adicionado à memória de longo prazo.\n")
+            # Etapa 4: mostra resposta
+            print(f"Agente: {answer}\n")
+            if fact_added:
+                print("📥 Fato adicionado à memória de longo prazo.\n")
+    finally:
+        if semantic_prefix:
+            long_term_memory.save_semantic_index(semantic_prefix)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,183 @@
+# Backends de armazenamento para a memória de longo prazo
+#
+# O padrão continua sendo um dict em memória. Para persistir os fatos entre
+# execuções, use ArmazenamentoSQLite (ou defina MEMORIA_LONGO_PRAZO_DB=caminho.db).
+import atexit
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+
+
+class ArmazenamentoSQLite(MutableMapping):
+    """
+    Memória de longo prazo persistida em um arquivo SQLite.
+
+    - Escritas agrupadas: os fatos entram em uma transação aberta e o COMMIT
+      acontece a cada `tamanho_lote` escritas, em flush() / fechar() ou no
+      ciclo de compactação. Em caso de queda, perde-se no máximo o lote
+      pendente; o arquivo nunca fica corrompido (modo WAL).
+    - Compactação em segundo plano: uma thread faz checkpoint do WAL e
+      devolve páginas livres ao sistema (incremental_vacuum) periodicamente.
+    - Partida rápida: a chave primária já é o índice em disco e o arquivo é
+      mapeado em memória (mmap_size), então nada é reprocessado ao abrir.
+      buscar_chaves() consulta várias chaves pela chave primária de uma vez.
+    - versao: contador de escritas gravado junto com cada COMMIT; índices
+      derivados (ex.: IndiceVetorial) o usam para saber se estão em dia sem
+      percorrer a tabela.
+    """
+    def __init__(self, caminho, tamanho_lote=256, intervalo_compactacao=30.0, tamanho_mmap=256 * 1024 * 1024):
+        self.caminho = caminho
+        self.tamanho_lote = tamanho_lote
+        self._trava = threading.RLock()
+        self._pendentes = 0
+        self._fechado = False
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conexao.execute("PRAGMA journal_mode = WAL")
+        self._conexao.execute("PRAGMA synchronous = NORMAL")
+        self._conexao.execute(f"PRAGMA mmap_size = {int(tamanho_mmap)}")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS memoria (chave TEXT PRIMARY KEY, valor TEXT NOT NULL) WITHOUT ROWID"
+        )
+        self._conexao.execute("CREATE TABLE IF NOT EXISTS meta (nome TEXT PRIMARY KEY, valor INTEGER NOT NULL)")
+        linha = self._conexao.execute("SELECT valor FROM meta WHERE nome = 'versao'").fetchone()
+        self.versao = linha[0] if linha else 0
+
+        self._parar = threading.Event()
+        self._compactador = None
+        if intervalo_compactacao:
+            self._compactador = threading.Thread(
+                target=self._ciclo_compactacao, args=(intervalo_compactacao,), daemon=True
+            )
+            self._compactador.start()
+        atexit.register(self.fechar)
+
+    # ---------- interface de dicionário ----------
+
+    def __getitem__(self, chave):
+        with self._trava:
+            linha = self._conexao.execute("SELECT valor FROM memoria WHERE chave = ?", (chave,)).fetchone()
+        if linha is None:
+            raise KeyError(chave)
+        return linha[0]
+
+    def __setitem__(self, chave, valor):
+        with self._trava:
+            self._iniciar_transacao()
+            self._conexao.execute(
+                "INSERT INTO memoria (chave, valor) VALUES (?, ?) "
+                "ON CONFLICT(chave) DO UPDATE SET valor = excluded.valor",
+                (chave, valor),
+            )
+            self._registrar_escrita()
+
+    def __delitem__(self, chave):
+        with self._trava:
+            self._iniciar_transacao()
+            cursor = self._conexao.execute("DELETE FROM memoria WHERE chave = ?", (chave,))
+            self._registrar_escrita()
+        if cursor.rowcount == 0:
+            raise KeyError(chave)
+
+    def __contains__(self, chave):
+        with self._trava:
+            return self._conexao.execute("SELECT 1 FROM memoria WHERE chave = ?", (chave,)).fetchone() is not None
+
+    def __len__(self):
+        with self._trava:
+            return self._conexao.execute("SELECT COUNT(*) FROM memoria").fetchone()[0]
+
+    def __iter__(self):
+        for chave, _ in self._percorrer("SELECT chave, NULL FROM memoria"):
+            yield chave
+
+    def items(self):
+        return self._percorrer("SELECT chave, valor FROM memoria")
+
+    def buscar_chaves(self, chaves, tamanho_bloco=500):
+        """
+        {chave: valor} das chaves presentes, consultando só a chave primária
+        (WHERE chave IN (...)), sem percorrer a tabela.
+        """
+        chaves = list(dict.fromkeys(chaves))
+        encontrados = {}
+        for i in range(0, len(chaves), tamanho_bloco):
+            bloco = chaves[i:i + tamanho_bloco]
+            marcadores = ", ".join("?" * len(bloco))
+            with self._trava:
+                linhas = self._conexao.execute(
+                    f"SELECT chave, valor FROM memoria WHERE chave IN ({marcadores})", bloco
+                ).fetchall()
+            encontrados.update(linhas)
+        return encontrados
+
+    def _percorrer(self, sql, tamanho_bloco=1000):
+        with self._trava:
+            cursor = self._conexao.cursor()
+            cursor.execute(sql)
+        while True:
+            with self._trava:
+                linhas = cursor.fetchmany(tamanho_bloco)
+            if not linhas:
+                break
+            yield from linhas
+
+    # ---------- escrita em lote e compactação ----------
+
+    def _iniciar_transacao(self):
+        if not self._conexao.in_transaction:
+            self._conexao.execute("BEGIN")
+
+    def _registrar_escrita(self):
+        self.versao += 1
+        self._pendentes += 1
+        if self._pendentes >= self.tamanho_lote:
+            self.flush()
+
+    def flush(self):
+        """
+        Confirma (COMMIT) o lote de escritas pendentes.
+        """
+        with self._trava:
+            if self._conexao.in_transaction:
+                self._conexao.execute(
+                    "INSERT INTO meta (nome, valor) VALUES ('versao', ?) "
+                    "ON CONFLICT(nome) DO UPDATE SET valor = excluded.valor",
+                    (self.versao,),
+                )
+                self._conexao.execute("COMMIT")
+            self._pendentes = 0
+
+    def compactar(self):
+        """
+        Confirma o lote pendente, esvazia o WAL e libera páginas não usadas.
+        """
+        with self._trava:
+            if self._fechado:
+                return
+            self.flush()
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            self._conexao.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def _ciclo_compactacao(self, intervalo):
+        while not self._parar.wait(intervalo):
+            self.compactar()
+
+    def fechar(self):
+        with self._trava:
+            if self._fechado:
+                return
+            self._parar.set()
+            self.flush()
+            self._conexao.close()
+            self._fechado = True
+
+
+def abrir_armazenamento(caminho=None, **opcoes):
+    """
+    Dict em memória por padrão; SQLite persistente quando um caminho é informado.
+    """
+    if not caminho:
+        return {}
+    return ArmazenamentoSQLite(caminho, **opcoes)
@@ -0,0 +1,71 @@
+# Benchmark: varredura linear (versão original) x índice Aho-Corasick
+#
+# Executar:
+#   python app/contextEngineeringConcept/benchmark_busca.py            # 10k, 100k e 1M chaves
+#   python app/contextEngineeringConcept/benchmark_busca.py 10000 50000
+import random
+import sys
+import time
+
+from indice_aho_corasick import IndiceAhoCorasick
+
+TAMANHOS_PADRAO = [10_000, 100_000, 1_000_000]
+CONSULTAS = 200
+
+
+def gerar_chaves(quantidade, semente=42):
+    """
+    Gera chaves distintas no formato de palavras (ex.: 'kotabiru').
+    """
+    aleatorio = random.Random(semente)
+    silabas = ["ba", "ce", "di", "fo", "gu", "la", "me", "ni", "po", "ru", "sa", "te", "vi", "xo", "zu", "ka"]
+    chaves = set()
+    while len(chaves) < quantidade:
+        chaves.add("".join(aleatorio.choice(silabas) for _ in range(aleatorio.randint(3, 6))))
+    return list(chaves)
+
+
+def gerar_consultas(chaves, quantidade, semente=7):
+    aleatorio = random.Random(semente)
+    return [f"me fale sobre {aleatorio.choice(chaves)} por favor" for _ in range(quantidade)]
+
+
+def busca_linear(conhecimento, consulta):
+    # Mesma lógica do LongTermMemory.search original
+    for chave, valor in conhecimento.items():
+        if chave in consulta.lower():
+            return valor
+    return None
+
+
+def medir(funcao, consultas):
+    inicio = time.perf_counter()
+    for consulta in consultas:
+        funcao(consulta)
+    return (time.perf_counter() - inicio) / len(consultas)
+
+
+def main():
+    tamanhos = [int(arg) for arg in sys.argv[1:]] or TAMANHOS_PADRAO
+    print(f"{'chaves':>10} | {'construção':>12} | {'linear/consulta':>16} | {'índice/consulta':>16} | {'ganho':>8}")
+    for tamanho in tamanhos:
+        chaves = gerar_chaves(tamanho)
+        conhecimento = {chave: f"Fato sobre {chave}." for chave in chaves}
+        consultas = gerar_consultas(chaves, CONSULTAS)
+
+        inicio = time.perf_counter()
+        indice = IndiceAhoCorasick(chaves)
+        indice.buscar("")  # força a construção dos links de falha
+        construcao = time.perf_counter() - inicio
+
+        linear = medir(lambda consulta: busca_linear(conhecimento, consulta), consultas)
+        automato = medir(lambda consulta: indice.buscar(consulta.lower()), consultas)
+
+        print(
+            f"{tamanho:>10} | {construcao:>10.2f} s | {linear * 1e3:>13.3f} ms | "
+            f"{automato * 1e6:>13.1f} µs | {linear / automato:>7.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Benchmark da busca semântica (IndiceVetorial): latência e RAM
+#
+# Executar:
+#   python app/contextEngineeringConcept/benchmark_vetorial.py                 # 1M fatos, float32 e int8
+#   python app/contextEngineeringConcept/benchmark_vetorial.py --fatos 100000 --dimensao 128
+#
+# Os vetores do corpus são gerados diretamente (aleatórios e normalizados)
+# para medir só a busca; o custo do embedder é medido à parte.
+import argparse
+import resource
+import time
+
+import numpy as np
+
+from busca_vetorial import EmbedderHash, IndiceVetorial
+
+REPETICOES = 20
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        # Fora do Linux: pico de memória do processo (ru_maxrss em KB no Linux, bytes no macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def vetores_aleatorios(quantidade, dimensao, semente):
+    gerador = np.random.default_rng(semente)
+    vetores = gerador.standard_normal((quantidade, dimensao), dtype=np.float32)
+    vetores /= np.linalg.norm(vetores, axis=1, keepdims=True)
+    return vetores
+
+
+def medir(funcao):
+    funcao()  # aquecimento
+    inicio = time.perf_counter()
+    for _ in range(REPETICOES):
+        funcao()
+    return (time.perf_counter() - inicio) / REPETICOES
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do IndiceVetorial")
+    parser.add_argument("--fatos", type=int, default=1_000_000)
+    parser.add_argument("--dimensao", type=int, default=256)
+    parser.add_argument("--lote", type=int, default=64, help="consultas por lote")
+    parser.add_argument("--bloco", type=int, default=100_000, help="fatos inseridos por vez")
+    args = parser.parse_args()
+
+    embedder = EmbedderHash(dimensao=args.dimensao)
+    textos = [f"Fato número {i} sobre linguagens de programação e inteligência artificial." for i in range(2000)]
+    inicio = time.perf_counter()
+    embedder.embed_lote(textos)
+    print(f"Embedder por hashing: {len(textos) / (time.perf_counter() - inicio):,.0f} textos/s")
+
+    consultas = vetores_aleatorios(args.lote, args.dimensao, semente=1)
+    print(f"\n{'modo':>8} | {'RAM matriz':>11} | {'RSS':>9} | {'1 consulta':>11} | {f'lote de {args.lote}':>12} | {'por consulta':>12}")
+    for quantizado in (False, True):
+        indice = IndiceVetorial(embedder, quantizado=quantizado, capacidade=args.fatos)
+        for inicio_bloco in range(0, args.fatos, args.bloco):
+            quantidade = min(args.bloco, args.fatos - inicio_bloco)
+            indice.adicionar_vetores(
+                range(inicio_bloco, inicio_bloco + quantidade),
+                vetores_aleatorios(quantidade, args.dimensao, semente=inicio_bloco),
+            )
+
+        uma = medir(lambda: indice.buscar_vetores(consultas[:1], k=5))
+        lote = medir(lambda: indice.buscar_vetores(consultas, k=5))
+        print(
+            f"{'int8' if quantizado else 'float32':>8} | {indice.nbytes / 2**20:>8.0f} MB | {rss_mb():>6.0f} MB | "
+            f"{uma * 1e3:>8.2f} ms | {lote * 1e3:>9.2f} ms | {lote / args.lote * 1e3:>9.3f} ms"
+        )
+        del indice
+
+
+if __name__ == "__main__":
+    main()
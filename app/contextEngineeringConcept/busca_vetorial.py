@@ -0,0 +1,204 @@
+# Busca semântica local para a memória de longo prazo (NumPy)
+#
+# Os fatos viram vetores (embeddings) guardados em uma única matriz contígua.
+# Uma consulta é respondida com um produto matriz × vetor (ou matriz × matriz
+# para lotes de consultas), sem chamar nenhuma API externa.
+import json
+import os
+import re
+import zlib
+
+import numpy as np
+
+
+class EmbedderHash:
+    """
+    Embedder local e determinístico (hashing trick): palavras e n-gramas de
+    caracteres são espalhados em `dimensao` posições via CRC32. Não precisa
+    de modelo nem de internet; serve para testes e para parafraseamentos
+    simples. Qualquer objeto com `dimensao` e `embed_lote(textos)` pode
+    substituí-lo (ex.: um modelo local de sentence embeddings).
+    """
+    def __init__(self, dimensao=256, ngrama=3):
+        self.dimensao = dimensao
+        self.ngrama = ngrama
+
+    def _atributos(self, texto):
+        palavras = re.findall(r"\w+", texto.casefold())
+        atributos = list(palavras)
+        for palavra in palavras:
+            marcada = f" {palavra} "
+            atributos.extend(marcada[i:i + self.ngrama] for i in range(len(marcada) - self.ngrama + 1))
+        return atributos
+
+    def embed(self, texto):
+        return self.embed_lote([texto])[0]
+
+    def embed_lote(self, textos):
+        matriz = np.zeros((len(textos), self.dimensao), dtype=np.float32)
+        for linha, texto in enumerate(textos):
+            for atributo in self._atributos(texto):
+                h = zlib.crc32(atributo.encode("utf-8"))
+                matriz[linha, h % self.dimensao] += 1.0 if (h >> 31) & 1 else -1.0
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        np.divide(matriz, normas, out=matriz, where=normas > 0)
+        return matriz
+
+
+class IndiceVetorial:
+    """
+    Índice de similaridade por cosseno sobre uma matriz NumPy contígua.
+
+    - quantizado=False: float32 (4 bytes por dimensão).
+    - quantizado=True: int8 com uma escala por linha (1 byte por dimensão);
+      a pontuação é feita em blocos convertidos para float32, então a RAM
+      extra por consulta fica limitada ao tamanho do bloco.
+    - salvar()/carregar(): a matriz fica em um arquivo .npy que pode ser
+      aberto com memory-map, sem re-calcular embeddings na inicialização.
+      versao_armazenamento (gravada junto) diz até que versão do armazenamento
+      de origem o índice está em dia (None = desconhecida).
+    """
+    TAMANHO_BLOCO = 65_536
+
+    def __init__(self, embedder, quantizado=False, capacidade=1024):
+        self.embedder = embedder
+        self.dimensao = embedder.dimensao
+        self.quantizado = quantizado
+        self.chaves = []
+        self._linha_da_chave = {}
+        self._matriz = np.zeros((capacidade, self.dimensao), dtype=np.int8 if quantizado else np.float32)
+        self._escalas = np.ones(capacidade, dtype=np.float32) if quantizado else None
+        self.versao_armazenamento = None
+
+    def __len__(self):
+        return len(self.chaves)
+
+    def __contains__(self, chave):
+        return chave in self._linha_da_chave
+
+    @property
+    def nbytes(self):
+        total = self._matriz[:len(self)].nbytes
+        if self.quantizado:
+            total += self._escalas[:len(self)].nbytes
+        return total
+
+    # ---------- inserção ----------
+
+    def adicionar(self, chave, texto):
+        self.adicionar_vetores([chave], self.embedder.embed_lote([texto]))
+
+    def adicionar_lote(self, chaves, textos):
+        self.adicionar_vetores(chaves, self.embedder.embed_lote(list(textos)))
+
+    def _garantir_capacidade(self, usadas, total):
+        capacidade = max(1, len(self._matriz))
+        if total <= len(self._matriz) and self._matriz.flags.writeable:
+            return
+        while capacidade < total:
+            capacidade *= 2
+        # Crescimento por dobra (também copia para a RAM uma matriz aberta via memory-map)
+        matriz = np.zeros((capacidade, self.dimensao), dtype=self._matriz.dtype)
+        matriz[:usadas] = self._matriz[:usadas]
+        self._matriz = matriz
+        if self.quantizado:
+            escalas = np.ones(capacidade, dtype=np.float32)
+            escalas[:usadas] = self._escalas[:usadas]
+            self._escalas = escalas
+
+    def adicionar_vetores(self, chaves, vetores):
+        vetores = np.asarray(vetores, dtype=np.float32)
+        usadas = len(self.chaves)
+        linhas = []
+        for chave in chaves:
+            linha = self._linha_da_chave.get(chave)
+            if linha is None:
+                linha = len(self.chaves)
+                self._linha_da_chave[chave] = linha
+                self.chaves.append(chave)
+            linhas.append(linha)
+        self._garantir_capacidade(usadas, len(self.chaves))
+
+        if self.quantizado:
+            escalas = np.abs(vetores).max(axis=1) / 127.0
+            escalas[escalas == 0] = 1.0
+            self._matriz[linhas] = np.round(vetores / escalas[:, None]).astype(np.int8)
+            self._escalas[linhas] = escalas
+        else:
+            self._matriz[linhas] = vetores
+
+    # ---------- busca ----------
+
+    def _pontuar(self, consultas):
+        n = len(self)
+        if not self.quantizado:
+            return consultas @ self._matriz[:n].T
+        pontuacoes = np.empty((len(consultas), n), dtype=np.float32)
+        for inicio in range(0, n, self.TAMANHO_BLOCO):
+            fim = min(n, inicio + self.TAMANHO_BLOCO)
+            bloco = self._matriz[inicio:fim].astype(np.float32)
+            pontuacoes[:, inicio:fim] = (consultas @ bloco.T) * self._escalas[inicio:fim]
+        return pontuacoes
+
+    def buscar(self, consulta, k=3):
+        return self.buscar_lote([consulta], k)[0]
+
+    def buscar_lote(self, consultas, k=3):
+        """
+        Top-k (chave, similaridade) para cada consulta, com um único produto de matrizes.
+        """
+        if not len(self):
+            return [[] for _ in consultas]
+        return self.buscar_vetores(self.embedder.embed_lote(list(consultas)), k)
+
+    def buscar_vetores(self, vetores, k=3):
+        pontuacoes = self._pontuar(np.asarray(vetores, dtype=np.float32))
+        k = min(k, pontuacoes.shape[1])
+        melhores = np.argpartition(-pontuacoes, k - 1, axis=1)[:, :k]
+        resultados = []
+        for linha, candidatos in enumerate(melhores):
+            ordem = candidatos[np.argsort(-pontuacoes[linha, candidatos])]
+            resultados.append([(self.chaves[i], float(pontuacoes[linha, i])) for i in ordem])
+        return resultados
+
+    # ---------- persistência ----------
+
+    def salvar(self, prefixo):
+        """
+        Grava <prefixo>.npy (matriz), <prefixo>.escalas.npy (se quantizado) e <prefixo>.json (chaves).
+        """
+        # Arquivo temporário + os.replace: um índice aberto com memory-map sobre
+        # os arquivos antigos continua válido, e uma queda não deixa arquivo pela metade
+        def gravar(caminho, escrever):
+            temporario = f"{caminho}.{os.getpid()}.tmp"
+            with open(temporario, "wb") as f:
+                escrever(f)
+            os.replace(temporario, caminho)
+
+        gravar(f"{prefixo}.npy", lambda f: np.save(f, self._matriz[:len(self)]))
+        if self.quantizado:
+            gravar(f"{prefixo}.escalas.npy", lambda f: np.save(f, self._escalas[:len(self)]))
+        meta = {"dimensao": self.dimensao, "quantizado": self.quantizado, "chaves": self.chaves,
+                "versao_armazenamento": self.versao_armazenamento}
+        gravar(f"{prefixo}.json", lambda f: f.write(json.dumps(meta, ensure_ascii=False).encode("utf-8")))
+
+    @classmethod
+    def carregar(cls, prefixo, embedder, mmap=True):
+        with open(f"{prefixo}.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta["dimensao"] != embedder.dimensao:
+            raise ValueError(f"Índice tem dimensão {meta['dimensao']}, embedder tem {embedder.dimensao}.")
+
+        indice = cls(embedder, quantizado=meta["quantizado"], capacidade=1)
+        modo = "r" if mmap else None
+        indice._matriz = np.load(f"{prefixo}.npy", mmap_mode=modo)
+        if indice.quantizado:
+            indice._escalas = np.load(f"{prefixo}.escalas.npy", mmap_mode=modo)
+        indice.chaves = meta["chaves"]
+        indice._linha_da_chave = {chave: linha for linha, chave in enumerate(indice.chaves)}
+        indice.versao_armazenamento = meta.get("versao_armazenamento")
+        return indice
+
+    @staticmethod
+    def existe(prefixo):
+        return os.path.exists(f"{prefixo}.json") and os.path.exists(f"{prefixo}.npy")
@@ -0,0 +1,120 @@
+# Gerador de carga para o servidor de sessões
+#
+# Simula muitas sessões simultâneas conversando com o servidor e mede a
+# latência de cada turno (p50/p99). As sessões são multiplexadas em um
+# número menor de conexões TCP, com requisições em pipeline.
+#
+# Executar (servidor embutido no mesmo processo):
+#   python app/contextEngineeringConcept/carga_sessoes.py --embutido --sessoes 1000 --turnos 20
+# Ou contra um servidor já em execução:
+#   python app/contextEngineeringConcept/carga_sessoes.py --porta 8765
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+
+MENSAGENS = [
+    "O que é python?",
+    "Me fale sobre a openai",
+    "Quanto é 2 + 2?",
+    "Quem criou o claude?",
+    "Qual a previsão do tempo?",
+    "adicionar memória: Rust é uma linguagem focada em segurança de memória",
+]
+
+
+class ConexaoPipeline:
+    """
+    Conexão TCP compartilhada por várias sessões. O servidor responde na
+    ordem em que recebe, então cada resposta resolve o futuro mais antigo.
+    """
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self._pendentes = deque()
+        self._leitor = asyncio.create_task(self._ler())
+
+    @classmethod
+    async def abrir(cls, host, porta):
+        reader, writer = await asyncio.open_connection(host, porta, limit=1024 * 1024)
+        return cls(reader, writer)
+
+    async def _ler(self):
+        while True:
+            linha = await self.reader.readline()
+            if not linha:
+                break
+            self._pendentes.popleft().set_result(json.loads(linha))
+
+    async def enviar(self, requisicao):
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes.append(futuro)
+        self.writer.write(json.dumps(requisicao, ensure_ascii=False).encode("utf-8") + b"\n")
+        await self.writer.drain()
+        return await futuro
+
+    async def fechar(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        self._leitor.cancel()
+
+
+async def simular_sessao(id_sessao, conexao, turnos, latencias, aleatorio):
+    for _ in range(turnos):
+        inicio = time.perf_counter()
+        await conexao.enviar({"sessao": id_sessao, "mensagem": aleatorio.choice(MENSAGENS)})
+        latencias.append(time.perf_counter() - inicio)
+
+
+def percentil(valores_ordenados, p):
+    return valores_ordenados[min(len(valores_ordenados) - 1, int(p * len(valores_ordenados)))]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor de sessões")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--sessoes", type=int, default=1000)
+    parser.add_argument("--turnos", type=int, default=20)
+    parser.add_argument("--conexoes", type=int, default=50)
+    parser.add_argument("--embutido", action="store_true", help="sobe o servidor no mesmo processo")
+    parser.add_argument("--max-sessoes", type=int, default=10_000, help="limite LRU do servidor embutido")
+    parser.add_argument("--trabalhadores", type=int, default=4, help="threads de turnos do servidor embutido")
+    args = parser.parse_args()
+
+    servidor = tcp = None
+    if args.embutido:
+        from servidor_sessoes import criar_servidor
+        servidor = criar_servidor(max_sessoes=args.max_sessoes, trabalhadores=args.trabalhadores)
+        tcp = await servidor.iniciar(args.host, args.porta)
+
+    conexoes = [await ConexaoPipeline.abrir(args.host, args.porta) for _ in range(args.conexoes)]
+    aleatorio = random.Random(42)
+    latencias = []
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        simular_sessao(f"sessao-{i}", conexoes[i % len(conexoes)], args.turnos, latencias, aleatorio)
+        for i in range(args.sessoes)
+    ))
+    duracao = time.perf_counter() - inicio
+
+    for conexao in conexoes:
+        await conexao.fechar()
+    if tcp is not None:
+        tcp.close()
+        await tcp.wait_closed()
+        await asyncio.sleep(0.1)  # deixa os handlers do servidor verem o fim das conexões
+        servidor.encerrar()
+
+    latencias.sort()
+    print(f"Sessões simultâneas: {args.sessoes} | turnos: {len(latencias)} | conexões: {args.conexoes}")
+    print(f"Vazão: {len(latencias) / duracao:,.0f} turnos/s")
+    print(f"Latência p50: {percentil(latencias, 0.50) * 1e3:.2f} ms")
+    print(f"Latência p99: {percentil(latencias, 0.99) * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,110 @@
+# Índice de palavras-chave baseado em autômato Aho-Corasick
+#
+# Em vez de testar "chave in consulta" para cada chave da memória (custo
+# proporcional a nº de chaves × tamanho da consulta), o autômato encontra
+# todas as chaves presentes na consulta em uma única passada pelo texto.
+
+
+class IndiceAhoCorasick:
+    """
+    Autômato Aho-Corasick para busca de múltiplas chaves em uma só passada.
+
+    - adicionar(): insere a chave no trie na hora (incremental). Os links de
+      falha são recalculados de forma preguiçosa, apenas na próxima busca
+      após alguma inserção.
+    - buscar(): devolve todas as chaves encontradas no texto, ordenadas por
+      uma regra determinística: chave mais longa primeiro (mais específica),
+      depois a que aparece antes no texto, depois a ordem de inserção.
+    """
+    def __init__(self, chaves=()):
+        self._filhos = [{}]   # transições do trie: nó -> {caractere: nó}
+        self._falha = [0]     # link de falha de cada nó
+        self._termina = [-1]  # id da chave que termina no nó (-1 = nenhuma)
+        self._saida = [0]     # próximo nó terminal seguindo os links de falha
+        self._chaves = []     # id -> chave
+        self._ids = {}        # chave -> id
+        self._pendente = False
+        for chave in chaves:
+            self.adicionar(chave)
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __contains__(self, chave):
+        return chave in self._ids
+
+    def adicionar(self, chave):
+        if not chave:
+            raise ValueError("A chave não pode ser vazia.")
+        if chave in self._ids:
+            return
+
+        no = 0
+        for caractere in chave:
+            proximo = self._filhos[no].get(caractere)
+            if proximo is None:
+                proximo = len(self._filhos)
+                self._filhos.append({})
+                self._falha.append(0)
+                self._termina.append(-1)
+                self._saida.append(0)
+                self._filhos[no][caractere] = proximo
+            no = proximo
+
+        self._ids[chave] = len(self._chaves)
+        self._termina[no] = len(self._chaves)
+        self._chaves.append(chave)
+        self._pendente = True
+
+    def _construir_links(self):
+        """
+        Calcula links de falha e de saída em largura (BFS) a partir da raiz.
+        """
+        filhos, falha, termina, saida = self._filhos, self._falha, self._termina, self._saida
+        fila = list(filhos[0].values())
+        for no in fila:
+            falha[no] = 0
+            saida[no] = 0
+
+        i = 0
+        while i < len(fila):
+            no = fila[i]
+            i += 1
+            for caractere, filho in filhos[no].items():
+                f = falha[no]
+                while f and caractere not in filhos[f]:
+                    f = falha[f]
+                destino = filhos[f].get(caractere, 0)
+                falha[filho] = destino if destino != filho else 0
+                saida[filho] = falha[filho] if termina[falha[filho]] >= 0 else saida[falha[filho]]
+                fila.append(filho)
+
+        self._pendente = False
+
+    def buscar(self, texto):
+        inicio_por_chave = self.ocorrencias(texto)
+        return sorted(inicio_por_chave, key=lambda chave: (-len(chave), inicio_por_chave[chave], self._ids[chave]))
+
+    def ocorrencias(self, texto):
+        """
+        Devolve {chave: posição da primeira ocorrência} para as chaves presentes no texto.
+        """
+        if self._pendente:
+            self._construir_links()
+
+        filhos, falha, termina, saida = self._filhos, self._falha, self._termina, self._saida
+        inicio_por_id = {}
+        no = 0
+        for posicao, caractere in enumerate(texto):
+            while no and caractere not in filhos[no]:
+                no = falha[no]
+            no = filhos[no].get(caractere, 0)
+
+            terminal = no if termina[no] >= 0 else saida[no]
+            while terminal:
+                id_chave = termina[terminal]
+                if id_chave not in inicio_por_id:
+                    inicio_por_id[id_chave] = posicao - len(self._chaves[id_chave]) + 1
+                terminal = saida[terminal]
+
+        return {self._chaves[id_chave]: inicio for id_chave, inicio in inicio_por_id.items()}
@@ -0,0 +1,132 @@
+# Registro de ferramentas com roteamento por gatilhos compilados
+#
+# Cada ferramenta declara o que a dispara:
+# - palavras: gatilhos literais, todos reunidos em um autômato Aho-Corasick,
+#   então o custo da busca não cresce com o número de ferramentas;
+# - padroes: expressões regulares, todas compiladas em uma única regex.
+# Descobrir qual ferramenta atende um prompt é uma passada pelo texto em cada
+# matcher, em vez de um teste por ferramenta.
+import re
+import time
+from collections import Counter
+
+from indice_aho_corasick import IndiceAhoCorasick
+
+
+class RoteadorFerramentas:
+    """
+    Registro de ferramentas + roteador.
+
+    - registrar(nome, funcao, palavras=..., padroes=...): `funcao(query, match)`
+      devolve a resposta (str) ou None; `match` é o re.Match do gatilho.
+      Padrões de ferramentas diferentes não devem repetir nomes de grupos.
+    - rotear(query): executa a ferramenta cujo gatilho aparece primeiro no
+      texto (empate: a registrada primeiro).
+    - acertos / estatisticas(): contagem por ferramenta e latência do roteamento.
+    """
+    def __init__(self):
+        self._ferramentas = []        # (nome, funcao)
+        self._palavras = {}           # gatilho literal -> índice da ferramenta
+        self._palavras_sem_caixa = {} # gatilho literal (minúsculo) -> índice da ferramenta
+        self._padroes = []            # (índice da ferramenta, regex em texto)
+        self._compilado = False
+        self.acertos = Counter()
+        self.roteamentos = 0
+        self.tempo_total = 0.0
+        self.tempo_maximo = 0.0
+
+    def __len__(self):
+        return len(self._ferramentas)
+
+    def registrar(self, nome, funcao, palavras=(), padroes=(), ignorar_caixa=False):
+        if isinstance(palavras, str):
+            palavras = [palavras]
+        if isinstance(padroes, str):
+            padroes = [padroes]
+        if not palavras and not padroes:
+            raise ValueError(f"A ferramenta '{nome}' precisa de ao menos um gatilho.")
+
+        indice = len(self._ferramentas)
+        self._ferramentas.append((nome, funcao))
+        for palavra in palavras:
+            if ignorar_caixa:
+                self._palavras_sem_caixa.setdefault(palavra.lower(), indice)
+            else:
+                self._palavras.setdefault(palavra, indice)
+        for padrao in padroes:
+            self._padroes.append((indice, f"(?i:{padrao})" if ignorar_caixa else padrao))
+        self._compilado = False
+
+    def _compilar(self):
+        self._indice_palavras = IndiceAhoCorasick(self._palavras)
+        self._indice_sem_caixa = IndiceAhoCorasick(self._palavras_sem_caixa)
+        self._regex_palavras = {}
+
+        alternativas = [f"(?P<_p{i}>{padrao})" for i, (_, padrao) in enumerate(self._padroes)]
+        self._regex = re.compile("|".join(alternativas)) if alternativas else None
+        # O grupo nomeado externo de cada padrão é o último a fechar, então é o lastgroup
+        # do match, mesmo quando o padrão tem grupos próprios
+        self._grupo_para_padrao = {f"_p{i}": i for i in range(len(self._padroes))}
+        # Regex individuais: só usadas para entregar à ferramenta um match com seus próprios grupos
+        self._regex_padroes = [re.compile(padrao) for _, padrao in self._padroes]
+        self._compilado = True
+
+    def _match_literal(self, query, palavra, inicio, ignorar_caixa):
+        chave = (palavra, ignorar_caixa)
+        regex = self._regex_palavras.get(chave)
+        if regex is None:
+            regex = re.compile(re.escape(palavra), re.IGNORECASE if ignorar_caixa else 0)
+            self._regex_palavras[chave] = regex
+        return regex.match(query, inicio) or regex.search(query)
+
+    def encontrar(self, query):
+        """
+        Devolve (índice da ferramenta, match) do primeiro gatilho no texto, ou (None, None).
+        """
+        if not self._compilado:
+            self._compilar()
+
+        candidatos = []  # (início, índice da ferramenta, gatilho literal ou índice do padrão)
+        for palavra, inicio in self._indice_palavras.ocorrencias(query).items():
+            candidatos.append((inicio, self._palavras[palavra], (palavra, False)))
+        if len(self._indice_sem_caixa):
+            for palavra, inicio in self._indice_sem_caixa.ocorrencias(query.lower()).items():
+                candidatos.append((inicio, self._palavras_sem_caixa[palavra], (palavra, True)))
+        if self._regex is not None:
+            match = self._regex.search(query)
+            if match is not None:
+                i = self._grupo_para_padrao[match.lastgroup]
+                candidatos.append((match.start(), self._padroes[i][0], i))
+
+        if not candidatos:
+            return None, None
+        inicio, indice, gatilho = min(candidatos, key=lambda candidato: candidato[:2])
+        if isinstance(gatilho, tuple):
+            return indice, self._match_literal(query, gatilho[0], inicio, gatilho[1])
+        return indice, self._regex_padroes[gatilho].match(query, inicio)
+
+    def rotear(self, query):
+        if not self._compilado:
+            self._compilar()  # fora da medição: só acontece após registrar()
+        inicio = time.perf_counter()
+        indice, match = self.encontrar(query)
+        duracao = time.perf_counter() - inicio
+
+        self.roteamentos += 1
+        self.tempo_total += duracao
+        self.tempo_maximo = max(self.tempo_maximo, duracao)
+        if indice is None:
+            return None
+
+        nome, funcao = self._ferramentas[indice]
+        self.acertos[nome] += 1
+        return funcao(query, match)
+
+    def estatisticas(self):
+        return {
+            "ferramentas": len(self._ferramentas),
+            "roteamentos": self.roteamentos,
+            "acertos": dict(self.acertos),
+            "latencia_media_us": (self.tempo_total / self.roteamentos * 1e6) if self.roteamentos else 0.0,
+            "latencia_maxima_us": self.tempo_maximo * 1e6,
+        }
@@ -0,0 +1,189 @@
+# Servidor de sessões (asyncio) para o agente de Context Engineering
+#
+# Protocolo: uma linha JSON por requisição e uma linha JSON por resposta.
+#   → {"sessao": "ana", "mensagem": "O que é python?"}
+#   ← {"sessao": "ana", "resposta": "Python é uma linguagem de programação popular."}
+#
+# Executar:
+#   python app/contextEngineeringConcept/servidor_sessoes.py --porta 8765 --pasta-sessoes /tmp/sessoes
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from ContextEngineeringConceptv2 import ActionTools, Agent, LongTermMemory, ShortTermMemory, process_turn
+from armazenamento import abrir_armazenamento
+
+
+class GerenciadorSessoes:
+    """
+    Guarda uma ShortTermMemory por sessão, em ordem LRU.
+
+    Acima de `max_sessoes`, a sessão usada há mais tempo sai da memória:
+    é gravada em `pasta` (se informada) e recarregada quando voltar a falar,
+    ou simplesmente descartada.
+
+    usar(id_sessao) dá acesso exclusivo à memória da sessão (uma trava por
+    sessão, que só existe enquanto alguém a usa ou espera por ela); sessões
+    em uso não são despejadas.
+    """
+    def __init__(self, max_sessoes=10_000, pasta=None, **opcoes_memoria):
+        self.max_sessoes = max_sessoes
+        self.pasta = pasta
+        self.opcoes_memoria = opcoes_memoria
+        self._sessoes = OrderedDict()
+        self._trava = threading.Lock()
+        self._travas_sessao = weakref.WeakValueDictionary()
+        self.despejos = 0
+        if pasta:
+            os.makedirs(pasta, exist_ok=True)
+
+    def __len__(self):
+        return len(self._sessoes)
+
+    def _arquivo(self, id_sessao):
+        nome = hashlib.sha1(id_sessao.encode("utf-8")).hexdigest()
+        return os.path.join(self.pasta, f"{nome}.json")
+
+    @contextmanager
+    def usar(self, id_sessao):
+        with self._trava:
+            trava = self._travas_sessao.get(id_sessao)
+            if trava is None:
+                trava = self._travas_sessao[id_sessao] = threading.Lock()
+        with trava:
+            yield self.obter(id_sessao)
+
+    def obter(self, id_sessao):
+        with self._trava:
+            memoria = self._sessoes.get(id_sessao)
+            if memoria is not None:
+                self._sessoes.move_to_end(id_sessao)
+                return memoria
+
+            memoria = self._carregar(id_sessao) or ShortTermMemory(**self.opcoes_memoria)
+            self._sessoes[id_sessao] = memoria
+            while len(self._sessoes) > self.max_sessoes:
+                # A mais antiga que ninguém está usando
+                antiga = next((id_antiga for id_antiga in self._sessoes if id_antiga not in self._travas_sessao), None)
+                if antiga is None:
+                    break
+                self._despejar(antiga, self._sessoes.pop(antiga))
+            return memoria
+
+    def _carregar(self, id_sessao):
+        if not self.pasta:
+            return None
+        arquivo = self._arquivo(id_sessao)
+        if not os.path.exists(arquivo):
+            return None
+        with open(arquivo, "r", encoding="utf-8") as f:
+            dados = json.load(f)
+        os.remove(arquivo)
+        opcoes = {chave: valor for chave, valor in self.opcoes_memoria.items() if chave != "max_tokens"}
+        return ShortTermMemory.from_snapshot(dados, **opcoes)
+
+    def _despejar(self, id_sessao, memoria):
+        self.despejos += 1
+        if not self.pasta:
+            return
+        with open(self._arquivo(id_sessao), "w", encoding="utf-8") as f:
+            json.dump(memoria.snapshot(), f, ensure_ascii=False)
+
+
+class ServidorSessoes:
+    """
+    Atende muitas sessões ao mesmo tempo em um único processo.
+
+    Cada sessão tem sua própria memória de curto prazo; a memória de longo
+    prazo e as ferramentas são compartilhadas. Os turnos rodam em um pool de
+    `trabalhadores` threads (a memória de longo prazo pode ser SQLite, que
+    bloqueia), então o event loop continua livre para as conexões. Turnos da
+    mesma sessão são serializados pela trava da sessão; turnos de sessões
+    diferentes só disputam a trava de escrita da LongTermMemory.
+
+    paralelo=True liga Agent(parallel=True): a busca na memória de longo
+    prazo roda junto com o roteamento das ferramentas (vale com SQLite).
+    """
+    def __init__(self, long_term_memory, tools, sessoes, trabalhadores=4, paralelo=False):
+        self.long_term_memory = long_term_memory
+        self.agent = Agent(long_term_memory, tools, parallel=paralelo)
+        self.sessoes = sessoes
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="turnos")
+
+    def responder(self, requisicao):
+        id_sessao = str(requisicao["sessao"])
+        with self.sessoes.usar(id_sessao) as memoria:
+            resposta, _ = process_turn(self.agent, memoria, self.long_term_memory, requisicao["mensagem"])
+        return {"sessao": id_sessao, "resposta": resposta}
+
+    async def atender(self, reader, writer):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                linha = await reader.readline()
+                if not linha:
+                    break
+                try:
+                    requisicao = json.loads(linha)
+                    saida = await loop.run_in_executor(self._executor, self.responder, requisicao)
+                except (ValueError, KeyError, TypeError) as e:
+                    saida = {"erro": f"Requisição inválida: {e}"}
+                except Exception as e:
+                    # Uma requisição com erro não derruba a conexão nem as outras sessões
+                    saida = {"erro": f"Erro ao processar a requisição: {type(e).__name__}: {e}"}
+                writer.write(json.dumps(saida, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def iniciar(self, host="127.0.0.1", porta=8765):
+        return await asyncio.start_server(self.atender, host, porta, limit=1024 * 1024)
+
+    def encerrar(self):
+        """
+        Espera os turnos em andamento e encerra os executores.
+        """
+        self._executor.shutdown(wait=True)
+        if self.agent.parallel:
+            Agent.shutdown()
+
+
+def criar_servidor(max_sessoes=10_000, pasta_sessoes=None, max_tokens=512, trabalhadores=4):
+    caminho_db = os.getenv("MEMORIA_LONGO_PRAZO_DB")
+    long_term_memory = LongTermMemory(abrir_armazenamento(caminho_db))
+    sessoes = GerenciadorSessoes(max_sessoes=max_sessoes, pasta=pasta_sessoes, max_tokens=max_tokens)
+    return ServidorSessoes(long_term_memory, ActionTools(), sessoes, trabalhadores=trabalhadores,
+                           paralelo=bool(caminho_db))
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Servidor de sessões do agente de Context Engineering")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--max-sessoes", type=int, default=10_000)
+    parser.add_argument("--pasta-sessoes", default=None, help="onde gravar sessões inativas despejadas da memória")
+    parser.add_argument("--max-tokens", type=int, default=512)
+    parser.add_argument("--trabalhadores", type=int, default=4, help="threads que executam os turnos")
+    args = parser.parse_args()
+
+    servidor = criar_servidor(args.max_sessoes, args.pasta_sessoes, args.max_tokens, args.trabalhadores)
+    tcp = await servidor.iniciar(args.host, args.porta)
+    print(f"Servidor de sessões ouvindo em {args.host}:{args.porta}")
+    try:
+        async with tcp:
+            await tcp.serve_forever()
+    finally:
+        servidor.encerrar()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
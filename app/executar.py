@@ -0,0 +1,32 @@
+# Executa um script de app/ com app/ no sys.path (para importar app/shared)
+#
+# Os exemplos ficam em subpastas de app/ e importam utilitários de
+# app/shared. Rodando o script por aqui, app/ e a pasta do script (para os
+# imports entre arquivos vizinhos) entram no sys.path, e o script roda como
+# __main__ com os argumentos que vierem depois dele:
+#
+#   python app/executar.py langchain/langchain_1_tools.py
+#   python app/executar.py langgraph/executor_lote.py langgraphv_3_graph:graph entradas.jsonl saidas.jsonl
+#
+# O caminho do script pode ser relativo à pasta atual ou a app/.
+# (Equivale a PYTHONPATH=app python app/<pasta>/<script>.py.)
+import os
+import runpy
+import sys
+
+PASTA_APP = os.path.dirname(os.path.abspath(__file__))
+
+
+def executar(script, argumentos=()):
+    if not os.path.exists(script):
+        script = os.path.join(PASTA_APP, script)
+    script = os.path.abspath(script)
+    sys.path[0:0] = [os.path.dirname(script), PASTA_APP]
+    sys.argv = [script, *argumentos]
+    runpy.run_path(script, run_name="__main__")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("uso: python app/executar.py <pasta>/<script>.py [argumentos...]")
+    executar(sys.argv[1], sys.argv[2:])
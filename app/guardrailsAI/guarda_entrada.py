@@ -0,0 +1,199 @@
+# Guarda de entrada: verifica o pedido do usuário antes de chamar o LLM
+#
+# Validar só a saída significa pagar uma ida e volta ao modelo até para
+# pedidos que seriam recusados de qualquer jeito. GuardaEntrada roda antes da
+# chamada, localmente:
+#
+# - palavrões (léxico), e-mail, telefone e CPF são compilados numa única
+#   regex com grupos nomeados: uma só passada pelo texto encontra tudo;
+# - o léxico vira uma trie em forma de regex (prefixos comuns fatorados), então
+#   o custo cresce pouco com o tamanho da lista;
+# - cada categoria tem uma ação: bloquear, mascarar (trocar por [EMAIL]...) ou
+#   rotear (ex.: mandar para atendimento humano);
+# - verificar_lote junta os textos e faz uma passada só pelo lote inteiro.
+#
+# Benchmark (vazão x tamanho do léxico):
+#   python app/guardrailsAI/guarda_entrada.py
+import bisect
+import re
+import time
+
+from validacao_streaming import ValidadorPalavroes
+
+PERMITIR = "permitir"
+MASCARAR = "mascarar"
+ROTEAR = "rotear"
+BLOQUEAR = "bloquear"
+PRIORIDADE = {PERMITIR: 0, MASCARAR: 1, ROTEAR: 2, BLOQUEAR: 3}
+
+PADROES = {
+    "email": r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+",
+    "cpf": r"(?<![\d.])(?:\d{3}\.\d{3}\.\d{3}-\d{2}|\d{11})(?![\d-])",
+    "telefone": r"(?<![\d\w])(?:\+?55[\s-]?)?(?:\(\d{2}\)|\d{2})[\s-]?9?\d{4}[\s-]?\d{4}(?!\d)",
+}
+ACOES_PADRAO = {"palavrao": BLOQUEAR, "email": MASCARAR, "cpf": MASCARAR, "telefone": MASCARAR}
+SEPARADOR_LOTE = "\x00"  # não é \w nem \s: nenhum padrão atravessa de um texto para o outro
+
+
+def regex_de_trie(palavras):
+    """
+    Alternância equivalente a "a|b|c..." com os prefixos comuns fatorados
+    (ex.: porra|porcaria -> por(?:ra|caria)).
+    """
+    trie = {}
+    for palavra in palavras:
+        no = trie
+        for caractere in palavra.casefold():
+            no = no.setdefault(caractere, {})
+        no[""] = {}
+
+    def montar(no):
+        terminal = "" in no
+        ramos = [re.escape(c) + montar(filho) for c, filho in sorted(no.items()) if c]
+        if not ramos:
+            return ""
+        corpo = ramos[0] if len(ramos) == 1 else "(?:" + "|".join(ramos) + ")"
+        if terminal:
+            return corpo + "?" if len(ramos) > 1 or len(ramos[0]) == 1 else "(?:" + corpo + ")?"
+        return corpo
+
+    return montar(trie)
+
+
+def cpf_valido(trecho):
+    digitos = [int(c) for c in trecho if c.isdigit()]
+    if len(digitos) != 11 or len(set(digitos)) == 1:
+        return False
+    for tamanho in (9, 10):
+        soma = sum(d * peso for d, peso in zip(digitos, range(tamanho + 1, 1, -1)))
+        if (soma * 10 % 11) % 10 != digitos[tamanho]:
+            return False
+    return True
+
+
+class GuardaEntrada:
+    """
+    Scanner de entrada compilado.
+
+    - palavroes: léxico de palavras proibidas (sem diferenciar maiúsculas).
+    - acoes: {categoria: ação} para palavrao, email, cpf e telefone.
+    - rota: destino devolvido quando a ação é ROTEAR.
+    - validar_cpf: confere os dígitos verificadores (11 dígitos inválidos como
+      CPF ainda podem ser um celular).
+
+    verificar(texto) devolve {"acao", "texto", "achados", "rota"}; "texto" já vem
+    mascarado quando alguma categoria usa MASCARAR.
+    """
+    def __init__(self, palavroes=ValidadorPalavroes.PADRAO, acoes=None, rota="atendimento_humano", validar_cpf=True):
+        self.acoes = {**ACOES_PADRAO, **(acoes or {})}
+        self.rota = rota
+        self.validar_cpf = validar_cpf
+        grupos = [f"(?P<{categoria}>{padrao})" for categoria, padrao in PADROES.items()]
+        if palavroes:
+            grupos.append(rf"(?P<palavrao>\b{regex_de_trie(palavroes)}\b)")
+        self._regex = re.compile("|".join(grupos), re.IGNORECASE)
+
+    def _classificar(self, achado):
+        categoria, trecho = achado.lastgroup, achado.group()
+        if categoria == "cpf" and self.validar_cpf and not cpf_valido(trecho):
+            digitos = re.sub(r"\D", "", trecho)
+            if len(digitos) == 11 and digitos[2] == "9" and trecho.isdigit():
+                return "telefone"
+            return None
+        return categoria
+
+    def _resultado(self, texto, achados):
+        if not achados:
+            return {"acao": PERMITIR, "texto": texto, "achados": [], "rota": None}
+        acao = max((self.acoes[categoria] for categoria, _, _, _ in achados), key=PRIORIDADE.__getitem__)
+        if acao == MASCARAR:
+            partes, fim = [], 0
+            for categoria, inicio, final, _ in achados:
+                if self.acoes[categoria] == MASCARAR:
+                    partes += [texto[fim:inicio], f"[{categoria.upper()}]"]
+                    fim = final
+            texto = "".join(partes) + texto[fim:]
+        return {
+            "acao": acao,
+            "texto": texto,
+            "achados": [(categoria, trecho) for categoria, _, _, trecho in achados],
+            "rota": self.rota if acao == ROTEAR else None,
+        }
+
+    def verificar(self, texto):
+        achados = []
+        for achado in self._regex.finditer(texto):
+            categoria = self._classificar(achado)
+            if categoria:
+                achados.append((categoria, achado.start(), achado.end(), achado.group()))
+        return self._resultado(texto, achados)
+
+    def verificar_lote(self, textos):
+        """
+        Verifica uma lista de textos com uma única passada da regex pelo lote.
+        """
+        textos = [texto.replace(SEPARADOR_LOTE, " ") for texto in textos]
+        inicios, posicao = [], 0
+        for texto in textos:
+            inicios.append(posicao)
+            posicao += len(texto) + 1
+        achados_por_texto = {}
+        for achado in self._regex.finditer(SEPARADOR_LOTE.join(textos)):
+            categoria = self._classificar(achado)
+            if categoria:
+                indice = bisect.bisect_right(inicios, achado.start()) - 1
+                base = inicios[indice]
+                achados_por_texto.setdefault(indice, []).append(
+                    (categoria, achado.start() - base, achado.end() - base, achado.group())
+                )
+        return [self._resultado(texto, achados_por_texto.get(i, [])) for i, texto in enumerate(textos)]
+
+
+def _benchmark():
+    import random
+
+    random.seed(0)
+    silabas = ["ba", "ca", "da", "fe", "go", "li", "ma", "no", "pa", "qui", "ro", "sa", "te", "vu", "xi", "zo"]
+    lexico_total = list(ValidadorPalavroes.PADRAO) + list({
+        "".join(random.choice(silabas) for _ in range(random.randint(2, 4))) for _ in range(40000)
+    })
+    frases = [
+        "Qual o horário de funcionamento da loja no sábado?",
+        "Meu e-mail é maria.silva@example.com, podem me avisar quando chegar?",
+        "Liga pra mim no (11) 98765-4321 por favor",
+        "Segue meu CPF 529.982.247-25 para o cadastro",
+        "Por que a comida está uma merda hoje?",
+        "Gostaria de trocar o produto que comprei semana passada, veio com defeito.",
+    ]
+    textos = [random.choice(frases) for _ in range(20000)]
+
+    print(f"{'léxico':>8} {'trie: textos/s':>15} {'lote: textos/s':>15} {'alternância: textos/s':>22} {'µs/texto':>9}")
+    for tamanho in (10, 100, 1000, 10000, 40000):
+        lexico = lexico_total[:tamanho]
+        guarda = GuardaEntrada(lexico)
+        inicio = time.perf_counter()
+        for texto in textos:
+            guarda.verificar(texto)
+        individual = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        guarda.verificar_lote(textos)
+        lote = time.perf_counter() - inicio
+
+        # Mesma regex com o léxico como alternância simples, para comparação
+        simples = GuardaEntrada(())
+        simples._regex = re.compile(
+            simples._regex.pattern + r"|(?P<palavrao>\b(?:" + "|".join(map(re.escape, lexico)) + r")\b)", re.IGNORECASE
+        )
+        amostra = textos[:2000]
+        inicio = time.perf_counter()
+        for texto in amostra:
+            simples.verificar(texto)
+        alternancia = (time.perf_counter() - inicio) * len(textos) / len(amostra)
+
+        print(f"{tamanho:>8} {len(textos) / individual:>15,.0f} {len(textos) / lote:>15,.0f} "
+              f"{len(textos) / alternancia:>22,.0f} {individual / len(textos) * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    _benchmark()
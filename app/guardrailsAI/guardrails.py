@@ -2,53 +2,120 @@
 import os
 from dotenv import load_dotenv
 from openai import OpenAI
-from guardrails import Guard
-from guardrails.hub import ValidJson
+from validacao_streaming import ValidadorPalavroes, gerar_validado
+from guarda_entrada import BLOQUEAR, PERMITIR, ROTEAR, GuardaEntrada
 
 # Carrega chave da API
 load_dotenv()
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
-# Definindo o "Guard" com restrições
-guard = Guard.from_string(
-    ValidJson(
-        output_schema="""
-        <rail version="0.1">
-            <output>
-                <object>
-                    <string name="resposta" description="A resposta à pergunta, de forma educada e clara"/>
-                </object>
-            </output>
-            <prompt>
-                Você é um assistente educado e respeitoso. Responda sempre de forma educada e nunca use palavrões.
-                Dê a resposta no formato JSON com campo 'resposta'.
-            </prompt>
-        </rail>
-        """
-    )
-)
+# Esquema da saída. O Guard fica em cache por hash do RAIL + opções
+# (registro_guardas.py, em guardas_compiladas/), então não é remontado a cada execução.
+RAIL_RESPOSTA = """
+<rail version="0.1">
+    <output>
+        <object>
+            <string name="resposta" description="A resposta à pergunta, de forma educada e clara"/>
+        </object>
+    </output>
+    <prompt>
+        Você é um assistente educado e respeitoso. Responda sempre de forma educada e nunca use palavrões.
+        Dê a resposta no formato JSON com campo 'resposta'.
+    </prompt>
+</rail>
+"""
+
+# Modo: "streaming" valida cada pedaço da resposta e interrompe a geração na
+# primeira violação (com re-ask imediato); "completo" espera a resposta inteira
+# e valida com guard.parse (para lotes grandes: parse_many, em vários processos)
+MODO_VALIDACAO = "streaming"
+REASK = True
+MAX_TENTATIVAS = 3
+
+# Guarda de entrada: roda antes do LLM (palavrão bloqueia; e-mail, telefone e CPF são mascarados)
+GUARDA_ENTRADA = True
+guarda_entrada = GuardaEntrada()
+RESPOSTA_BLOQUEIO = "Posso ajudar, mas preciso que a pergunta seja feita sem palavrões. 🙂"
 
 # Pergunta do usuário
 user_input = "Por que a comida está uma merda hoje?"
 
-# Chamada protegida
-raw_llm_response = client.chat.completions.create(
-    model="gpt-3.5-turbo",
-    messages=[{"role": "user", "content": user_input}]
-)
+verificacao = guarda_entrada.verificar(user_input) if GUARDA_ENTRADA else None
+if verificacao and verificacao["acao"] != PERMITIR:
+    print(f"🛡️ Guarda de entrada: {verificacao['acao']} {verificacao['achados']}")
+
+if verificacao and verificacao["acao"] == BLOQUEAR:
+    # Nenhuma chamada ao modelo
+    print("✅ Resposta (sem LLM):")
+    print({"resposta": RESPOSTA_BLOQUEIO})
+
+elif verificacao and verificacao["acao"] == ROTEAR:
+    print(f"➡️ Pedido encaminhado para: {verificacao['rota']}")
+
+elif MODO_VALIDACAO == "streaming":
+    user_input = verificacao["texto"] if verificacao else user_input  # já mascarado
+    instrucoes = (
+        "Você é um assistente educado e respeitoso. Responda sempre de forma educada e nunca use palavrões. "
+        "Dê a resposta somente no formato JSON com o campo 'resposta', por exemplo {\"resposta\": \"...\"}."
+    )
+
+    def abrir_stream(mensagens):
+        stream = client.chat.completions.create(model="gpt-3.5-turbo", messages=mensagens, stream=True)
+        try:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        finally:
+            stream.close()  # fechar a conexão interrompe a geração
+
+    resultado = gerar_validado(
+        abrir_stream,
+        [{"role": "system", "content": instrucoes}, {"role": "user", "content": user_input}],
+        esquema={"resposta": str},
+        validadores=[ValidadorPalavroes()],
+        reask=REASK,
+        max_tentativas=MAX_TENTATIVAS,
+    )
+    for violacao in resultado["violacoes"]:
+        print(f"⛔ Tentativa {violacao['tentativa']} interrompida após {violacao['caracteres']} caracteres: {violacao['motivo']}")
+    print(f"Pedaços recebidos: {resultado['pedacos']} (descartados: {resultado['pedacos_descartados']}) "
+          f"em {resultado['segundos']:.1f}s")
+    if resultado["valido"]:
+        print("✅ Resposta validada:")
+        print(resultado["saida"])
+    else:
+        print("❌ Nenhuma resposta válida após", resultado["tentativas"], "tentativas")
+
+else:
+    from registro_guardas import obter_guarda
+
+    user_input = verificacao["texto"] if verificacao else user_input  # já mascarado
+    guard = obter_guarda(RAIL_RESPOSTA)  # Guard do guardrails + validador de palavrões
+
+    # Chamada protegida
+    raw_llm_response = client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[{"role": "user", "content": user_input}]
+    )
 
-# Validação com o Guard
-validated_output, validation_report = guard.parse(raw_llm_response.choices[0].message.content)
+    # Validação com o Guard
+    resultado = guard.parse(raw_llm_response.choices[0].message.content)
 
-# Exibe o resultado
-print("✅ Resposta validada:")
-print(validated_output)
+    # Exibe o resultado
+    if resultado.validation_passed:
+        print("✅ Resposta validada:")
+        print(resultado.validated_output)
+    else:
+        motivos = [resumo.failure_reason for resumo in resultado.validation_summaries]
+        print("❌ Resposta rejeitada:", resultado.error or "; ".join(filter(None, motivos)))
 
 
 # O que esse exemplo faz?
 # Força o formato de saída ser JSON com uma chave chamada resposta.
 # Cria uma camada de verificação que proíbe palavrões ou linguagem inadequada.
 # Usa o modelo da OpenAI via API, mas intercepta a resposta antes de entregá-la ao usuário.
+# No modo "streaming" a resposta é validada enquanto chega (validacao_streaming.py).
+# A guarda de entrada (guarda_entrada.py) recusa ou mascara o pedido antes de gastar uma chamada.
 
 
 # Possíveis extensões
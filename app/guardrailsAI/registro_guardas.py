@@ -0,0 +1,264 @@
+# Registro de guardas (guardrails Guard) + validação em lote
+#
+# Guard.from_string interpreta o RAIL e monta os validadores a cada import, em
+# cada processo e em cada script, e guard.parse valida uma saída por vez.
+# Aqui:
+#
+# - RegistroGuardas mantém um Guard por chave (hash do RAIL + opções), em
+#   memória e em disco (<pasta>/<chave>.json, via Guard.to_dict/from_dict),
+#   então outros scripts e processos não remontam a guarda;
+# - a opção palavroes acrescenta ValidadorSemPalavroes (um validador do
+#   guardrails, com on_fail) à guarda; o léxico faz parte da chave;
+# - parse_many valida listas grandes de saídas num pool de processos: cada
+#   processo recebe a guarda (to_dict) uma vez (initializer) e valida blocos
+#   de saídas com guard.parse, então a vazão cresce com o número de núcleos.
+#   Os processos são criados com "spawn" (o guardrails já tem threads rodando,
+#   e fork com threads pode travar): scripts que chamam parse_many precisam
+#   de `if __name__ == "__main__":`.
+#
+# Guard.to_dict guarda o esquema de saída e os validadores, não as mensagens
+# do prompt: a guarda do registro é para guard.parse; para guard(llm_api, ...)
+# passe messages na chamada.
+#
+# O exemplo guardrails.py desta pasta tem o mesmo nome do pacote guardrails-ai;
+# com a pasta no sys.path ele esconderia o pacote, então o pacote é importado
+# sem ela (_importar_guardrails).
+#
+# Benchmark (vazão x número de processos):
+#   python app/guardrailsAI/registro_guardas.py
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict
+
+from validacao_streaming import ValidadorPalavroes, ViolacaoStreaming
+
+
+def _importar_guardrails():
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    modulo = sys.modules.get("guardrails")
+    if modulo is not None and os.path.dirname(os.path.abspath(getattr(modulo, "__file__", None) or "")) == pasta:
+        del sys.modules["guardrails"]
+    caminho = sys.path[:]
+    sys.path[:] = [item for item in caminho if os.path.abspath(item or os.curdir) != pasta]
+    try:
+        return importlib.import_module("guardrails")
+    finally:
+        sys.path[:] = caminho
+
+
+_importar_guardrails()
+from guardrails import Guard, OnFailAction  # noqa: E402
+from guardrails.validators import FailResult, PassResult, Validator, register_validator  # noqa: E402
+
+VERSAO_GUARDA = 2
+PASTA_PADRAO = os.getenv("GUARDAS_CACHE", os.path.join(os.path.dirname(os.path.abspath(__file__)), "guardas_compiladas"))
+
+
+@register_validator(name="local/sem_palavroes", data_type=["string", "object", "list"])
+class ValidadorSemPalavroes(Validator):
+    """
+    Rejeita palavras proibidas em qualquer texto da saída (sem diferenciar maiúsculas).
+    """
+    def __init__(self, palavroes=ValidadorPalavroes.PADRAO, on_fail=None, **kwargs):
+        super().__init__(on_fail=on_fail, palavroes=list(palavroes), **kwargs)
+        self._validador = ValidadorPalavroes(tuple(palavroes))
+
+    def validate(self, value: Any, metadata: Dict) -> Any:
+        def percorrer(caminho, item):
+            if isinstance(item, str):
+                self._validador(caminho, item, True)
+            elif isinstance(item, dict):
+                for chave, filho in item.items():
+                    percorrer(caminho + (chave,), filho)
+            elif isinstance(item, list):
+                for indice, filho in enumerate(item):
+                    percorrer(caminho + (indice,), filho)
+
+        try:
+            percorrer((), value)
+        except ViolacaoStreaming as violacao:
+            return FailResult(error_message=violacao.motivo)
+        return PassResult()
+
+
+def chave_guarda(rail, opcoes):
+    """
+    Hash do RAIL (sem diferenças de indentação/espaços nas bordas das linhas) + opções.
+    """
+    normalizado = "\n".join(linha.strip() for linha in rail.strip().splitlines())
+    texto_opcoes = json.dumps(opcoes, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(f"{VERSAO_GUARDA}\n{texto_opcoes}\n{normalizado}".encode("utf-8")).hexdigest()[:32]
+
+
+def montar_guarda(rail, palavroes=ValidadorPalavroes.PADRAO, on_fail=OnFailAction.NOOP, **opcoes):
+    """
+    Guard do RAIL; opcoes vão para Guard.for_rail_string (num_reasks, name, description).
+    """
+    guard = Guard.for_rail_string(rail, **opcoes)
+    if palavroes:
+        guard.use(ValidadorSemPalavroes(palavroes=palavroes, on_fail=on_fail))
+    return guard
+
+
+def guarda_para_dict(guard):
+    return {**guard.to_dict(), "history": []}
+
+
+def parse_many(guard, saidas, processos=None, tamanho_bloco=512, minimo_paralelo=2000):
+    """
+    Valida uma lista de saídas com guard.parse; devolve [ValidationOutcome] na mesma ordem.
+
+    - processos: tamanho do pool (padrão: os.cpu_count()); 1 = no processo atual.
+    - tamanho_bloco: saídas por tarefa enviada a um processo.
+    - minimo_paralelo: abaixo disso o pool não compensa e tudo roda aqui.
+    """
+    saidas = list(saidas)
+    processos = processos or os.cpu_count() or 1
+    if processos == 1 or len(saidas) < minimo_paralelo:
+        return _validar(guard, saidas)
+
+    blocos = [saidas[i:i + tamanho_bloco] for i in range(0, len(saidas), tamanho_bloco)]
+    with ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context("spawn"),
+                             initializer=_iniciar_processo, initargs=(guarda_para_dict(guard),)) as pool:
+        resultados = []
+        for bloco in pool.map(_validar_bloco, blocos):
+            resultados.extend(bloco)
+    return resultados
+
+
+def _validar(guard, saidas):
+    resultados = []
+    for saida in saidas:
+        resultados.append(guard.parse(saida))
+        guard.history.clear()  # o histórico de chamadas do Guard cresce a cada parse
+    return resultados
+
+
+# Guarda do processo de trabalho (recebida uma vez, no initializer)
+_guarda_do_processo = None
+
+
+def _iniciar_processo(dados):
+    global _guarda_do_processo
+    _guarda_do_processo = Guard.from_dict(dados)
+
+
+def _validar_bloco(saidas):
+    return _validar(_guarda_do_processo, saidas)
+
+
+class RegistroGuardas:
+    """
+    Um Guard por chave (RAIL + opções), em memória e em <pasta>/<chave>.json.
+    """
+    def __init__(self, pasta=PASTA_PADRAO):
+        self.pasta = pasta
+        self._guardas = {}
+        self._trava = threading.Lock()
+        self.montagens = 0
+        self.leituras_disco = 0
+
+    def _caminho(self, chave):
+        return os.path.join(self.pasta, f"{chave}.json")
+
+    def _carregar(self, chave):
+        try:
+            with open(self._caminho(chave), "r", encoding="utf-8") as f:
+                dados = json.load(f)
+            if dados.get("versao") != VERSAO_GUARDA or dados.get("chave") != chave:
+                return None
+            return Guard.from_dict(dados["guarda"])
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def _salvar(self, chave, guard):
+        os.makedirs(self.pasta, exist_ok=True)
+        temporario = f"{self._caminho(chave)}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({"versao": VERSAO_GUARDA, "chave": chave, "guarda": guarda_para_dict(guard)}, f, ensure_ascii=False)
+        os.replace(temporario, self._caminho(chave))
+
+    def obter(self, rail, palavroes=ValidadorPalavroes.PADRAO, on_fail=OnFailAction.NOOP, **opcoes):
+        chave = chave_guarda(rail, {"palavroes": list(palavroes or ()), "on_fail": str(getattr(on_fail, "value", on_fail)),
+                                    **opcoes})
+        with self._trava:
+            guard = self._guardas.get(chave)
+            if guard is None:
+                guard = self._carregar(chave)
+                if guard is not None:
+                    self.leituras_disco += 1
+                else:
+                    guard = montar_guarda(rail, palavroes=palavroes, on_fail=on_fail, **opcoes)
+                    self.montagens += 1
+                    self._salvar(chave, guard)
+                self._guardas[chave] = guard
+        return guard
+
+    def estatisticas(self):
+        with self._trava:
+            return {"guardas": len(self._guardas), "montagens": self.montagens, "leituras_disco": self.leituras_disco}
+
+
+_registro = None
+_trava_registro = threading.Lock()
+
+
+def obter_guarda(rail, **opcoes):
+    """
+    Guard para o RAIL (e opções), pelo registro compartilhado do processo.
+    """
+    global _registro
+    with _trava_registro:
+        if _registro is None:
+            _registro = RegistroGuardas()
+    return _registro.obter(rail, **opcoes)
+
+
+def _benchmark():
+    import random
+
+    random.seed(0)
+    rail = """
+    <rail version="0.1">
+        <output>
+            <object>
+                <string name="resposta" description="A resposta"/>
+                <integer name="confianca" description="0 a 100"/>
+            </object>
+        </output>
+    </rail>
+    """
+    frases = ["Claro, posso ajudar com isso.", "A loja abre às 9h no sábado.", "Que merda de pergunta.",
+              "O prazo de entrega é de 5 dias úteis. " * 8]
+    saidas = []
+    for _ in range(20000):
+        sorteio = random.random()
+        if sorteio < 0.8:
+            saidas.append(json.dumps({"resposta": random.choice(frases), "confianca": random.randint(0, 100)}, ensure_ascii=False))
+        elif sorteio < 0.9:
+            saidas.append('{"resposta": "sem fechar')
+        else:
+            saidas.append(json.dumps({"resposta": "ok", "confianca": "muita"}))
+
+    inicio = time.perf_counter()
+    guard = RegistroGuardas(pasta=os.path.join(PASTA_PADRAO, "benchmark")).obter(rail)
+    print(f"Guarda obtida em {(time.perf_counter() - inicio) * 1e3:.2f} ms")
+
+    print(f"{'processos':>9} {'saídas/s':>10} {'válidas':>8}")
+    for processos in sorted({1, 2, 4, os.cpu_count() or 1}):
+        inicio = time.perf_counter()
+        resultados = parse_many(guard, saidas, processos=processos)
+        decorrido = time.perf_counter() - inicio
+        validas = sum(resultado.validation_passed for resultado in resultados)
+        print(f"{processos:>9} {len(saidas) / decorrido:>10,.0f} {validas:>8}")
+
+
+if __name__ == "__main__":
+    _benchmark()
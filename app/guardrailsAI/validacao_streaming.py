@@ -0,0 +1,358 @@
+# Validação incremental de respostas em streaming
+#
+# guard.parse só roda depois da resposta completa: uma saída que quebra o JSON
+# esperado ou usa palavrões só é rejeitada depois de pagarmos a geração
+# inteira. Aqui cada pedaço do stream alimenta:
+#
+# - AnalisadorJSONIncremental: máquina de estados que acompanha o JSON
+#   caractere a caractere e acusa o erro assim que nenhum final possível
+#   tornaria o texto válido (sintaxe, tipo de campo, chave fora do esquema);
+# - validadores de texto (ex.: ValidadorPalavroes), chamados com o valor
+#   parcial de cada string do JSON à medida que ela chega.
+#
+# Na primeira violação certa o stream é fechado (a geração para no servidor)
+# e, opcionalmente, um novo pedido (re-ask) com o motivo já é disparado.
+#
+# O módulo não depende de um cliente específico: gerar_validado recebe
+# abrir_stream(mensagens) -> iterador de pedaços de texto (com close(), se houver).
+import json
+import re
+import time
+
+NUMERO = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+PREFIXO_NUMERO = re.compile(r"-?(0|[1-9]\d*)?(\.\d*)?([eE][+-]?\d*)?")
+LITERAIS = {"t": "true", "f": "false", "n": "null"}
+TIPOS_JSON = {'"': str, "{": dict, "[": list, "t": bool, "f": bool, "n": type(None)}
+
+
+class ViolacaoStreaming(Exception):
+    """
+    Violação certa: nenhuma continuação do texto recebido seria válida.
+    """
+    def __init__(self, motivo, posicao):
+        super().__init__(f"{motivo} (caractere {posicao})")
+        self.motivo = motivo
+        self.posicao = posicao
+
+
+class AnalisadorJSONIncremental:
+    """
+    Analisador de JSON que recebe o texto em pedaços.
+
+    - esquema: {campo: tipo} para o objeto de primeiro nível (tipos: str, int,
+      float, bool, list, dict), ou None para aceitar qualquer JSON.
+    - estrito: com esquema, campos fora dele são violação.
+    - ao_texto(caminho, texto, completo): chamado a cada pedaço com o valor
+      (decodificado) da string em andamento; pode levantar ViolacaoStreaming.
+
+    Um bloco ```json ... ``` em volta do JSON é tolerado.
+    """
+    def __init__(self, esquema=None, estrito=True, ao_texto=None):
+        self.esquema = esquema
+        self.estrito = estrito
+        self.ao_texto = ao_texto
+        self.posicao = 0
+        self.texto = []
+        self._pilha = []          # containers abertos: {"tipo": "objeto"|"lista", "chave": ..., "indice": ...}
+        self._estado = "inicio"
+        self._string = None       # string em andamento: {"chars": [...], "escape": ..., "unicode": ..., "chave": bool}
+        self._token = ""          # número ou literal em andamento
+        self._cercado = False     # JSON dentro de ``` ... ```
+        self._cerca = ""
+        self.concluido = False
+
+    # --- API ---------------------------------------------------------------
+
+    def alimentar(self, pedaco):
+        for caractere in pedaco:
+            self._consumir(caractere)
+            self.texto.append(caractere)
+            self.posicao += 1
+        if self._string is not None and not self._string["chave"] and self.ao_texto:
+            self.ao_texto(self._caminho(), "".join(self._string["chars"]), False)
+
+    def finalizar(self):
+        """
+        Fim do stream: devolve o valor decodificado ou levanta ViolacaoStreaming.
+        """
+        if self._estado == "token":
+            self._fechar_token()
+        if not self.concluido:
+            self._violar("JSON incompleto")
+        valor = json.loads(self._json())
+        if self.esquema:
+            faltando = [campo for campo in self.esquema if campo not in valor]
+            if faltando:
+                self._violar(f"campos obrigatórios ausentes: {', '.join(faltando)}")
+        return valor
+
+    # --- máquina de estados ------------------------------------------------
+
+    def _violar(self, motivo):
+        raise ViolacaoStreaming(motivo, self.posicao)
+
+    def _json(self):
+        texto = "".join(self.texto).strip()
+        if self._cercado:
+            texto = re.sub(r"^```(json)?", "", texto).rstrip("`").strip()
+        return texto
+
+    def _caminho(self):
+        return tuple(nivel["chave"] if nivel["tipo"] == "objeto" else nivel["indice"] for nivel in self._pilha)
+
+    def _consumir(self, c):
+        estado = self._estado
+        if estado == "string":
+            return self._consumir_string(c)
+        if estado == "token":
+            if c in "0123456789+-.eEtruefalsn":
+                self._token += c
+                return self._validar_token()
+            self._fechar_token()
+            return self._consumir(c)
+        if estado == "cerca":
+            self._cerca += c
+            if c == "\n":
+                self._estado = "inicio"
+            elif not re.fullmatch(r"`{1,3}(j(s(o(n)?)?)?)?\s*", self._cerca):
+                self._violar("texto antes do JSON")
+            return
+        if c.isspace():
+            return
+
+        if estado == "inicio":
+            if c == "`" and not self._cercado:
+                self._cercado, self._cerca, self._estado = True, c, "cerca"
+                return
+            return self._iniciar_valor(c)
+        if estado == "fim":
+            if self._cercado and c == "`":
+                return
+            self._violar("texto depois do JSON")
+        if estado == "valor":
+            return self._iniciar_valor(c)
+        if estado == "chave_ou_fim":
+            if c == "}":
+                return self._fechar_container("objeto")
+            if c == '"':
+                return self._abrir_string(chave=True)
+            self._violar("esperava uma chave entre aspas")
+        if estado == "chave":
+            if c == '"':
+                return self._abrir_string(chave=True)
+            self._violar("esperava uma chave entre aspas")
+        if estado == "dois_pontos":
+            if c == ":":
+                self._estado = "valor"
+                return
+            self._violar("esperava ':'")
+        if estado == "valor_ou_fim_lista":
+            if c == "]":
+                return self._fechar_container("lista")
+            return self._iniciar_valor(c)
+        if estado == "virgula_ou_fim":
+            topo = self._pilha[-1]
+            if c == ",":
+                if topo["tipo"] == "objeto":
+                    self._estado = "chave"
+                else:
+                    topo["indice"] += 1
+                    self._estado = "valor"
+                return
+            if c == ("}" if topo["tipo"] == "objeto" else "]"):
+                return self._fechar_container(topo["tipo"])
+            self._violar("esperava ',' ou fechamento")
+
+    def _iniciar_valor(self, c):
+        self._checar_tipo(c)
+        if c == "{":
+            self._pilha.append({"tipo": "objeto", "chave": None, "indice": None})
+            self._estado = "chave_ou_fim"
+        elif c == "[":
+            self._pilha.append({"tipo": "lista", "chave": None, "indice": 0})
+            self._estado = "valor_ou_fim_lista"
+        elif c == '"':
+            self._abrir_string(chave=False)
+        elif c in "-0123456789tfn":
+            self._token = c
+            self._estado = "token"
+            self._validar_token()
+        else:
+            self._violar(f"valor JSON inválido começando com {c!r}")
+
+    def _checar_tipo(self, c):
+        if not self.esquema:
+            return
+        if not self._pilha and c != "{":
+            self._violar("a resposta deve ser um objeto JSON")
+        if len(self._pilha) == 1 and self._pilha[0]["tipo"] == "objeto":
+            esperado = self.esquema.get(self._pilha[0]["chave"])
+            if esperado is None:
+                return
+            recebido = TIPOS_JSON.get(c, float if c in "-0123456789" else None)
+            compativel = recebido is esperado or (recebido is float and esperado in (int, float))
+            if not compativel:
+                self._violar(f"campo '{self._pilha[0]['chave']}' deveria ser {esperado.__name__}")
+
+    def _validar_token(self):
+        literal = LITERAIS.get(self._token[0])
+        if literal:
+            if not literal.startswith(self._token):
+                self._violar(f"literal inválido {self._token!r}")
+        elif not PREFIXO_NUMERO.fullmatch(self._token):
+            self._violar(f"número inválido {self._token!r}")
+
+    def _fechar_token(self):
+        literal = LITERAIS.get(self._token[0])
+        if (literal and self._token != literal) or (not literal and not NUMERO.fullmatch(self._token)):
+            self._violar(f"valor inválido {self._token!r}")
+        self._token = ""
+        self._valor_concluido()
+
+    def _abrir_string(self, chave):
+        self._string = {"chars": [], "escape": False, "unicode": None, "chave": chave}
+        self._estado = "string"
+
+    def _consumir_string(self, c):
+        string = self._string
+        if string["unicode"] is not None:
+            if c not in "0123456789abcdefABCDEF":
+                self._violar("escape \\u inválido")
+            string["unicode"] += c
+            if len(string["unicode"]) == 4:
+                string["chars"].append(chr(int(string["unicode"], 16)))
+                string["unicode"] = None
+            return
+        if string["escape"]:
+            string["escape"] = False
+            if c == "u":
+                string["unicode"] = ""
+            elif c in '"\\/bfnrt':
+                string["chars"].append({"b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}.get(c, c))
+            else:
+                self._violar(f"escape inválido \\{c}")
+            return
+        if c == "\\":
+            string["escape"] = True
+        elif c == '"':
+            self._fechar_string()
+        elif c < " ":
+            self._violar("caractere de controle dentro de string")
+        else:
+            string["chars"].append(c)
+
+    def _fechar_string(self):
+        string, self._string = self._string, None
+        texto = "".join(string["chars"])
+        if string["chave"]:
+            if self.esquema and self.estrito and len(self._pilha) == 1 and texto not in self.esquema:
+                self._violar(f"campo fora do esquema: '{texto}'")
+            self._pilha[-1]["chave"] = texto
+            self._estado = "dois_pontos"
+            return
+        if self.ao_texto:
+            self.ao_texto(self._caminho(), texto, True)
+        self._valor_concluido()
+
+    def _fechar_container(self, tipo):
+        self._pilha.pop()
+        self._valor_concluido()
+
+    def _valor_concluido(self):
+        if self._pilha:
+            self._estado = "virgula_ou_fim"
+        else:
+            self._estado = "fim"
+            self.concluido = True
+
+
+class ValidadorPalavroes:
+    """
+    Rejeita palavras proibidas (sem diferenciar maiúsculas). Em texto parcial
+    só olha as palavras já terminadas, para não acusar o começo de outra palavra.
+    """
+    PADRAO = ("merda", "porra", "caralho", "bosta", "puta", "foda", "fdp", "cacete")
+
+    def __init__(self, palavras=PADRAO):
+        self._regex = re.compile(r"\b(" + "|".join(map(re.escape, palavras)) + r")\b", re.IGNORECASE)
+
+    def __call__(self, caminho, texto, completo):
+        if not completo:
+            fim = max((i for i, c in enumerate(texto) if not c.isalnum()), default=-1)
+            texto = texto[:fim + 1]
+        achado = self._regex.search(texto)
+        if achado:
+            campo = ".".join(map(str, caminho)) or "resposta"
+            raise ViolacaoStreaming(f"palavra proibida em '{campo}': {achado.group(0)!r}", None)
+
+
+def gerar_validado(abrir_stream, mensagens, esquema=None, validadores=(), reask=True, max_tentativas=3,
+                   mensagem_reask=None, ao_pedaco=None):
+    """
+    Consome o stream validando cada pedaço; fecha o stream na primeira violação.
+
+    - abrir_stream(mensagens) -> iterador de pedaços de texto.
+    - reask: após uma violação, pede de novo na hora, com o motivo.
+    - mensagem_reask(motivo) -> texto do pedido de correção.
+    - ao_pedaco(texto): chamado a cada pedaço recebido (ex.: exibir ao vivo).
+
+    Devolve {"valido", "saida", "violacoes", "tentativas", "pedacos", "pedacos_descartados", "segundos"}.
+    """
+    mensagem_reask = mensagem_reask or (
+        lambda motivo: f"Sua resposta foi interrompida por violar as regras: {motivo}. "
+                       f"Responda novamente seguindo exatamente o formato pedido."
+    )
+
+    def ao_texto(caminho, texto, completo):
+        for validador in validadores:
+            validador(caminho, texto, completo)
+
+    mensagens = list(mensagens)
+    violacoes = []
+    pedacos = pedacos_descartados = 0
+    inicio = time.perf_counter()
+    for tentativa in range(1, max_tentativas + 1):
+        analisador = AnalisadorJSONIncremental(esquema, ao_texto=ao_texto)
+        stream = abrir_stream(mensagens)
+        pedacos_tentativa = 0
+        try:
+            for pedaco in stream:
+                pedacos_tentativa += 1
+                if ao_pedaco:
+                    ao_pedaco(pedaco)
+                analisador.alimentar(pedaco)
+            saida = analisador.finalizar()
+        except ViolacaoStreaming as violacao:
+            violacoes.append({"tentativa": tentativa, "motivo": violacao.motivo, "caracteres": analisador.posicao})
+            pedacos += pedacos_tentativa
+            pedacos_descartados += pedacos_tentativa
+            if not reask:
+                break
+            mensagens += [
+                {"role": "assistant", "content": "".join(analisador.texto)},
+                {"role": "user", "content": mensagem_reask(violacao.motivo)},
+            ]
+            continue
+        finally:
+            fechar = getattr(stream, "close", None)
+            if fechar:
+                fechar()  # interrompe a geração no servidor se ainda estiver em andamento
+        pedacos += pedacos_tentativa
+        return {
+            "valido": True,
+            "saida": saida,
+            "violacoes": violacoes,
+            "tentativas": tentativa,
+            "pedacos": pedacos,
+            "pedacos_descartados": pedacos_descartados,
+            "segundos": time.perf_counter() - inicio,
+        }
+    return {
+        "valido": False,
+        "saida": None,
+        "violacoes": violacoes,
+        "tentativas": len(violacoes),
+        "pedacos": pedacos,
+        "pedacos_descartados": pedacos_descartados,
+        "segundos": time.perf_counter() - inicio,
+    }
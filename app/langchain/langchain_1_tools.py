@@ -2,14 +2,14 @@ from dotenv import load_dotenv
 import os
 
 from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from langchain_openai import ChatOpenAI
+from shared.fabrica_llm import LLMPreguicoso
+from shared.agente_paralelo import AgenteParalelo
 
 # Carrega a chave do .env
 load_dotenv()
 
-# Inicializa o modelo
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+# Inicializa o modelo (pool HTTP compartilhado)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)  # construído na primeira chamada
 
 # Ferramenta simples: uma calculadora
 def calcular(expr: str) -> str:
@@ -28,14 +28,10 @@ ferramentas = [
     )
 ]
 
-# Inicializa o agente com a ferramenta
-agente = initialize_agent(
-    ferramentas,
-    llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True
-)
+# Inicializa o agente com a ferramenta (function calling; chamadas independentes rodam em paralelo)
+agente = AgenteParalelo(llm, ferramentas, max_passos=4, tempo_max=60, verbose=True)
 
 # Teste com uma pergunta que o LLM vai passar para a ferramenta
 resposta = agente.invoke("Qual o resultado de 8 * (2 + 3)?")
-print(resposta)
+print(resposta["output"])
+print(f"Idas ao LLM: {resposta['passos']} | chamadas de ferramenta: {resposta['chamadas_ferramentas']}")
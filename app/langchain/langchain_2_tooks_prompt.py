@@ -7,48 +7,46 @@ if not os.path.exists(caminho_arquivo):
     print(f"Arquivo '{caminho_arquivo}' não encontrado. Crie o arquivo e adicione informações sobre LangChain.")
     exit(1)
 
-from langchain.tools import Tool
-from langchain.agents import initialize_agent, AgentType
-from langchain_openai import ChatOpenAI
+import asyncio
+import time
+from shared.leitor_info import MODO_BM25, criar_leitor_info
+from shared.fabrica_llm import LLMPreguicoso
+from shared.agente_paralelo import AgenteParalelo
 
 # 1. Carrega variáveis do .env (ex: OPENAI_API_KEY)
 load_dotenv()
 
 # 2. Inicializa o LLM
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
-
-# 3. Função que lê o conteúdo do arquivo .txt
-def ler_arquivo_info(_):
-    try:
-        with open(caminho_arquivo, "r", encoding="utf-8") as f:
-            conteudo = f.read()
-        return conteudo
-    except Exception as e:
-        return f"Erro ao ler o arquivo: {str(e)}"
-
-# 4. Cria ferramenta para leitura do .txt
-ferramenta_info_txt = Tool(
-    name="LeitorDeArquivoTXT",
-    func=ler_arquivo_info,
-    description="Use esta ferramenta para consultar informações armazenadas no arquivo info.txt. Ela retorna o conteúdo completo do arquivo."
-)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)  # construído na primeira chamada
 
-# 5. Inicializa o agente com a ferramenta
-agente = initialize_agent(
-    tools=[ferramenta_info_txt],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True
-)
+# 3. Cria a ferramenta de leitura do .txt (app/shared/leitor_info.py)
+# Modo "bm25" devolve só os trechos relevantes; "completo" devolve o arquivo inteiro
+MODO_LEITURA = MODO_BM25
+ferramenta_info_txt = criar_leitor_info(caminho_arquivo, MODO_LEITURA)
 
-# 6. Consulta segura ao conteúdo do .txt
+# 4. Inicializa o agente com a ferramenta (function calling, com orçamento de passos e tempo)
+agente = AgenteParalelo(llm, [ferramenta_info_txt], max_passos=4, tempo_max=60, verbose=True)
+
+# 5. Consulta segura ao conteúdo do .txt
 pergunta_segura = (
     "Use apenas a ferramenta LeitorDeArquivoTXT para ler o arquivo info.txt. "
     "Depois, responda resumidamente: O que é LangChain?"
 )
-conteudo_extraido = agente.invoke(pergunta_segura)
+conteudo_extraido = agente.invoke(pergunta_segura)["output"]
+
+# 6. Formatação em 3 idiomas
+# Modo "paralelo": uma requisição por idioma, todas ao mesmo tempo (latência ≈ a do idioma mais lento)
+# Modo "unico": um único prompt pedindo os três idiomas de uma vez
+MODO_FORMATACAO = "paralelo"
+MAX_CONCORRENCIA = 3        # limite de requisições simultâneas ao LLM
+MOSTRAR_PARCIAIS = True     # exibe cada idioma assim que ficar pronto
+
+IDIOMAS = [
+    "Português (Brasil)",
+    "English (USA)",
+    "Español (Latinoamérica)",
+]
 
-# 7. Novo prompt para formatar o conteúdo em 3 idiomas
 prompt_formatado = f"""
 Você recebeu este conteúdo extraído de um arquivo .txt:
 
@@ -65,9 +63,44 @@ Apresente a resposta em três idiomas:
 Use uma linguagem simples, com tópicos numerados e exemplos se possível.
 """
 
-# 8. Envia o prompt para o LLM formatar a resposta
-resposta_final = llm.invoke(prompt_formatado)
+def prompt_para_idioma(idioma):
+    return f"""
+Você recebeu este conteúdo extraído de um arquivo .txt:
+
+\"\"\"{conteudo_extraido}\"\"\"
+
+Agora formate essas informações de forma clara, didática e organizada, como se estivesse explicando para uma pessoa iniciante o que é LangChain.
+
+Escreva a resposta somente no idioma: **{idioma}**
+
+Use uma linguagem simples, com tópicos numerados e exemplos se possível.
+"""
 
-# 9. Exibe a resposta formatada
-print("\nResposta formatada em 3 idiomas:")
-print(resposta_final.content)
+async def formatar_idioma(idioma, semaforo, ao_concluir=None):
+    async with semaforo:
+        resposta = await llm.ainvoke(prompt_para_idioma(idioma))
+    if ao_concluir:
+        ao_concluir(idioma, resposta.content)
+    return resposta.content
+
+async def formatar_em_paralelo(idiomas, max_concorrencia, ao_concluir=None):
+    semaforo = asyncio.Semaphore(max_concorrencia)
+    # gather devolve os resultados na ordem dos idiomas, mesmo que terminem fora de ordem
+    secoes = await asyncio.gather(*(formatar_idioma(idioma, semaforo, ao_concluir) for idioma in idiomas))
+    return "\n\n".join(f"{i}. **{idioma}**\n\n{secao}" for i, (idioma, secao) in enumerate(zip(idiomas, secoes), 1))
+
+def exibir_parcial(idioma, texto):
+    print(f"\n[{time.perf_counter() - inicio:.1f}s] Seção pronta: {idioma}\n{texto}")
+
+# 7. Envia para o LLM formatar a resposta
+inicio = time.perf_counter()
+if MODO_FORMATACAO == "paralelo":
+    texto_final = asyncio.run(
+        formatar_em_paralelo(IDIOMAS, MAX_CONCORRENCIA, exibir_parcial if MOSTRAR_PARCIAIS else None)
+    )
+else:
+    texto_final = llm.invoke(prompt_formatado).content
+
+# 8. Exibe a resposta formatada
+print(f"\nResposta formatada em 3 idiomas ({time.perf_counter() - inicio:.1f}s):")
+print(texto_final)
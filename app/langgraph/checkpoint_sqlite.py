@@ -0,0 +1,332 @@
+# Checkpointer SQLite para os agentes LangGraph
+#
+# O MemorySaver guarda todos os checkpoints de cada thread_id na RAM do
+# processo, para sempre, e perde tudo ao reiniciar. CheckpointSQLite persiste
+# em disco e mantém só os últimos N checkpoints por thread:
+#
+# - Escritas agrupadas: checkpoints e writes entram em uma transação aberta e
+#   o COMMIT acontece a cada `tamanho_lote` gravações (ou no ciclo de
+#   compactação / fechar()). Leituras usam a mesma conexão e já enxergam o
+#   lote pendente.
+# - Estado atual em O(1): cada checkpoint é gravado completo (com os valores
+#   dos canais), então ler o último é um único acesso pela chave primária,
+#   sem reconstruir histórico. O último checkpoint de cada thread também fica
+#   em um cache LRU em memória.
+# - Compactação em segundo plano: uma thread apaga os checkpoints além dos
+#   últimos `manter_ultimos` das threads alteradas, faz checkpoint do WAL e
+#   devolve páginas livres ao sistema.
+import atexit
+import threading
+from collections import OrderedDict
+
+import sqlite3
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+
+class CheckpointSQLite(BaseCheckpointSaver):
+    """
+    Checkpointer persistente e com histórico limitado (use no lugar de MemorySaver).
+
+    - manter_ultimos: checkpoints mantidos por thread/namespace após a compactação.
+    - tamanho_lote: gravações (put/put_writes) por COMMIT; em caso de queda perde-se no máximo o lote.
+    - intervalo_compactacao: segundos entre compactações (0/None desliga a thread).
+    - max_threads_cache: threads com o último checkpoint em memória (LRU).
+    """
+    def __init__(self, caminho, manter_ultimos=20, tamanho_lote=32, intervalo_compactacao=30.0,
+                 max_threads_cache=1024, serde=None):
+        super().__init__(serde=serde)
+        self.caminho = caminho
+        self.manter_ultimos = manter_ultimos
+        self.tamanho_lote = tamanho_lote
+        self.max_threads_cache = max_threads_cache
+        self._trava = threading.RLock()
+        self._pendentes = 0
+        self._alteradas = set()
+        self._ultimos = OrderedDict()
+        self._fechado = False
+
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None)
+        self._conexao.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        self._conexao.execute("PRAGMA journal_mode = WAL")
+        self._conexao.execute("PRAGMA synchronous = NORMAL")
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS checkpoints ("
+            " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, parent_id TEXT,"
+            " tipo TEXT, checkpoint BLOB, tipo_metadata TEXT, metadata BLOB,"
+            " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)) WITHOUT ROWID"
+        )
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS writes ("
+            " thread_id TEXT, checkpoint_ns TEXT, checkpoint_id TEXT, task_id TEXT, idx INTEGER,"
+            " canal TEXT, tipo TEXT, valor BLOB, task_path TEXT,"
+            " PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)) WITHOUT ROWID"
+        )
+
+        self._parar = threading.Event()
+        self._compactador = None
+        if intervalo_compactacao:
+            self._compactador = threading.Thread(
+                target=self._ciclo_compactacao, args=(intervalo_compactacao,), daemon=True
+            )
+            self._compactador.start()
+        atexit.register(self.fechar)
+
+    # ---------- leitura ----------
+
+    def _montar_tupla(self, thread_id, checkpoint_ns, registro, writes):
+        checkpoint_id, parent_id, checkpoint, metadata = registro
+        return CheckpointTuple(
+            config={"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }},
+            checkpoint=self.serde.loads_typed(checkpoint),
+            metadata=self.serde.loads_typed(metadata),
+            parent_config=(
+                {"configurable": {"thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": parent_id}}
+                if parent_id else None
+            ),
+            pending_writes=[(task_id, canal, self.serde.loads_typed(valor)) for task_id, canal, valor in writes.values()],
+        )
+
+    def _ler_registro(self, thread_id, checkpoint_ns, checkpoint_id=None):
+        sql = ("SELECT checkpoint_id, parent_id, tipo, checkpoint, tipo_metadata, metadata FROM checkpoints"
+               " WHERE thread_id = ? AND checkpoint_ns = ?")
+        parametros = [thread_id, checkpoint_ns]
+        if checkpoint_id:
+            sql += " AND checkpoint_id = ?"
+            parametros.append(checkpoint_id)
+        else:
+            sql += " ORDER BY checkpoint_id DESC LIMIT 1"
+        linha = self._conexao.execute(sql, parametros).fetchone()
+        if linha is None:
+            return None
+        return linha[0], linha[1], (linha[2], linha[3]), (linha[4], linha[5])
+
+    def _ler_writes(self, thread_id, checkpoint_ns, checkpoint_id):
+        linhas = self._conexao.execute(
+            "SELECT task_id, idx, canal, tipo, valor FROM writes"
+            " WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        return {(task_id, idx): (task_id, canal, (tipo, valor)) for task_id, idx, canal, tipo, valor in linhas}
+
+    def _guardar_ultimo(self, chave, registro, writes):
+        self._ultimos[chave] = (registro, writes)
+        self._ultimos.move_to_end(chave)
+        while len(self._ultimos) > self.max_threads_cache:
+            self._ultimos.popitem(last=False)
+
+    def get_tuple(self, config):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = get_checkpoint_id(config)
+        chave = (thread_id, checkpoint_ns)
+        with self._trava:
+            ultimo = self._ultimos.get(chave)
+            if ultimo and (not checkpoint_id or ultimo[0][0] == checkpoint_id):
+                self._ultimos.move_to_end(chave)
+                return self._montar_tupla(thread_id, checkpoint_ns, *ultimo)
+
+            registro = self._ler_registro(thread_id, checkpoint_ns, checkpoint_id)
+            if registro is None:
+                return None
+            writes = self._ler_writes(thread_id, checkpoint_ns, registro[0])
+            if not checkpoint_id:
+                self._guardar_ultimo(chave, registro, writes)
+        return self._montar_tupla(thread_id, checkpoint_ns, registro, writes)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        sql = "SELECT thread_id, checkpoint_ns, checkpoint_id FROM checkpoints WHERE 1 = 1"
+        parametros = []
+        if config:
+            sql += " AND thread_id = ?"
+            parametros.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                sql += " AND checkpoint_ns = ?"
+                parametros.append(config["configurable"]["checkpoint_ns"])
+            if get_checkpoint_id(config):
+                sql += " AND checkpoint_id = ?"
+                parametros.append(get_checkpoint_id(config))
+        if before and get_checkpoint_id(before):
+            sql += " AND checkpoint_id < ?"
+            parametros.append(get_checkpoint_id(before))
+        sql += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._trava:
+            chaves = self._conexao.execute(sql, parametros).fetchall()
+        for thread_id, checkpoint_ns, checkpoint_id in chaves:
+            if limit is not None and limit <= 0:
+                break
+            tupla = self.get_tuple({"configurable": {
+                "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint_id,
+            }})
+            if tupla is None:
+                continue  # removido pela compactação durante a listagem
+            if filter and not all(tupla.metadata.get(campo) == valor for campo, valor in filter.items()):
+                continue
+            if limit is not None:
+                limit -= 1
+            yield tupla
+
+    # ---------- escrita ----------
+
+    def _iniciar_transacao(self):
+        if not self._conexao.in_transaction:
+            self._conexao.execute("BEGIN")
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        parent_id = config["configurable"].get("checkpoint_id")
+        registro = (
+            checkpoint["id"],
+            parent_id,
+            self.serde.dumps_typed(checkpoint),
+            self.serde.dumps_typed(get_checkpoint_metadata(config, metadata)),
+        )
+        with self._trava:
+            self._iniciar_transacao()
+            self._conexao.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint_ns, registro[0], parent_id, *registro[2], *registro[3]),
+            )
+            self._guardar_ultimo((thread_id, checkpoint_ns), registro, {})
+            self._alteradas.add((thread_id, checkpoint_ns))
+            self._pendentes += 1
+            if self._pendentes >= self.tamanho_lote:
+                self.flush()
+        return {"configurable": {
+            "thread_id": thread_id, "checkpoint_ns": checkpoint_ns, "checkpoint_id": checkpoint["id"],
+        }}
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        with self._trava:
+            ultimo = self._ultimos.get((thread_id, checkpoint_ns))
+            cache = ultimo[1] if ultimo and ultimo[0][0] == checkpoint_id else None
+            self._iniciar_transacao()
+            for indice, (canal, valor) in enumerate(writes):
+                idx = WRITES_IDX_MAP.get(canal, indice)
+                tipado = self.serde.dumps_typed(valor)
+                # Writes normais não sobrescrevem; os especiais (erro, interrupção...) sim
+                verbo = "INSERT OR REPLACE" if idx < 0 else "INSERT OR IGNORE"
+                cursor = self._conexao.execute(
+                    f"{verbo} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, canal, *tipado, task_path),
+                )
+                if cache is not None and cursor.rowcount:
+                    cache[(task_id, idx)] = (task_id, canal, tipado)
+            self._pendentes += 1
+            if self._pendentes >= self.tamanho_lote:
+                self.flush()
+
+    def delete_thread(self, thread_id):
+        with self._trava:
+            self._iniciar_transacao()
+            self._conexao.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conexao.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            for chave in [chave for chave in self._ultimos if chave[0] == thread_id]:
+                del self._ultimos[chave]
+            self._alteradas = {chave for chave in self._alteradas if chave[0] != thread_id}
+            self.flush()
+
+    # Versões assíncronas: as operações são curtas e locais, como no MemorySaver
+    async def aget_tuple(self, config):
+        return self.get_tuple(config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        for tupla in self.list(config, filter=filter, before=before, limit=limit):
+            yield tupla
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return self.put(config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        return self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id):
+        return self.delete_thread(thread_id)
+
+    # ---------- lote e compactação ----------
+
+    def flush(self):
+        """
+        Confirma (COMMIT) o lote de escritas pendentes.
+        """
+        with self._trava:
+            if self._conexao.in_transaction:
+                self._conexao.execute("COMMIT")
+            self._pendentes = 0
+
+    def podar(self):
+        """
+        Apaga os checkpoints (e seus writes) além dos últimos `manter_ultimos`
+        de cada thread alterada desde a última poda. Devolve quantos saíram.
+        """
+        removidos = 0
+        with self._trava:
+            alteradas, self._alteradas = self._alteradas, set()
+            self._iniciar_transacao()
+            for thread_id, checkpoint_ns in alteradas:
+                limite = self._conexao.execute(
+                    "SELECT checkpoint_id FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ?"
+                    " ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?",
+                    (thread_id, checkpoint_ns, self.manter_ultimos - 1),
+                ).fetchone()
+                if limite is None:
+                    continue
+                for tabela in ("checkpoints", "writes"):
+                    cursor = self._conexao.execute(
+                        f"DELETE FROM {tabela} WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?",
+                        (thread_id, checkpoint_ns, limite[0]),
+                    )
+                    if tabela == "checkpoints":
+                        removidos += cursor.rowcount
+            self.flush()
+        return removidos
+
+    def compactar(self):
+        """
+        Poda o histórico, esvazia o WAL e libera páginas não usadas.
+        """
+        with self._trava:
+            if self._fechado:
+                return
+            self.podar()
+            self._conexao.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchall()
+            self._conexao.execute("PRAGMA incremental_vacuum").fetchall()
+
+    def _ciclo_compactacao(self, intervalo):
+        while not self._parar.wait(intervalo):
+            self.compactar()
+
+    def fechar(self):
+        # A thread de compactação é parada fora da trava (ela pode estar esperando por ela)
+        self._parar.set()
+        if self._compactador is not None and self._compactador is not threading.current_thread():
+            self._compactador.join()
+        with self._trava:
+            if self._fechado:
+                return
+            self.podar()
+            self._conexao.close()
+            self._fechado = True
+
+
+def abrir_checkpointer(caminho=None, **opcoes):
+    """
+    MemorySaver quando não há caminho; CheckpointSQLite persistente caso contrário.
+    """
+    if not caminho:
+        from langgraph.checkpoint.memory import MemorySaver
+        return MemorySaver()
+    return CheckpointSQLite(caminho, **opcoes)
@@ -0,0 +1,214 @@
+# Execução em lote de grafos LangGraph a partir de um arquivo JSONL
+#
+# Cada linha do arquivo de entrada é o estado inicial de uma execução do
+# grafo. As linhas são lidas sob demanda (o arquivo nunca é carregado
+# inteiro), executadas com concorrência limitada via ainvoke e gravadas no
+# arquivo de saída assim que terminam:
+#
+#   {"linha": 12, "saida": {...}}      ou      {"linha": 12, "erro": "..."}
+#
+# - ordenado=True grava na ordem da entrada (com uma janela limitada de
+#   resultados aguardando as linhas anteriores); ordenado=False grava na
+#   ordem em que terminam.
+# - Retomada: ao reiniciar, as linhas já presentes na saída são puladas (uma
+#   última linha incompleta, de uma queda no meio da escrita, é descartada).
+#   Com --refazer-erros os registros de erro são retirados da saída antes de
+#   executar essas linhas de novo, então cada linha tem um só registro.
+# - Uma linha de entrada que não é JSON válido vira um registro de erro.
+# - Com TELEMETRIA=1 cada execução é instrumentada (shared/telemetria.py) e o
+#   trace/métricas por nó são gravados ao final.
+#
+# Executar:
+#   python app/executar.py langgraph/executor_lote.py langgraphv_4_graph_condicional:graph entradas.jsonl saidas.jsonl
+#   python app/executar.py langgraph/executor_lote.py langgraphv_3_graph:graph entradas.jsonl saidas.jsonl --concorrencia 64 --fora-de-ordem
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from shared.telemetria import com_telemetria
+
+
+def serializar(valor):
+    """
+    Converte o que o json não sabe gravar (mensagens LangChain, objetos Pydantic...).
+    """
+    if hasattr(valor, "model_dump"):
+        return valor.model_dump()
+    return str(valor)
+
+
+def linhas_concluidas(caminho_saida, refazer_erros=False):
+    """
+    Lê a saída de uma execução anterior e devolve o conjunto de linhas já
+    processadas. Uma última linha incompleta (queda durante a escrita) ou um
+    registro corrompido é descartado; se a mesma linha aparece mais de uma vez,
+    vale o último registro. Com refazer_erros, os registros de erro saem do
+    arquivo (essas linhas serão executadas de novo). Quando algo é descartado,
+    o arquivo é reescrito, então nunca fica com registros repetidos.
+    """
+    if not os.path.exists(caminho_saida):
+        return set()
+    with open(caminho_saida, "rb") as f:
+        conteudo = f.read()
+    registros = {}  # linha -> (registro em bytes, é erro); o último registro vence
+    reescrever = bool(conteudo) and not conteudo.endswith(b"\n")
+    for bruto in conteudo.splitlines():
+        try:
+            registro = json.loads(bruto)
+            numero = registro["linha"]
+        except (ValueError, KeyError, TypeError):
+            reescrever = True
+            continue
+        if registros.pop(numero, None) is not None:
+            reescrever = True
+        registros[numero] = (bruto, "erro" in registro)
+    if refazer_erros:
+        com_erro = [numero for numero, (_, erro) in registros.items() if erro]
+        for numero in com_erro:
+            del registros[numero]
+        reescrever = reescrever or bool(com_erro)
+
+    if reescrever:
+        temporario = f"{caminho_saida}.{os.getpid()}.tmp"
+        with open(temporario, "wb") as f:
+            f.writelines(bruto + b"\n" for bruto, _ in registros.values())
+        os.replace(temporario, caminho_saida)
+    return set(registros)
+
+
+async def executar_lote(grafo, caminho_entrada, caminho_saida, max_concorrencia=32, ordenado=True,
+                        janela=None, retomar=True, refazer_erros=False, config_da_linha=None,
+                        relatar_a_cada=1000):
+    """
+    Executa `grafo.ainvoke` para cada linha do JSONL de entrada e grava os
+    resultados no JSONL de saída. Devolve estatísticas da execução.
+
+    - max_concorrencia: execuções do grafo em andamento ao mesmo tempo.
+    - janela: linhas lidas e ainda não gravadas (padrão: 4x a concorrência);
+      limita a memória no modo ordenado quando uma linha demora.
+    - config_da_linha(numero, entrada) -> config do invoke (ex.: thread_id por linha).
+
+    Nós síncronos (ex.: llm.invoke) rodam no executor padrão do laço de quem
+    chama, que não é trocado aqui; para max_concorrencia alta, dimensione-o
+    (main() faz isso no laço que cria).
+    """
+    janela = janela or 4 * max_concorrencia
+    concluidas = linhas_concluidas(caminho_saida, refazer_erros) if retomar else set()
+    modo = "a" if retomar else "w"
+
+    vagas_janela = asyncio.Semaphore(janela)
+    vagas_execucao = asyncio.Semaphore(max_concorrencia)
+    prontos = {}
+    estatisticas = {"processadas": 0, "erros": 0, "puladas": 0}
+    inicio = time.perf_counter()
+
+    with open(caminho_saida, modo, encoding="utf-8") as saida:
+        pendentes_em_ordem = deque()  # ordenado: linhas em andamento, na ordem da entrada
+
+        def gravar(registro):
+            saida.write(json.dumps(registro, ensure_ascii=False, default=serializar) + "\n")
+            estatisticas["processadas"] += 1
+            estatisticas["erros"] += "erro" in registro
+            vagas_janela.release()
+            if relatar_a_cada and estatisticas["processadas"] % relatar_a_cada == 0:
+                saida.flush()
+                decorrido = time.perf_counter() - inicio
+                print(f"{estatisticas['processadas']} linhas | {estatisticas['processadas'] / decorrido * 3600:,.0f}/hora")
+
+        def concluir(numero, registro):
+            if not ordenado:
+                gravar(registro)
+                return
+            prontos[numero] = registro
+            while pendentes_em_ordem and pendentes_em_ordem[0] in prontos:
+                gravar(prontos.pop(pendentes_em_ordem.popleft()))
+
+        async def executar(numero, linha):
+            try:
+                entrada = json.loads(linha)
+                config = com_telemetria(config_da_linha(numero, entrada) if config_da_linha else None)
+                async with vagas_execucao:
+                    resultado = await grafo.ainvoke(entrada, config)
+                registro = {"linha": numero, "saida": resultado}
+            except Exception as erro:
+                registro = {"linha": numero, "erro": f"{type(erro).__name__}: {erro}"}
+            concluir(numero, registro)
+
+        tarefas = set()
+        with open(caminho_entrada, "r", encoding="utf-8") as entrada:
+            for numero, linha in enumerate(entrada, start=1):
+                if not linha.strip():
+                    continue
+                if numero in concluidas:
+                    estatisticas["puladas"] += 1
+                    continue
+                await vagas_janela.acquire()
+                if ordenado:
+                    pendentes_em_ordem.append(numero)
+                tarefa = asyncio.create_task(executar(numero, linha))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+        if tarefas:
+            await asyncio.gather(*tarefas)
+
+    estatisticas["segundos"] = time.perf_counter() - inicio
+    return estatisticas
+
+
+def carregar_grafo(referencia):
+    """
+    "modulo:atributo" -> grafo compilado (ex.: "langgraphv_3_graph:graph").
+    """
+    modulo, _, atributo = referencia.partition(":")
+    return getattr(importlib.import_module(modulo), atributo or "graph")
+
+
+async def _executar_cli(args, config_da_linha):
+    # O laço é o de asyncio.run, criado só para este comando: os nós síncronos
+    # ganham um executor do tamanho da concorrência, encerrado pelo asyncio.run
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=args.concorrencia, thread_name_prefix="nos")
+    )
+    return await executar_lote(
+        carregar_grafo(args.grafo),
+        args.entrada,
+        args.saida,
+        max_concorrencia=args.concorrencia,
+        ordenado=not args.fora_de_ordem,
+        janela=args.janela,
+        retomar=not args.do_zero,
+        refazer_erros=args.refazer_erros,
+        config_da_linha=config_da_linha,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa um grafo LangGraph sobre um arquivo JSONL")
+    parser.add_argument("grafo", help='módulo:atributo do grafo compilado, ex.: "langgraphv_3_graph:graph"')
+    parser.add_argument("entrada", help="JSONL com um estado inicial por linha")
+    parser.add_argument("saida", help="JSONL de resultados (retomado se já existir)")
+    parser.add_argument("--concorrencia", type=int, default=32)
+    parser.add_argument("--janela", type=int, default=None)
+    parser.add_argument("--fora-de-ordem", action="store_true", help="grava na ordem de conclusão")
+    parser.add_argument("--do-zero", action="store_true", help="ignora a saída existente e recomeça")
+    parser.add_argument("--refazer-erros", action="store_true", help="na retomada, executa de novo as linhas com erro")
+    parser.add_argument("--thread-por-linha", action="store_true", help="thread_id próprio por linha (grafos com checkpointer)")
+    args = parser.parse_args()
+
+    config_da_linha = None
+    if args.thread_por_linha:
+        config_da_linha = lambda numero, entrada: {"configurable": {"thread_id": f"lote-{numero}"}}
+
+    estatisticas = asyncio.run(_executar_cli(args, config_da_linha))
+    por_hora = estatisticas["processadas"] / estatisticas["segundos"] * 3600 if estatisticas["segundos"] else 0
+    print(f"Processadas: {estatisticas['processadas']} (erros: {estatisticas['erros']}, "
+          f"puladas por retomada: {estatisticas['puladas']}) em {estatisticas['segundos']:.1f}s | {por_hora:,.0f}/hora")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# Histórico com orçamento de tokens para agentes create_react_agent
+#
+# Sem isso, cada invoke reenvia a lista inteira de mensagens da thread e o
+# custo por turno cresce com o tamanho da conversa. HistoricoResumido é um
+# pre_model_hook: antes de cada chamada ao modelo ele mantém a thread dentro
+# de `max_tokens`:
+#
+# - SystemMessages do início são sempre mantidas;
+# - o turno atual (da última mensagem do usuário em diante) e as mensagens
+#   mais recentes que couberem ficam como estão, e um AIMessage com
+#   tool_calls nunca é separado dos ToolMessages com os resultados;
+# - o que sai da janela vira um resumo contínuo (uma SystemMessage que é
+#   reescrita a cada corte), ou é só descartado com resumir=None;
+# - o prompt de sistema passado em create_react_agent(prompt=...) não está no
+#   estado, então ele é informado ao hook (prompt=...) e descontado do orçamento;
+# - a contagem de tokens fica em cache por id de mensagem, então só as
+#   mensagens novas são tokenizadas a cada turno.
+#
+# O estado da thread é reescrito (RemoveMessage(REMOVE_ALL_MESSAGES)), então o
+# checkpoint também para de crescer.
+import uuid
+from collections import OrderedDict
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+PREFIXO_ID_RESUMO = "resumo_historico"
+PREFIXO_TEXTO_RESUMO = "Resumo da conversa até aqui:\n"
+
+
+def _criar_contador():
+    try:
+        import tiktoken
+        codificacao = tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # Sem tiktoken (ou sem rede para baixar o vocabulário): ~4 caracteres por token
+        return lambda texto: max(1, len(texto) // 4)
+    return lambda texto: len(codificacao.encode(texto, disallowed_special=()))
+
+
+def texto_da_mensagem(mensagem):
+    conteudo = mensagem.content if isinstance(mensagem.content, str) else str(mensagem.content)
+    chamadas = getattr(mensagem, "tool_calls", None)
+    if chamadas:
+        conteudo += " " + " ".join(f"{chamada['name']}({chamada['args']})" for chamada in chamadas)
+    return conteudo
+
+
+def resumo_extrativo(resumo, mensagens, max_caracteres=1500):
+    """
+    Resumo sem LLM: acrescenta o início de cada mensagem removida e mantém
+    só o final do texto. Use um resumidor com LLM para resumos de verdade.
+    """
+    linhas = [f"{mensagem.type}: {texto_da_mensagem(mensagem)[:200]}" for mensagem in mensagens]
+    texto = "\n".join(filter(None, [resumo] + linhas))
+    return texto[-max_caracteres:]
+
+
+class HistoricoResumido:
+    """
+    pre_model_hook que mantém a entrada do modelo em até `max_tokens`.
+
+    - prompt: o mesmo prompt de sistema passado a create_react_agent (texto ou
+      SystemMessage); seus tokens são descontados do orçamento.
+    - resumir(resumo_anterior, mensagens_removidas) -> novo resumo (padrão:
+      resumo_extrativo, sem LLM). Um resumidor com LLM é chamado de forma
+      síncrona a cada corte, antes da chamada ao modelo: soma uma ida e volta
+      à latência desses turnos. resumir=None só descarta as mensagens antigas.
+    - contar_tokens(texto) -> int (padrão: tiktoken se instalado, senão ~4 caracteres/token).
+    - tokens_por_mensagem: custo fixo de cada mensagem no formato de chat.
+    - max_cache: mensagens com contagem em cache (LRU).
+    """
+    def __init__(self, max_tokens=2000, resumir=resumo_extrativo, contar_tokens=None,
+                 tokens_por_mensagem=4, max_cache=10000, prompt=None):
+        self.max_tokens = max_tokens
+        self.resumir = resumir
+        self.contar_tokens = contar_tokens or _criar_contador()
+        self.tokens_por_mensagem = tokens_por_mensagem
+        texto_prompt = getattr(prompt, "content", prompt)
+        self.tokens_prompt = (self.contar_tokens(texto_prompt) + tokens_por_mensagem) if texto_prompt else 0
+        self.max_cache = max_cache
+        self._cache = OrderedDict()
+        self.cortes = 0
+
+    def tokens(self, mensagem):
+        chave = mensagem.id
+        if chave is not None and chave in self._cache:
+            self._cache.move_to_end(chave)
+            return self._cache[chave]
+        tokens = self.contar_tokens(texto_da_mensagem(mensagem)) + self.tokens_por_mensagem
+        if chave is not None:
+            self._cache[chave] = tokens
+            if len(self._cache) > self.max_cache:
+                self._cache.popitem(last=False)
+        return tokens
+
+    @staticmethod
+    def _blocos(mensagens):
+        """
+        Agrupa as mensagens em blocos indivisíveis: AIMessage com tool_calls
+        + os ToolMessages seguintes formam um bloco só.
+        """
+        blocos = []
+        for mensagem in mensagens:
+            if isinstance(mensagem, ToolMessage) and blocos and (
+                isinstance(blocos[-1][0], AIMessage) and blocos[-1][0].tool_calls
+            ):
+                blocos[-1].append(mensagem)
+            else:
+                blocos.append([mensagem])
+        return blocos
+
+    def __call__(self, state):
+        mensagens = state["messages"]
+        orcamento = self.max_tokens - self.tokens_prompt
+        if sum(self.tokens(mensagem) for mensagem in mensagens) <= orcamento:
+            return {"llm_input_messages": mensagens}
+
+        sistema, resumo, conversa = [], "", []
+        for mensagem in mensagens:
+            if isinstance(mensagem, SystemMessage) and (mensagem.id or "").startswith(PREFIXO_ID_RESUMO):
+                resumo = mensagem.content[len(PREFIXO_TEXTO_RESUMO):]
+            elif isinstance(mensagem, SystemMessage) and not conversa:
+                sistema.append(mensagem)
+            else:
+                conversa.append(mensagem)
+
+        # Mantém os blocos mais recentes que cabem no orçamento; o turno atual fica sempre.
+        # O resumo atual entra na conta como estimativa do espaço do novo resumo.
+        disponivel = orcamento - sum(self.tokens(mensagem) for mensagem in sistema)
+        if self.resumir is not None:
+            disponivel -= self.contar_tokens(PREFIXO_TEXTO_RESUMO + resumo) + self.tokens_por_mensagem
+        blocos = self._blocos(conversa)
+        turno_atual = max((i for i, bloco in enumerate(blocos) if isinstance(bloco[0], HumanMessage)), default=len(blocos) - 1)
+        mantidos = []
+        for i in range(len(blocos) - 1, -1, -1):
+            custo = sum(self.tokens(mensagem) for mensagem in blocos[i])
+            if i < turno_atual and custo > disponivel:
+                break
+            mantidos.insert(0, blocos[i])
+            disponivel -= custo
+        removidos = [mensagem for bloco in blocos[:len(blocos) - len(mantidos)] for mensagem in bloco]
+        if not removidos:
+            return {"llm_input_messages": mensagens}
+
+        self.cortes += 1
+        for mensagem in removidos:
+            self._cache.pop(mensagem.id, None)
+        recentes = [mensagem for bloco in mantidos for mensagem in bloco]
+        if self.resumir is None:
+            return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *sistema, *recentes]}
+        novo_resumo = SystemMessage(
+            content=PREFIXO_TEXTO_RESUMO + self.resumir(resumo, removidos),
+            id=f"{PREFIXO_ID_RESUMO}:{uuid.uuid4().hex}",
+        )
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *sistema, novo_resumo, *recentes]}
@@ -1,7 +1,8 @@
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
+from shared.fabrica_llm import obter_llm
+from shared.telemetria import com_telemetria, obter_coletor
+from checkpoint_sqlite import abrir_checkpointer
 #from tools import dobrar_numero, inverter_texto
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
@@ -11,10 +12,12 @@ load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
 # 2. Inicializa o modelo OpenAI
-model = ChatOpenAI(model="gpt-4", api_key=api_key)
+model = obter_llm(model="gpt-4", temperature=None, api_key=api_key)
 
-# 3. Cria o memory saver (sem parâmetros no construtor)
-memory = MemorySaver()
+# 3. Cria o checkpointer para guardar o histórico da conversa em disco (SQLite),
+#    mantendo só os últimos checkpoints por thread. LANGGRAPH_CHECKPOINT_DB="" volta ao MemorySaver.
+caminho_checkpoints = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints.db")
+memory = abrir_checkpointer(os.getenv("LANGGRAPH_CHECKPOINT_DB", caminho_checkpoints), manter_ultimos=20)
 
 system_prompt = """
 Você é um agente que pode usar ferramentas para resolver perguntas.
@@ -28,8 +31,8 @@ def dobrar_numero(numero: float) -> str:
 # 4. Lista de ferramentas (adicione suas funções aqui)
 tools = [dobrar_numero]
 
-# 5. Configuração correta para thread_id
-config = {"configurable": {"thread_id": "main_thread"}}
+# 5. Configuração correta para thread_id (+ telemetria por nó/ferramenta/LLM com TELEMETRIA=1)
+config = com_telemetria({"configurable": {"thread_id": "main_thread"}})
 
 agent_executor = create_react_agent(
     model=model,
@@ -59,4 +62,10 @@ for message in result["messages"]:
 print(f"\n--- Informações detalhadas ---")
 print(f"Total de tokens: {result['messages'][-1].usage_metadata['total_tokens']}")
 print(f"Modelo usado: {result['messages'][-1].response_metadata['model_name']}")
-print(f"Resposta: {result['messages'][-1].content}")
\ No newline at end of file
+print(f"Resposta: {result['messages'][-1].content}")
+
+# Latência e tokens de cada nó, ferramenta e chamada ao LLM (não só da última mensagem)
+coletor = obter_coletor()
+if coletor:
+    print(f"\n--- Telemetria ---")
+    print(coletor.resumo())
\ No newline at end of file
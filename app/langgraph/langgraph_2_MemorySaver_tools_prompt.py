@@ -1,7 +1,9 @@
 import os
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
+from shared.fabrica_llm import obter_llm
+from shared.telemetria import com_telemetria, obter_coletor
+from checkpoint_sqlite import abrir_checkpointer
+from historico_resumido import HistoricoResumido, texto_da_mensagem
 from langchain_core.tools import tool
 from langgraph.prebuilt import create_react_agent
 
@@ -10,10 +12,12 @@ load_dotenv()
 api_key = os.getenv("OPENAI_API_KEY")
 
 # 2. Inicializa o modelo OpenAI
-model = ChatOpenAI(model="gpt-4", api_key=api_key)
+model = obter_llm(model="gpt-4", temperature=None, api_key=api_key)
 
-# 3. Cria o memory saver para guardar o histórico da conversa
-memory = MemorySaver()
+# 3. Cria o checkpointer para guardar o histórico da conversa em disco (SQLite),
+#    mantendo só os últimos checkpoints por thread. LANGGRAPH_CHECKPOINT_DB="" volta ao MemorySaver.
+caminho_checkpoints = os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints.db")
+memory = abrir_checkpointer(os.getenv("LANGGRAPH_CHECKPOINT_DB", caminho_checkpoints), manter_ultimos=20)
 
 # Prompt do sistema / estado inicial do agente
 # Agente criado com prompt mais detalhado orientando o uso da ferramenta
@@ -30,14 +34,37 @@ def dobrar_numero(numero: float) -> str:
 # 4. Lista de ferramentas (adicione suas funções aqui)
 tools = [dobrar_numero]
 
-# 5. Configuração correta para thread_id para manter contexto
-config = {"configurable": {"thread_id": "main_thread"}}
+# 5. Configuração correta para thread_id para manter contexto (+ telemetria com TELEMETRIA=1)
+config = com_telemetria({"configurable": {"thread_id": "main_thread"}})
+
+# Orçamento de tokens da thread: o que passar disso vira um resumo contínuo
+MAX_TOKENS_HISTORICO = 2000
+modelo_resumo = obter_llm(model="gpt-3.5-turbo", temperature=0)
+
+def resumir_com_llm(resumo, mensagens):
+    trecho = "\n".join(f"{mensagem.type}: {texto_da_mensagem(mensagem)}" for mensagem in mensagens)
+    prompt = f"""
+Atualize o resumo da conversa com as mensagens abaixo. Mantenha fatos, números e
+decisões importantes, em no máximo 10 linhas.
+
+Resumo atual:
+{resumo or "(vazio)"}
+
+Mensagens:
+{trecho}
+"""
+    return modelo_resumo.invoke(prompt).content
+
+# resumir_com_llm faz uma chamada extra (síncrona) nos turnos em que a thread é cortada;
+# resumir=None apenas descarta as mensagens antigas, sem custo
+historico = HistoricoResumido(max_tokens=MAX_TOKENS_HISTORICO, resumir=resumir_com_llm, prompt=system_prompt)
 
 # 6. Cria o agente com React Agent, memória e ferramentas
 agent_executor = create_react_agent(
     model=model,
     tools=tools,
-    state_modifier=system_prompt,  # Prompt inicial do agente
+    prompt=system_prompt,  # Prompt inicial do agente (state_modifier não existe mais e era ignorado)
+    pre_model_hook=historico,  # mantém a thread dentro do orçamento de tokens
     checkpointer=memory,
 )
 
@@ -55,15 +82,16 @@ def executar_fluxo_entrada(usuario_input: str):
     # 3. Atualiza prompt com a resposta
     resposta_agente = result["messages"][-1].content
 
-    # 4. Armazena tudo na memória (já feito pelo MemorySaver internamente)
+    # 4. Armazena tudo na memória (já feito pelo checkpointer internamente)
 
     # 5. Responde para o usuário
     print("\nResposta do agente:")
     print(resposta_agente)
 
-    # 6. Exibe a conversa completa (short-term memory)
-    print("\n--- Conversa completa ---")
-    for msg in result["messages"]:
+    # 6. Exibe as mensagens deste turno (a thread completa fica no checkpointer)
+    print("\n--- Mensagens do turno ---")
+    inicio_turno = max(i for i, msg in enumerate(result["messages"]) if msg.__class__.__name__ == "HumanMessage")
+    for msg in result["messages"][inicio_turno:]:
         if hasattr(msg, 'content'):
             tipo = "Usuário" if msg.__class__.__name__ == "HumanMessage" else "Agente"
             print(f"{tipo}: {msg.content}")
@@ -73,6 +101,11 @@ def executar_fluxo_entrada(usuario_input: str):
     print(f"Total de tokens usados: {result['messages'][-1].usage_metadata['total_tokens']}")
     print(f"Modelo usado: {result['messages'][-1].response_metadata['model_name']}")
 
+    coletor = obter_coletor()
+    if coletor:
+        print(f"\n--- Telemetria ---")
+        print(coletor.resumo())
+
 # Exemplo de execução:
 if __name__ == "__main__":
     executar_fluxo_entrada("Qual é o dobro de 8?")
@@ -1,4 +1,5 @@
-from langchain_openai import ChatOpenAI
+from shared.fabrica_llm import LLMPreguicoso
+from shared.telemetria import com_telemetria
 from langgraph.graph import StateGraph, END
 from dotenv import load_dotenv
 from typing import TypedDict
@@ -9,8 +10,8 @@ load_dotenv()  # Carrega variáveis de ambiente, como OPENAI_API_KEY
 class Estado(TypedDict):
     mensagem: str
 
-# Modelo LLM
-llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
+# Modelo LLM (construído na primeira chamada)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)
 
 # Função de transição
 def responder_mensagem(state: Estado) -> Estado:
@@ -31,9 +32,10 @@ builder.set_finish_point("responder")
 # Compila o grafo
 graph = builder.compile()
 
-# Executa com entrada inicial
-estado_inicial = {"mensagem": "quero saber sobre langgraph"}
-resultado = graph.invoke(estado_inicial)
+# Executa com entrada inicial (para muitas entradas: executor_lote.py langgraphv_3_graph:graph)
+if __name__ == "__main__":
+    estado_inicial = {"mensagem": "quero saber sobre langgraph"}
+    resultado = graph.invoke(estado_inicial, com_telemetria())  # TELEMETRIA=1 grava trace e métricas
 
-print("Resposta do fluxo:")
-print(resultado["mensagem"])
+    print("Resposta do fluxo:")
+    print(resultado["mensagem"])
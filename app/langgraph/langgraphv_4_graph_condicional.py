@@ -1,63 +1,101 @@
 from langgraph.graph import StateGraph, END
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
 import os
+from shared.fabrica_llm import LLMPreguicoso
+from shared.telemetria import com_telemetria
+import time
+from roteador_cascata import ClassificadorNgramas, RoteadorCascata
 
 load_dotenv()
-llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)  # construído na primeira chamada
 
-# Função 1: classifica o tipo de mensagem
+# Respostas prontas para intenções triviais (não precisam do LLM)
+RESPOSTAS_PRONTAS = {
+    "saudacao": "Olá! Em que posso te ajudar hoje?",
+    "despedida": "Até logo! Quando precisar, é só chamar.",
+    "agradecimento": "Por nada! Posso ajudar em mais alguma coisa?",
+    "ajuda": "Posso responder perguntas sobre LangChain, LangGraph e agentes de IA.",
+}
+
+# Camada 1: palavras-chave/regex (a mais barata, decide sozinha quando casa)
+REGRAS = {
+    "saudacao": [r"^\s*(oi+|ol[áa]|e a[íi]|eae|bom dia|boa tarde|boa noite)\b"],
+    "despedida": [r"\b(tchau|at[ée] (logo|mais|amanh[ãa]))\b"],
+    "agradecimento": [r"^\s*(muito )?(obrigad[oa]|valeu)\b"],
+}
+
+# Camada 2: classificador local treinado com app/langgraph/intencoes.tsv;
+# Camada 3: o LLM, só para o que ficar abaixo de CONFIANCA_MINIMA
+CONFIANCA_MINIMA = 0.6
+roteador = RoteadorCascata(
+    REGRAS,
+    ClassificadorNgramas.de_arquivo(os.path.join(os.path.dirname(os.path.abspath(__file__)), "intencoes.tsv")),
+    confianca_minima=CONFIANCA_MINIMA,
+)
+
+# Função 1: classifica o tipo de mensagem (regex -> classificador -> LLM)
 def classificar(state):
     mensagem = state["mensagem"]
-    if "oi" in mensagem.lower():
-        return {"tipo": "saudacao", "mensagem": mensagem}
-    else:
-        return {"tipo": "pergunta", "mensagem": mensagem}
+    tipo, camada, confianca = roteador.classificar(mensagem)
+    return {"tipo": tipo, "camada": camada, "mensagem": mensagem}
 
-# Função 2: responde a saudações
-def responder_saudacao(state):
-    return {"mensagem": "Olá! Em que posso te ajudar hoje?"}
+# Função 2: responde intenções triviais com a resposta pronta
+def responder_pronto(state):
+    return {"mensagem": RESPOSTAS_PRONTAS[state["tipo"]]}
 
 # Função 3: responde perguntas gerais usando o LLM
 def responder_pergunta(state):
     mensagem = state["mensagem"]
+    inicio = time.perf_counter()
     resposta = llm.invoke(f"Responda educadamente: {mensagem}")
+    roteador.registrar_tempo_llm(time.perf_counter() - inicio)
     return {"mensagem": resposta.content}
 
 # Montar o grafo
 builder = StateGraph(dict)  # schema é um dicionário simples
 
 builder.add_node("classificar", classificar)
-builder.add_node("saudacao", responder_saudacao)
+builder.add_node("pronto", responder_pronto)
 builder.add_node("resposta", responder_pergunta)
 
 # Condição para decidir o próximo passo
 builder.add_conditional_edges(
     "classificar",
-    lambda state: state["tipo"],
+    lambda state: "pronto" if state["tipo"] in RESPOSTAS_PRONTAS else "pergunta",
     {
-        "saudacao": "saudacao",
+        "pronto": "pronto",
         "pergunta": "resposta"
     }
 )
 
 # Fins do fluxo
 builder.set_entry_point("classificar")
-builder.set_finish_point("saudacao")
+builder.set_finish_point("pronto")
 builder.set_finish_point("resposta")
 
 graph = builder.compile()
 
-# Testar com duas mensagens diferentes
-entrada1 = {"mensagem": "Oi, tudo bem?"}
-entrada2 = {"mensagem": "O que é LangGraph?"}
+# Testar com mensagens diferentes (para muitas entradas: executor_lote.py langgraphv_4_graph_condicional:graph)
+if __name__ == "__main__":
+    entrada1 = {"mensagem": "Oi, tudo bem?"}
+    entrada2 = {"mensagem": "O que é LangGraph?"}
+    entrada3 = {"mensagem": "Brigado!"}  # nenhuma regex casa; o classificador local decide
+
+    config = com_telemetria()  # TELEMETRIA=1 grava trace e métricas por nó ao sair
+    print("Teste 1:", graph.invoke(entrada1, config)["mensagem"])
+    print("Teste 2:", graph.invoke(entrada2, config)["mensagem"])
+    print("Teste 3:", graph.invoke(entrada3, config)["mensagem"])
 
-print("Teste 1:", graph.invoke(entrada1)["mensagem"])
-print("Teste 2:", graph.invoke(entrada2)["mensagem"])
+    # Quanto do tráfego deixou de ir para o LLM e quanto custou cada camada
+    estatisticas = roteador.estatisticas()
+    print(f"\nDesvio do LLM: {estatisticas['taxa_desvio_llm']:.0%} de {estatisticas['total']} mensagens")
+    for camada, dados in estatisticas["camadas"].items():
+        print(f"  {camada:>13}: {dados['entradas']} entradas, {dados['latencia_media_ms']:.3f} ms em média")
 
 
 # Quando você chama:
 # graph.invoke({"mensagem": "Oi, tudo bem?"})
-# O grafo inicia no nó "classificar", que classifica a mensagem como "saudacao".
-# O fluxo segue para o nó "saudacao", que responde com a mensagem de saudação.
+# O grafo inicia no nó "classificar", que classifica a mensagem como "saudacao"
+# (pela regex; se nenhuma regra casar, pelo classificador local; só então pelo LLM).
+# O fluxo segue para o nó "pronto", que responde com a mensagem de saudação.
 # O fluxo termina, e a resposta é retornada.
\ No newline at end of file
@@ -0,0 +1,161 @@
+# Roteador em cascata para intenções simples
+#
+# Só o que não for resolvido pelas camadas baratas chega ao LLM:
+#   1. regex: tabela de palavras-chave/expressões compilada em uma única regex;
+#   2. classificador local: regressão logística sobre n-gramas de caracteres
+#      (hashing trick + NumPy), treinada a partir de um arquivo TSV rotulado;
+#   3. LLM: entradas com baixa confiança nas camadas anteriores.
+#
+# O roteador registra quantas entradas cada camada resolveu, o tempo gasto em
+# cada uma e a taxa de desvio do LLM.
+import re
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+
+CAMADA_REGEX = "regex"
+CAMADA_CLASSIFICADOR = "classificador"
+CAMADA_LLM = "llm"
+
+
+class ClassificadorNgramas:
+    """
+    Regressão logística multinomial sobre n-gramas de caracteres.
+
+    Os n-gramas são espalhados em `dimensao` posições via CRC32 (sem
+    vocabulário) e cada vetor é normalizado. O treino é por gradiente
+    descendente em lote, suficiente para alguns milhares de exemplos.
+    """
+    def __init__(self, dimensao=4096, ngramas=(2, 3, 4), epocas=300, taxa=2.0, regularizacao=1e-4):
+        self.dimensao = dimensao
+        self.ngramas = ngramas
+        self.epocas = epocas
+        self.taxa = taxa
+        self.regularizacao = regularizacao
+        self.rotulos = []
+        self._pesos = None
+        self._vies = None
+
+    def vetorizar(self, textos):
+        matriz = np.zeros((len(textos), self.dimensao), dtype=np.float32)
+        for linha, texto in enumerate(textos):
+            marcado = " " + " ".join(re.findall(r"\w+", texto.casefold())) + " "
+            for n in self.ngramas:
+                for i in range(len(marcado) - n + 1):
+                    matriz[linha, zlib.crc32(marcado[i:i + n].encode("utf-8")) % self.dimensao] += 1.0
+        normas = np.linalg.norm(matriz, axis=1, keepdims=True)
+        np.divide(matriz, normas, out=matriz, where=normas > 0)
+        return matriz
+
+    @staticmethod
+    def _softmax(pontuacoes):
+        pontuacoes = pontuacoes - pontuacoes.max(axis=1, keepdims=True)
+        np.exp(pontuacoes, out=pontuacoes)
+        return pontuacoes / pontuacoes.sum(axis=1, keepdims=True)
+
+    def treinar(self, textos, rotulos):
+        self.rotulos = sorted(set(rotulos))
+        indice = {rotulo: i for i, rotulo in enumerate(self.rotulos)}
+        x = self.vetorizar(textos)
+        y = np.zeros((len(textos), len(self.rotulos)), dtype=np.float32)
+        y[np.arange(len(textos)), [indice[rotulo] for rotulo in rotulos]] = 1.0
+
+        self._pesos = np.zeros((self.dimensao, len(self.rotulos)), dtype=np.float32)
+        self._vies = np.zeros(len(self.rotulos), dtype=np.float32)
+        for _ in range(self.epocas):
+            erro = (self._softmax(x @ self._pesos + self._vies) - y) / len(textos)
+            self._pesos -= self.taxa * (x.T @ erro + self.regularizacao * self._pesos)
+            self._vies -= self.taxa * erro.sum(axis=0)
+        return self
+
+    def prever(self, texto):
+        """
+        Devolve (rótulo, probabilidade) da classe mais provável.
+        """
+        probabilidades = self._softmax(self.vetorizar([texto]) @ self._pesos + self._vies)[0]
+        melhor = int(probabilidades.argmax())
+        return self.rotulos[melhor], float(probabilidades[melhor])
+
+    @classmethod
+    def de_arquivo(cls, caminho, **opcoes):
+        """
+        Treina a partir de um TSV "texto<TAB>intenção" (linhas com # são comentários).
+        """
+        textos, rotulos = [], []
+        with open(caminho, "r", encoding="utf-8") as f:
+            for linha in f:
+                if not linha.strip() or linha.startswith("#"):
+                    continue
+                texto, rotulo = linha.rstrip("\n").rsplit("\t", 1)
+                textos.append(texto)
+                rotulos.append(rotulo.strip())
+        return cls(**opcoes).treinar(textos, rotulos)
+
+
+class RoteadorCascata:
+    """
+    Classifica uma mensagem passando pelas camadas regex -> classificador -> LLM.
+
+    - regras: {intenção: [padrões regex]} (sem diferenciar maiúsculas).
+    - classificador: objeto com prever(texto) -> (intenção, probabilidade), ou None.
+    - confianca_minima: probabilidade mínima para aceitar o classificador.
+    - intencao_llm: intenção devolvida quando nenhuma camada barata decide.
+
+    classificar(texto) devolve (intenção, camada, confiança).
+    """
+    def __init__(self, regras, classificador=None, confianca_minima=0.6, intencao_llm="pergunta"):
+        self.classificador = classificador
+        self.confianca_minima = confianca_minima
+        self.intencao_llm = intencao_llm
+        self._intencoes = []
+        grupos = []
+        for intencao, padroes in regras.items():
+            for padrao in padroes:
+                grupos.append(f"(?P<_r{len(self._intencoes)}>{padrao})")
+                self._intencoes.append(intencao)
+        self._regex = re.compile("|".join(grupos), re.IGNORECASE) if grupos else None
+        self.contagem = Counter()
+        self.tempo = Counter()
+
+    def _registrar(self, camada, inicio):
+        self.contagem[camada] += 1
+        self.tempo[camada] += time.perf_counter() - inicio
+
+    def classificar(self, texto):
+        inicio = time.perf_counter()
+        if self._regex:
+            achado = self._regex.search(texto)
+            if achado:
+                self._registrar(CAMADA_REGEX, inicio)
+                return self._intencoes[int(achado.lastgroup[2:])], CAMADA_REGEX, 1.0
+
+        if self.classificador is not None:
+            intencao, confianca = self.classificador.prever(texto)
+            if confianca >= self.confianca_minima and intencao != self.intencao_llm:
+                self._registrar(CAMADA_CLASSIFICADOR, inicio)
+                return intencao, CAMADA_CLASSIFICADOR, confianca
+
+        self._registrar(CAMADA_LLM, inicio)
+        return self.intencao_llm, CAMADA_LLM, 0.0
+
+    def registrar_tempo_llm(self, segundos):
+        """
+        Soma à camada LLM o tempo da chamada feita por quem usa o roteador.
+        """
+        self.tempo[CAMADA_LLM] += segundos
+
+    def estatisticas(self):
+        total = sum(self.contagem.values())
+        return {
+            "total": total,
+            "taxa_desvio_llm": ((total - self.contagem[CAMADA_LLM]) / total) if total else 0.0,
+            "camadas": {
+                camada: {
+                    "entradas": self.contagem[camada],
+                    "latencia_media_ms": (self.tempo[camada] / self.contagem[camada] * 1e3) if self.contagem[camada] else 0.0,
+                }
+                for camada in (CAMADA_REGEX, CAMADA_CLASSIFICADOR, CAMADA_LLM)
+            },
+        }
@@ -1,4 +1,14 @@
-from setup_llm import llm
+import asyncio
+from setup_llm import llm, llmv1
+from autoconsistencia import AutoConsistencia
+
+# Modo: "autoconsistencia" amostra várias cadeias (llmv1, temperature 0.7) e vota
+# na resposta final; "unico" faz uma só chamada com temperature 0
+MODO_COT = "autoconsistencia"
+AMOSTRAS = 5          # máximo de cadeias (K)
+MAX_CONCORRENCIA = 3  # cadeias em paralelo; as que não começaram são canceladas ao decidir
+MARGEM = 2            # votos de vantagem para encerrar cedo
+EXTRATOR = "resposta_final"  # ver autoconsistencia.EXTRATORES
 
 prompt = """
 Resolva o seguinte problema passo a passo:
@@ -6,9 +16,25 @@ Resolva o seguinte problema passo a passo:
 Se João tem 3 maçãs e ganha mais 2 de Maria, quantas maçãs ele tem agora?
 """
 
-resposta = llm.invoke(prompt)
-print("Resposta:\n", resposta.content)
+
+async def amostrar(prompt):
+    resposta = await llmv1.ainvoke(prompt + "\nTermine com uma linha no formato 'Resposta final: <valor>'.")
+    uso = resposta.usage_metadata or {}
+    return resposta.content, uso.get("total_tokens", len(resposta.content) // 4)
+
+
+if MODO_COT == "autoconsistencia":
+    motor = AutoConsistencia(amostrar, extrair=EXTRATOR, amostras=AMOSTRAS, max_concorrencia=MAX_CONCORRENCIA, margem=MARGEM)
+    resultado = asyncio.run(motor.resolver(prompt))
+    print("Resposta:\n", resultado["cadeia"])
+    print(f"\nVotos: {resultado['votos']} -> {resultado['resposta']}")
+    print(f"Amostras usadas: {resultado['amostras_usadas']}/{AMOSTRAS} | tokens: {resultado['tokens']} | "
+          f"parada: {resultado['parada']} | {resultado['segundos']:.2f}s")
+else:
+    resposta = llm.invoke(prompt)
+    print("Resposta:\n", resposta.content)
 
 
 # Chain of Thought (Cadeia de Pensamento)
-# Essa técnica encoraja o modelo a pensar em etapas antes de responder.
\ No newline at end of file
+# Essa técnica encoraja o modelo a pensar em etapas antes de responder.
+# Autoconsistência: várias cadeias amostradas + votação na resposta final.
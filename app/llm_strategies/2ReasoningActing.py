@@ -1,16 +1,14 @@
 from setup_llm import llm
 from leitor_txt_tool import leitor_tool
-from langchain.agents import initialize_agent, AgentType
+from shared.agente_paralelo import AgenteParalelo
 
-agent = initialize_agent(
-    tools=[leitor_tool],
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True
-)
+# Function calling em vez de "Action:" em texto livre; chamadas independentes do
+# mesmo turno rodam em paralelo
+agent = AgenteParalelo(llm, [leitor_tool], max_passos=4, tempo_max=60, verbose=True)
 
 resposta = agent.invoke("O que é LangChain?")
-print("Resposta:\n", resposta)
+print("Resposta:\n", resposta["output"])
+print(f"Idas ao LLM: {resposta['passos']} | chamadas de ferramenta: {resposta['chamadas_ferramentas']}")
 
 
 # ReAct (Reasoning + Acting)
@@ -1,10 +1,11 @@
+from shared.cache_documentos import obter_documento
 from langchain.tools import Tool
 
 def ler_arquivo_txt(query: str):
-    with open("app/llm_strategies/info.txt", "r") as f:
-        texto = f.read()
-    if query.lower() in texto.lower():
-        return texto
+    # Documento em cache: texto e versão em minúsculas calculados uma vez por versão do arquivo
+    documento = obter_documento("app/llm_strategies/info.txt")
+    if documento.contem(query):
+        return documento.texto
     return "Não encontrei o termo no texto."
 
 leitor_tool = Tool(
@@ -1,9 +1,26 @@
 # langgraph_thought_tree.py
-from setup_llm import llm
+import asyncio
+import re
+import time
+from setup_llm import llm, llmv1
+from busca_arvore import BuscaEmFeixe, Orcamento
 from langgraph.graph import StateGraph, END
 from langchain_core.runnables import RunnableLambda
 from typing import TypedDict, List
 
+# Modo: "feixe" faz a busca em árvore (ramos em paralelo + poda por feixe);
+# "cadeia" é o fluxo original gerar -> analisar -> escolher;
+# "fluxo" é a mesma cadeia em streaming: cada ideia é analisada assim que sua
+# linha termina de ser gerada, enquanto o LLM ainda escreve as próximas
+MODO_ARVORE = "feixe"
+COMPARAR_COM_CADEIA = True  # no modo "fluxo", roda também a cadeia e compara as latências
+RAMOS = 3             # filhos gerados por nó (N)
+FEIXE = 2             # ramos mantidos por nível (B)
+PROFUNDIDADE = 3      # níveis da árvore
+MAX_CHAMADAS = 40     # orçamento de chamadas ao LLM (None = sem limite)
+MAX_TOKENS = 20000    # orçamento de tokens (None = sem limite)
+MAX_CONCORRENCIA = 6  # chamadas simultâneas ao LLM
+
 # 1. Define o esquema do estado (TypedDict é opcional, mas ajuda)
 class ThoughtState(TypedDict):
     problema: str
@@ -53,21 +70,213 @@ Com base nessa análise, escolha a melhor ideia entre as seguintes e justifique:
     state["melhor_ideia"] = resposta.content
     return state
 
-# Construir o grafo (passando o schema!)
-graph = StateGraph(ThoughtState)
+# ---------- Modo "feixe": busca em árvore ----------
+
+def tokens_da_resposta(resposta):
+    uso = getattr(resposta, "usage_metadata", None)
+    if uso:
+        return uso["total_tokens"]
+    return max(1, len(resposta.content) // 4)
+
+
+# Gera o próximo passo de um ramo (temperature 0.7 para ramos diferentes entre si)
+async def gerar_passo(problema, passos, indice):
+    anteriores = "\n".join(f"{i + 1}. {passo}" for i, passo in enumerate(passos)) or "(nenhum)"
+    prompt = f"""
+Problema: {problema}
+
+Passos já decididos:
+{anteriores}
+
+Proponha UM próximo passo concreto (variação {indice + 1} de {RAMOS}), em uma frase.
+"""
+    resposta = await llmv1.ainvoke(prompt)
+    return resposta.content, tokens_da_resposta(resposta)
+
+
+# Dá uma nota de 0 a 10 para o ramo (temperature 0: mesma entrada, mesma nota)
+async def avaliar_ramo(problema, passos):
+    ramo = "\n".join(f"{i + 1}. {passo}" for i, passo in enumerate(passos))
+    prompt = f"""
+Problema: {problema}
+
+Plano proposto:
+{ramo}
+
+Avalie o plano de 0 a 10 considerando prós e contras. Responda apenas com o número.
+"""
+    resposta = await llm.ainvoke(prompt)
+    nota = re.search(r"\d+(?:[.,]\d+)?", resposta.content)
+    return (float(nota.group().replace(",", ".")) if nota else 0.0), tokens_da_resposta(resposta)
+
+
+busca = BuscaEmFeixe(
+    gerar_passo,
+    avaliar_ramo,
+    ramos=RAMOS,
+    feixe=FEIXE,
+    max_concorrencia=MAX_CONCORRENCIA,
+    orcamento=Orcamento(max_chamadas=MAX_CHAMADAS, max_tokens=MAX_TOKENS),
+)
+
+
+class ArvoreState(TypedDict):
+    problema: str
+    fronteira: List[dict]
+    profundidade: int
+    parada: str
+    melhor_ideia: str
+
+
+# Nó: expande um nível inteiro da árvore em paralelo
+async def expandir_nivel(state: ArvoreState) -> ArvoreState:
+    fronteira = await busca.expandir_nivel(state["problema"], state["fronteira"])
+    if not fronteira:
+        return {"parada": "orcamento_chamadas"}
+    return {"fronteira": fronteira, "profundidade": state["profundidade"] + 1}
+
+
+# Aresta condicional: volta a expandir enquanto houver profundidade e orçamento
+def continuar(state: ArvoreState) -> str:
+    if state["parada"]:
+        return "escolher"
+    if state["profundidade"] >= PROFUNDIDADE:
+        return "escolher"
+    if busca.orcamento.motivo_parada:
+        return "escolher"
+    return "expandir"
+
+
+# Nó: o melhor ramo do feixe final é a resposta (sem chamada extra ao LLM)
+def escolher_melhor_ramo(state: ArvoreState) -> ArvoreState:
+    parada = state["parada"] or busca.orcamento.motivo_parada or "profundidade"
+    if not state["fronteira"]:
+        # O orçamento acabou antes do primeiro nível: não há ramo para escolher
+        return {"melhor_ideia": f"Sem resultado: nenhum ramo gerado (parada: {parada})", "parada": parada}
+    melhor = state["fronteira"][0]
+    passos = "\n".join(f"{i + 1}. {passo}" for i, passo in enumerate(melhor["passos"]))
+    return {"melhor_ideia": f"{passos}\n(nota {melhor['nota']:.1f}, parada: {parada})", "parada": parada}
+
+
+def executar_feixe():
+    graph = StateGraph(ArvoreState)
+    graph.add_node("expandir", expandir_nivel)
+    graph.add_node("escolher", RunnableLambda(escolher_melhor_ramo))
+    graph.set_entry_point("expandir")
+    graph.add_conditional_edges("expandir", continuar, {"expandir": "expandir", "escolher": "escolher"})
+    graph.add_edge("escolher", END)
+
+    app = graph.compile()
+    estado = {
+        "problema": initial_state["problema"],
+        "fronteira": [],
+        "profundidade": 0,
+        "parada": "",
+        "melhor_ideia": "",
+    }
+    final_state = asyncio.run(app.ainvoke(estado, {"recursion_limit": 2 * PROFUNDIDADE + 5}))
+    print(f"\n🌳 Busca: {final_state['profundidade']} níveis, {busca.orcamento.chamadas} chamadas, {busca.orcamento.tokens} tokens")
+    return final_state
+
+
+# ---------- Modo "fluxo": cadeia em streaming ----------
+
+# Consome o stream de tokens e devolve cada linha não vazia assim que ela termina
+async def linhas_em_fluxo(prompt):
+    pendente = ""
+    async for pedaco in llm.astream(prompt):
+        pendente += pedaco.content
+        *completas, pendente = pendente.split("\n")
+        for linha in completas:
+            if linha.strip():
+                yield linha.strip()
+    if pendente.strip():
+        yield pendente.strip()
+
+
+async def analisar_uma_ideia(ideia, metricas):
+    prompt = f"""
+Analise os prós e contras da ideia abaixo:
+
+{ideia}
+"""
+    resposta = await llm.ainvoke(prompt)
+    metricas.setdefault("primeiro_resultado", time.perf_counter())
+    return f"{ideia}\n{resposta.content}"
+
+
+# Nós 1+2 em pipeline: a análise de cada ideia começa durante a geração
+async def gerar_e_analisar_em_fluxo(state: ThoughtState, metricas) -> ThoughtState:
+    prompt = f"""
+Gere três ideias diferentes para resolver este problema, uma por linha:
+
+{state['problema']}
+"""
+    ideias, tarefas = [], []
+    async for ideia in linhas_em_fluxo(prompt):
+        ideias.append(ideia)
+        tarefas.append(asyncio.create_task(analisar_uma_ideia(ideia, metricas)))
+    analises = await asyncio.gather(*tarefas)
+    return {"ideias": ideias, "analise": "\n\n".join(analises)}
+
+
+def executar_fluxo():
+    metricas = {}
+
+    async def no_pipeline(state: ThoughtState) -> ThoughtState:
+        return await gerar_e_analisar_em_fluxo(state, metricas)
+
+    graph = StateGraph(ThoughtState)
+    graph.add_node("gerar_e_analisar", no_pipeline)
+    graph.add_node("escolher", RunnableLambda(escolher_melhor_ideia))
+    graph.set_entry_point("gerar_e_analisar")
+    graph.add_edge("gerar_e_analisar", "escolher")
+    graph.add_edge("escolher", END)
+
+    app = graph.compile()
+    inicio = time.perf_counter()
+    final_state = asyncio.run(app.ainvoke(dict(initial_state)))
+    total = time.perf_counter() - inicio
+    primeiro = metricas.get("primeiro_resultado", inicio + total) - inicio
+    return final_state, primeiro, total
+
+
+def executar_cadeia():
+    # Construir o grafo (passando o schema!)
+    graph = StateGraph(ThoughtState)
+
+    graph.add_node("gerar_ideias", RunnableLambda(gerar_ideias))
+    graph.add_node("analisar", RunnableLambda(analisar_ideias))
+    graph.add_node("escolher", RunnableLambda(escolher_melhor_ideia))
+
+    graph.set_entry_point("gerar_ideias")
+    graph.add_edge("gerar_ideias", "analisar")
+    graph.add_edge("analisar", "escolher")
+    graph.add_edge("escolher", END)
 
-graph.add_node("gerar_ideias", RunnableLambda(gerar_ideias))
-graph.add_node("analisar", RunnableLambda(analisar_ideias))
-graph.add_node("escolher", RunnableLambda(escolher_melhor_ideia))
+    # Compilar e rodar (primeiro resultado = fim da análise, que depende da geração completa)
+    app = graph.compile()
+    inicio = time.perf_counter()
+    final_state, primeiro = dict(initial_state), None
+    for atualizacao in app.stream(dict(initial_state), stream_mode="updates"):
+        for no, valores in atualizacao.items():
+            final_state.update(valores)
+            if no == "analisar":
+                primeiro = time.perf_counter() - inicio
+    total = time.perf_counter() - inicio
+    return final_state, primeiro, total
 
-graph.set_entry_point("gerar_ideias")
-graph.add_edge("gerar_ideias", "analisar")
-graph.add_edge("analisar", "escolher")
-graph.add_edge("escolher", END)
 
-# Compilar e rodar
-app = graph.compile()
-final_state = app.invoke(initial_state)
+if MODO_ARVORE == "feixe":
+    final_state = executar_feixe()
+elif MODO_ARVORE == "fluxo":
+    final_state, primeiro, total = executar_fluxo()
+    print(f"\n⏱️ fluxo:  primeiro resultado {primeiro:.2f}s | total {total:.2f}s")
+    if COMPARAR_COM_CADEIA:
+        _, primeiro_cadeia, total_cadeia = executar_cadeia()
+        print(f"⏱️ cadeia: primeiro resultado {primeiro_cadeia:.2f}s | total {total_cadeia:.2f}s")
+else:
+    final_state, _, _ = executar_cadeia()
 
 # Exibir resultado final
 print("\n🧠 Melhor ideia escolhida pelo LLM:")
@@ -0,0 +1,146 @@
+# Autoconsistência (self-consistency) para Chain of Thought
+#
+# Em vez de uma única cadeia de raciocínio com temperature=0, várias cadeias
+# são amostradas (temperature > 0) em paralelo e a resposta final extraída de
+# cada uma é votada. A votação para assim que a margem configurada é atingida
+# (ou quando o líder já não pode ser alcançado) e as requisições pendentes são
+# canceladas, então em média são usadas bem menos que K amostras.
+#
+# O módulo não depende do LLM: quem usa fornece
+#   amostrar(prompt) -> (texto, tokens usados)   (assíncrona)
+# e um extrator texto -> resposta normalizada (ou None se não achar).
+import asyncio
+import re
+import time
+from collections import Counter
+
+
+def extrair_numero(texto):
+    """
+    Último número do texto (ex.: "... então ele tem 5 maçãs." -> "5").
+    """
+    numeros = re.findall(r"-?\d+(?:[.,]\d+)?", texto)
+    if not numeros:
+        return None
+    valor = float(numeros[-1].replace(",", "."))
+    return str(int(valor)) if valor.is_integer() else str(valor)
+
+
+def extrair_resposta_final(texto):
+    """
+    Valor após "Resposta final:"; se o modelo não seguir o formato, usa o último número.
+    """
+    achado = re.search(r"resposta final\s*[:=]\s*(.+)", texto, re.IGNORECASE)
+    if not achado:
+        return extrair_numero(texto)
+    resposta = achado.group(1).strip().rstrip(".")
+    return extrair_numero(resposta) or resposta.casefold()
+
+
+def extrair_opcao(texto):
+    """
+    Letra de múltipla escolha (A-E) após "Resposta final:" ou a última isolada no texto.
+    """
+    achado = re.search(r"resposta final\s*[:=]\s*\(?([A-E])\b", texto, re.IGNORECASE)
+    if achado:
+        return achado.group(1).upper()
+    letras = re.findall(r"\b([A-E])\)", texto)
+    return letras[-1].upper() if letras else None
+
+
+def extrair_sim_nao(texto):
+    """
+    "sim"/"não" para problemas de lógica (última ocorrência no texto).
+    """
+    respostas = re.findall(r"\b(sim|não|nao|verdadeiro|falso)\b", texto, re.IGNORECASE)
+    if not respostas:
+        return None
+    return "sim" if respostas[-1].casefold() in ("sim", "verdadeiro") else "não"
+
+
+EXTRATORES = {
+    "numero": extrair_numero,
+    "resposta_final": extrair_resposta_final,
+    "opcao": extrair_opcao,
+    "sim_nao": extrair_sim_nao,
+}
+
+
+class AutoConsistencia:
+    """
+    Motor de amostragem com votação por maioria.
+
+    - amostras: número máximo de cadeias (K).
+    - max_concorrencia: cadeias em voo ao mesmo tempo.
+    - margem: votos de vantagem do líder sobre o segundo para parar cedo.
+    - extrair: função ou nome em EXTRATORES.
+    """
+    def __init__(self, amostrar, extrair="resposta_final", amostras=5, max_concorrencia=5, margem=2):
+        self.amostrar = amostrar
+        self.extrair = EXTRATORES[extrair] if isinstance(extrair, str) else extrair
+        self.amostras = amostras
+        self.max_concorrencia = max_concorrencia
+        self.margem = margem
+
+    def _decidido(self, votos, restantes):
+        ranking = votos.most_common(2)
+        if not ranking:
+            return False
+        lider = ranking[0][1]
+        segundo = ranking[1][1] if len(ranking) > 1 else 0
+        # Para com a margem atingida ou quando as amostras restantes não mudam o líder
+        return lider - segundo >= self.margem or lider - segundo > restantes
+
+    async def resolver(self, prompt):
+        """
+        Amostra cadeias até decidir a resposta. Devolve um dict com a resposta,
+        os votos, uma cadeia que a justifica e estatísticas da execução.
+        """
+        inicio = time.perf_counter()
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+
+        async def uma_amostra():
+            async with semaforo:
+                return await self.amostrar(prompt)
+
+        pendentes = {asyncio.create_task(uma_amostra()) for _ in range(self.amostras)}
+        votos = Counter()
+        cadeias = {}
+        concluidas = 0
+        tokens = 0
+        invalidas = 0
+        parada = "todas_amostras"
+        try:
+            while pendentes:
+                prontas, pendentes = await asyncio.wait(pendentes, return_when=asyncio.FIRST_COMPLETED)
+                for tarefa in prontas:
+                    concluidas += 1
+                    texto, usados = tarefa.result()
+                    tokens += usados
+                    resposta = self.extrair(texto)
+                    if resposta is None:
+                        invalidas += 1
+                        continue
+                    votos[resposta] += 1
+                    cadeias.setdefault(resposta, texto)
+                if pendentes and self._decidido(votos, len(pendentes)):
+                    parada = "margem"
+                    break
+        finally:
+            for tarefa in pendentes:
+                tarefa.cancel()
+            if pendentes:
+                await asyncio.gather(*pendentes, return_exceptions=True)
+
+        resposta = votos.most_common(1)[0][0] if votos else None
+        return {
+            "resposta": resposta,
+            "cadeia": cadeias.get(resposta),
+            "votos": dict(votos),
+            "amostras_usadas": concluidas,
+            "canceladas": len(pendentes) if parada == "margem" else 0,
+            "invalidas": invalidas,
+            "tokens": tokens,
+            "parada": parada,
+            "segundos": time.perf_counter() - inicio,
+        }
@@ -0,0 +1,128 @@
+# Busca em árvore com feixe (beam search) para Tree of Thoughts
+#
+# Cada nível da árvore expande todos os ramos do feixe ao mesmo tempo:
+# os N filhos de cada ramo são gerados e avaliados em paralelo (cada filho é
+# avaliado assim que é gerado), e só os B melhores seguem para o próximo
+# nível. Assim o tempo total cresce com a profundidade, não com o número de
+# ramos. Orçamentos de chamadas e de tokens encerram a busca mais cedo.
+#
+# O módulo não depende do LLM: quem usa fornece duas funções assíncronas
+#   gerar(problema, passos, indice) -> (texto do próximo passo, tokens usados)
+#   avaliar(problema, passos)       -> (nota, tokens usados)
+import asyncio
+import time
+
+
+class Orcamento:
+    """
+    Limites de chamadas e de tokens compartilhados por toda a busca (None = sem limite).
+
+    As chamadas são reservadas antes de disparar um nível, então o limite de
+    chamadas nunca é ultrapassado. Os tokens só são conhecidos depois das
+    respostas: o limite de tokens é verificado entre níveis.
+    """
+    def __init__(self, max_chamadas=None, max_tokens=None):
+        self.max_chamadas = max_chamadas
+        self.max_tokens = max_tokens
+        self.chamadas = 0
+        self.tokens = 0
+
+    def reservar(self, quantidade, custo=1):
+        """
+        Reserva até `quantidade` unidades de `custo` chamadas cada e devolve
+        quantas unidades foram concedidas.
+        """
+        if self.max_chamadas is not None:
+            quantidade = max(0, min(quantidade, (self.max_chamadas - self.chamadas) // custo))
+        self.chamadas += quantidade * custo
+        return quantidade
+
+    def registrar_tokens(self, tokens):
+        self.tokens += tokens
+
+    @property
+    def motivo_parada(self):
+        if self.max_chamadas is not None and self.chamadas >= self.max_chamadas:
+            return "orcamento_chamadas"
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return "orcamento_tokens"
+        return None
+
+
+class BuscaEmFeixe:
+    """
+    Tree of Thoughts com expansão paralela e poda por feixe.
+
+    - ramos: filhos gerados por nó a cada nível (N).
+    - feixe: ramos mantidos por nível (B).
+    - max_concorrencia: chamadas ao LLM em voo ao mesmo tempo.
+
+    Um ramo é um dict {"passos": [...], "nota": float}.
+    """
+    def __init__(self, gerar, avaliar, ramos=3, feixe=2, max_concorrencia=6, orcamento=None):
+        self.gerar = gerar
+        self.avaliar = avaliar
+        self.ramos = ramos
+        self.feixe = feixe
+        self.max_concorrencia = max_concorrencia
+        self.orcamento = orcamento or Orcamento()
+
+    async def _filho(self, problema, pai, indice, semaforo):
+        async with semaforo:
+            passo, tokens = await self.gerar(problema, pai["passos"], indice)
+        self.orcamento.registrar_tokens(tokens)
+        passos = pai["passos"] + [passo.strip()]
+        async with semaforo:
+            nota, tokens = await self.avaliar(problema, passos)
+        self.orcamento.registrar_tokens(tokens)
+        return {"passos": passos, "nota": nota}
+
+    async def expandir_nivel(self, problema, fronteira):
+        """
+        Expande um nível: gera e avalia os filhos de todos os ramos em
+        paralelo e devolve os `feixe` melhores (maior nota primeiro).
+        Cada filho custa 2 chamadas; filhos sem orçamento não são gerados.
+        """
+        fronteira = fronteira or [{"passos": [], "nota": 0.0}]
+        pedidos = [(pai, indice) for pai in fronteira for indice in range(self.ramos)]
+        pedidos = pedidos[:self.orcamento.reservar(len(pedidos), custo=2)]
+        if not pedidos:
+            return []
+
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        filhos = await asyncio.gather(*(self._filho(problema, pai, indice, semaforo) for pai, indice in pedidos))
+        filhos.sort(key=lambda ramo: ramo["nota"], reverse=True)
+        return filhos[:self.feixe]
+
+    async def buscar(self, problema, profundidade=3):
+        """
+        Executa a busca até `profundidade` níveis ou até o orçamento acabar.
+        Devolve o melhor ramo, o feixe final e estatísticas da execução.
+        """
+        inicio = time.perf_counter()
+        fronteira = []
+        niveis = 0
+        parada = "profundidade"
+        while niveis < profundidade:
+            parada = self.orcamento.motivo_parada
+            if parada:
+                break
+            proxima = await self.expandir_nivel(problema, fronteira)
+            if not proxima:
+                # Fronteira nunca é vazia: só falta ramo quando o orçamento não cobre nenhum filho
+                parada = "orcamento_chamadas"
+                break
+            fronteira = proxima
+            niveis += 1
+        else:
+            parada = "profundidade"
+
+        return {
+            "melhor": fronteira[0] if fronteira else None,
+            "feixe": fronteira,
+            "niveis": niveis,
+            "chamadas": self.orcamento.chamadas,
+            "tokens": self.orcamento.tokens,
+            "parada": parada,
+            "segundos": time.perf_counter() - inicio,
+        }
@@ -0,0 +1,182 @@
+# Cache de respostas do LLM (LRU em memória + SQLite em disco)
+#
+# Prompts repetidos com temperature=0 devolvem sempre a mesma resposta, então
+# não precisam ir à API de novo. A chave combina o modelo e seus parâmetros
+# (llm_string do LangChain) com as mensagens normalizadas.
+#
+# O arquivo SQLite só é aberto na primeira consulta/gravação (importar um
+# script que declara o cache não cria nem trava o arquivo), e as gravações
+# são confirmadas em lotes de `tamanho_lote`, como em ArmazenamentoSQLite.
+import atexit
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import warnings
+from collections import OrderedDict
+
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+
+def normalizar_prompt(prompt):
+    """
+    Normaliza as mensagens serializadas pelo LangChain: remove ids e metadados
+    de execução e espaços em branco nas bordas dos textos, para que prompts
+    equivalentes gerem a mesma chave. Espaços internos são mantidos: quebras de
+    linha e indentação (código, listas) mudam o que o modelo recebe.
+    """
+    try:
+        mensagens = json.loads(prompt)
+    except ValueError:
+        return prompt.strip()
+
+    def limpar(valor):
+        if isinstance(valor, dict):
+            return {
+                chave: limpar(item) for chave, item in valor.items()
+                if chave not in ("id", "response_metadata", "usage_metadata")
+            }
+        if isinstance(valor, list):
+            return [limpar(item) for item in valor]
+        if isinstance(valor, str):
+            return valor.strip()
+        return valor
+
+    return json.dumps(limpar(mensagens), sort_keys=True, ensure_ascii=False)
+
+
+class CacheRespostasLLM(BaseCache):
+    """
+    Cache de duas camadas para modelos LangChain (use em ChatOpenAI(cache=...)).
+
+    - Memória: LRU limitado a `max_itens_memoria` respostas.
+    - Disco: SQLite, compartilhado entre execuções e scripts; aberto no
+      primeiro uso, com COMMIT a cada `tamanho_lote` gravações, em flush() /
+      fechar() ou na saída do processo.
+    - Contadores: acertos (memória/disco), falhas e bytes lidos/gravados.
+    """
+    def __init__(self, caminho, max_itens_memoria=1024, tamanho_lote=32):
+        self.caminho = caminho
+        self.max_itens_memoria = max_itens_memoria
+        self.tamanho_lote = tamanho_lote
+        self._memoria = OrderedDict()
+        self._trava = threading.RLock()
+        self._conexao = None
+        self._pendentes = 0
+        self.acertos_memoria = 0
+        self.acertos_disco = 0
+        self.falhas = 0
+        self.bytes_lidos = 0
+        self.bytes_gravados = 0
+
+    def _abrir(self):
+        # Chamado com a trava adquirida
+        if self._conexao is None:
+            self._conexao = sqlite3.connect(self.caminho, check_same_thread=False, isolation_level=None)
+            self._conexao.execute("PRAGMA journal_mode = WAL")
+            self._conexao.execute("PRAGMA synchronous = NORMAL")
+            self._conexao.execute("CREATE TABLE IF NOT EXISTS respostas (chave TEXT PRIMARY KEY, valor TEXT NOT NULL)")
+            atexit.register(self.fechar)
+        return self._conexao
+
+    @staticmethod
+    def _chave(prompt, llm_string):
+        conteudo = f"{llm_string}\x00{normalizar_prompt(prompt)}"
+        return hashlib.sha256(conteudo.encode("utf-8")).hexdigest()
+
+    def _guardar_na_memoria(self, chave, valor):
+        self._memoria[chave] = valor
+        self._memoria.move_to_end(chave)
+        while len(self._memoria) > self.max_itens_memoria:
+            self._memoria.popitem(last=False)
+
+    def lookup(self, prompt, llm_string):
+        chave = self._chave(prompt, llm_string)
+        with self._trava:
+            valor = self._memoria.get(chave)
+            if valor is not None:
+                self._memoria.move_to_end(chave)
+                self.acertos_memoria += 1
+                return valor
+
+            linha = self._abrir().execute("SELECT valor FROM respostas WHERE chave = ?", (chave,)).fetchone()
+            if linha is None:
+                self.falhas += 1
+                return None
+            with warnings.catch_warnings():
+                # loads é marcado como beta no langchain_core; o aviso sairia a cada acerto em disco
+                warnings.filterwarnings("ignore", message=r"The function `loads` is in beta")
+                valor = loads(linha[0])
+            self.acertos_disco += 1
+            self.bytes_lidos += len(linha[0].encode("utf-8"))
+            self._guardar_na_memoria(chave, valor)
+            return valor
+
+    def update(self, prompt, llm_string, return_val):
+        chave = self._chave(prompt, llm_string)
+        serializado = dumps(list(return_val))
+        with self._trava:
+            conexao = self._abrir()
+            if not conexao.in_transaction:
+                conexao.execute("BEGIN")
+            conexao.execute("INSERT OR REPLACE INTO respostas (chave, valor) VALUES (?, ?)", (chave, serializado))
+            self.bytes_gravados += len(serializado.encode("utf-8"))
+            self._guardar_na_memoria(chave, list(return_val))
+            self._pendentes += 1
+            if self._pendentes >= self.tamanho_lote:
+                self.flush()
+
+    def clear(self, **kwargs):
+        with self._trava:
+            self._memoria.clear()
+            conexao = self._abrir()
+            if not conexao.in_transaction:
+                conexao.execute("BEGIN")
+            conexao.execute("DELETE FROM respostas")
+            self.flush()
+
+    def flush(self):
+        """
+        Confirma (COMMIT) o lote de gravações pendentes.
+        """
+        with self._trava:
+            if self._conexao is not None and self._conexao.in_transaction:
+                self._conexao.execute("COMMIT")
+            self._pendentes = 0
+
+    def fechar(self):
+        with self._trava:
+            if self._conexao is None:
+                return
+            self.flush()
+            self._conexao.close()
+            self._conexao = None
+
+    def estatisticas(self):
+        consultas = self.acertos_memoria + self.acertos_disco + self.falhas
+        return {
+            "acertos_memoria": self.acertos_memoria,
+            "acertos_disco": self.acertos_disco,
+            "falhas": self.falhas,
+            "taxa_acerto": ((self.acertos_memoria + self.acertos_disco) / consultas) if consultas else 0.0,
+            "bytes_lidos": self.bytes_lidos,
+            "bytes_gravados": self.bytes_gravados,
+            "itens_memoria": len(self._memoria),
+        }
+
+
+def cache_para(cache, temperature, permitir_amostragem=False):
+    """
+    Devolve o cache apenas para chamadas determinísticas (temperature == 0).
+    Com temperature > 0 a resposta varia de propósito, então o cache só é
+    usado se `permitir_amostragem` for ligado explicitamente.
+    """
+    if temperature == 0 or permitir_amostragem:
+        return cache
+    return None
+
+
+def caminho_padrao():
+    return os.getenv("LLM_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache_llm.db"))
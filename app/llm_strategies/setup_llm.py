@@ -1,13 +1,21 @@
-from langchain_openai import ChatOpenAI
 from dotenv import load_dotenv
+from cache_llm import CacheRespostasLLM, cache_para, caminho_padrao
 import os
+from shared.fabrica_llm import LLMPreguicoso
 
 load_dotenv()
 
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+# Cache compartilhado de respostas (LRU em memória + SQLite em disco, aberto na primeira chamada).
+# Só vale para temperature=0, a menos que LLM_CACHE_AMOSTRAGEM=1.
+cache_respostas = CacheRespostasLLM(caminho_padrao())
+cache_amostragem = os.getenv("LLM_CACHE_AMOSTRAGEM") == "1"
 
+# Modelos criados só no primeiro uso, sobre o pool HTTP compartilhado (app/shared/fabrica_llm.py)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0, cache=cache_para(cache_respostas, 0))
 
-llmv1 = ChatOpenAI(
+
+llmv1 = LLMPreguicoso(
     model="gpt-3.5-turbo",
-    temperature=0.7
-)
\ No newline at end of file
+    temperature=0.7,
+    cache=cache_para(cache_respostas, 0.7, permitir_amostragem=cache_amostragem)
+)
@@ -1,12 +1,12 @@
 from dotenv import load_dotenv
 import os
-from langchain_openai import ChatOpenAI
+from shared.fabrica_llm import LLMPreguicoso
 
 # Carrega as variáveis do .env
 load_dotenv()
 
-# Inicializa o modelo com a chave já presente no ambiente
-llm = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
+# Modelo com a chave já presente no ambiente (construído na primeira chamada)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)
 
 # Faz uma pergunta
 pergunta = "O que é LangChain?"
@@ -0,0 +1,190 @@
+# Execução de ferramentas como um DAG de dependências
+#
+# No agente ReAct cada ferramenta custa uma ida e volta ao LLM, em sequência,
+# mesmo quando as ferramentas não dependem umas das outras. Aqui as
+# dependências são declaradas e o fluxo fica:
+#
+#   1. uma chamada de planejamento: o LLM escolhe quais ferramentas usar;
+#   2. as ferramentas rodam sem LLM, cada uma assim que suas dependências
+#      terminam (as independentes em paralelo);
+#   3. uma chamada de síntese monta a resposta final com os resultados.
+#
+# Duas idas e voltas ao LLM, independentemente do número de ferramentas.
+#
+# O módulo não depende do LLM: quem usa fornece as funções assíncronas
+#   planejar(prompt) -> texto      e      sintetizar(prompt) -> texto
+# As ferramentas são Tools do LangChain (ou qualquer objeto com ainvoke(str)) ou
+# funções de um argumento, síncronas ou assíncronas.
+import asyncio
+import inspect
+import json
+import re
+import time
+
+
+class GrafoDeFerramentas:
+    """
+    Ferramentas e suas dependências.
+
+    Cada ferramenta recebe um texto: o pedido do usuário seguido dos resultados
+    das ferramentas de que depende (o mesmo formato de entrada de uma Tool).
+    """
+    def __init__(self):
+        self.ferramentas = {}
+        self.descricoes = {}
+        self.dependencias = {}
+
+    def adicionar(self, nome, ferramenta, depende_de=(), descricao=""):
+        self.ferramentas[nome] = ferramenta
+        self.descricoes[nome] = descricao or getattr(ferramenta, "description", "")
+        self.dependencias[nome] = tuple(depende_de)
+        return self
+
+    @classmethod
+    def de_tools(cls, tools, dependencias=None):
+        """
+        Monta o grafo a partir de Tools do LangChain; dependencias = {nome: [nomes]}.
+        """
+        grafo = cls()
+        dependencias = dependencias or {}
+        for tool in tools:
+            grafo.adicionar(tool.name, tool, dependencias.get(tool.name, ()), tool.description)
+        return grafo
+
+    def fechamento(self, nomes):
+        """
+        As ferramentas pedidas mais todas as dependências (transitivas), em ordem
+        topológica. Levanta ValueError para nomes desconhecidos ou ciclos.
+        """
+        ordem, visitando, visitadas = [], set(), set()
+
+        def visitar(nome):
+            if nome in visitadas:
+                return
+            if nome not in self.ferramentas:
+                raise ValueError(f"Ferramenta desconhecida: {nome}")
+            if nome in visitando:
+                raise ValueError(f"Ciclo de dependências em {nome}")
+            visitando.add(nome)
+            for dependencia in self.dependencias[nome]:
+                visitar(dependencia)
+            visitando.discard(nome)
+            visitadas.add(nome)
+            ordem.append(nome)
+
+        for nome in nomes:
+            visitar(nome)
+        return ordem
+
+    async def _chamar(self, nome, entrada):
+        ferramenta = self.ferramentas[nome]
+        if hasattr(ferramenta, "ainvoke"):
+            return await ferramenta.ainvoke(entrada)
+        if inspect.iscoroutinefunction(ferramenta):
+            return await ferramenta(entrada)
+        return await asyncio.to_thread(ferramenta, entrada)
+
+    async def executar(self, pedido, nomes=None):
+        """
+        Executa as ferramentas pedidas (padrão: todas) e suas dependências, cada
+        uma assim que as dependências terminam. Devolve {"resultados", "tempos", "segundos"};
+        uma ferramenta que falha vira "Erro: ..." e as dependentes recebem esse texto.
+        """
+        ordem = self.fechamento(self.ferramentas if nomes is None else nomes)
+        tarefas, resultados, tempos = {}, {}, {}
+        inicio = time.perf_counter()
+
+        async def executar_uma(nome):
+            for dependencia in self.dependencias[nome]:
+                await tarefas[dependencia]
+            entrada = pedido + "".join(
+                f"\n\n{dependencia}: {resultados[dependencia]}" for dependencia in self.dependencias[nome]
+            )
+            comeco = time.perf_counter()
+            try:
+                resultados[nome] = await self._chamar(nome, entrada)
+            except Exception as erro:
+                resultados[nome] = f"Erro: {type(erro).__name__}: {erro}"
+            tempos[nome] = (comeco - inicio, time.perf_counter() - inicio)
+
+        # A ordem topológica garante que a tarefa de cada dependência já existe
+        for nome in ordem:
+            tarefas[nome] = asyncio.create_task(executar_uma(nome))
+        await asyncio.gather(*tarefas.values())
+        return {
+            "resultados": {nome: resultados[nome] for nome in ordem},
+            "tempos": tempos,
+            "segundos": time.perf_counter() - inicio,
+        }
+
+    def descrever(self):
+        linhas = []
+        for nome, descricao in self.descricoes.items():
+            dependencias = self.dependencias[nome]
+            sufixo = f" (usa o resultado de: {', '.join(dependencias)})" if dependencias else ""
+            linhas.append(f"- {nome}: {descricao}{sufixo}")
+        return "\n".join(linhas)
+
+
+def extrair_lista_ferramentas(texto, nomes_validos):
+    """
+    Lê a lista de ferramentas da resposta do planejamento: um array JSON
+    (ou {"ferramentas": [...]}) ou, em último caso, os nomes citados no texto.
+    """
+    achado = re.search(r"\{.*\}|\[.*\]", texto, re.DOTALL)
+    if achado:
+        try:
+            valor = json.loads(achado.group(0))
+            if isinstance(valor, dict):
+                valor = valor.get("ferramentas", [])
+            return [nome for nome in valor if nome in nomes_validos]
+        except (json.JSONDecodeError, TypeError):
+            pass
+    return [nome for nome in nomes_validos if nome in texto]
+
+
+class OrquestradorDAG:
+    """
+    Planejamento -> DAG de ferramentas -> síntese, com duas chamadas ao LLM.
+
+    - planejar(prompt) / sintetizar(prompt): funções assíncronas que devolvem texto.
+    - Se o planejamento não escolher nenhuma ferramenta válida, todas rodam.
+    """
+    PROMPT_PLANO = """Você coordena as ferramentas abaixo para atender o pedido do usuário.
+
+Ferramentas:
+{ferramentas}
+
+Pedido: {pedido}
+
+Responda somente com um array JSON com os nomes das ferramentas necessárias, por exemplo ["A", "B"].
+As dependências de cada ferramenta são executadas automaticamente."""
+
+    PROMPT_SINTESE = """Pedido do usuário: {pedido}
+
+Resultados das ferramentas:
+{resultados}
+
+Com base apenas nesses resultados, escreva a resposta final para o usuário."""
+
+    def __init__(self, grafo, planejar, sintetizar=None):
+        self.grafo = grafo
+        self.planejar = planejar
+        self.sintetizar = sintetizar or planejar
+
+    async def executar(self, pedido):
+        inicio = time.perf_counter()
+        plano = await self.planejar(self.PROMPT_PLANO.format(ferramentas=self.grafo.descrever(), pedido=pedido))
+        escolhidas = extrair_lista_ferramentas(plano, list(self.grafo.ferramentas)) or list(self.grafo.ferramentas)
+
+        execucao = await self.grafo.executar(pedido, escolhidas)
+        resultados = "\n".join(f"- {nome}: {resultado}" for nome, resultado in execucao["resultados"].items())
+        resposta = await self.sintetizar(self.PROMPT_SINTESE.format(pedido=pedido, resultados=resultados))
+        return {
+            "resposta": resposta,
+            "escolhidas": escolhidas,
+            "resultados": execucao["resultados"],
+            "tempos": execucao["tempos"],
+            "chamadas_llm": 2,
+            "segundos": time.perf_counter() - inicio,
+        }
@@ -1,14 +1,33 @@
+import asyncio
 import os
+from shared.fabrica_llm import LLMPreguicoso
+from shared.memo_ferramentas import memo_da_tool, memoizar_tools
+from shared.agente_paralelo import AgenteParalelo
+from dag_ferramentas import GrafoDeFerramentas, OrquestradorDAG
 from dotenv import load_dotenv
-from langchain.agents import initialize_agent, AgentType, Tool
-from langchain.chat_models import ChatOpenAI
-from langchain.agents.agent import AgentExecutor
+from langchain.agents import Tool
 from langchain.schema import SystemMessage, HumanMessage
 
 load_dotenv()
 
-# Modelo base
-llm = ChatOpenAI(temperature=0, model="gpt-3.5-turbo")
+# Modo: "dag" = 1 chamada de planejamento + ferramentas em paralelo conforme as
+# dependências + 1 chamada de síntese; "agente" = agente com function calling
+# (o modelo decide a cada turno; chamadas independentes do turno rodam em paralelo)
+MODO_ORQUESTRACAO = "dag"
+
+# Dependências entre as ferramentas: voos e hotel só precisam do plano
+DEPENDENCIAS = {
+    "BuscaVoos": ["PlanejadorDeViagem"],
+    "BuscaHotel": ["PlanejadorDeViagem"],
+}
+
+# Resultados das ferramentas ficam em cache (segundos) pela entrada normalizada;
+# chamadas idênticas simultâneas compartilham uma única execução
+TTL_FERRAMENTAS = 600
+TTL_POR_FERRAMENTA = {"BuscaVoos": 120}  # preços de voo mudam mais rápido
+
+# Modelo base (langchain_openai, pool HTTP compartilhado)
+llm = LLMPreguicoso(model="gpt-3.5-turbo", temperature=0)  # construído na primeira chamada
 
 # ---------- FERRAMENTAS (AGENTES FUNCIONAIS) ----------
 
@@ -21,8 +40,8 @@ def buscar_voos(_):
 def buscar_hotel(_):
     return "Hotel Solar do Castelo, 7 diárias por R$1700"
 
-# Criar ferramentas como agentes
-tools = [
+# Criar ferramentas como agentes (memoizadas com TTL e coalescência)
+tools = memoizar_tools([
     Tool(
         name="PlanejadorDeViagem",
         func=planejar_viagem,
@@ -38,17 +57,33 @@ tools = [
         func=buscar_hotel,
         description="Sugere hotel baseado no plano e orçamento"
     ),
-]
+], ttl=TTL_FERRAMENTAS, ttl_por_tool=TTL_POR_FERRAMENTA)
+
+pedido = "Quero planejar uma viagem em dezembro"
+
+# ---------- ORQUESTRADOR EM DAG ----------
+
+async def chamar_llm(prompt):
+    return (await llm.ainvoke(prompt)).content
+
+if MODO_ORQUESTRACAO == "dag":
+    orquestrador = OrquestradorDAG(GrafoDeFerramentas.de_tools(tools, DEPENDENCIAS), chamar_llm)
+    resultado = asyncio.run(orquestrador.executar(pedido))
+    for nome, (inicio, fim) in resultado["tempos"].items():
+        print(f"{nome}: {inicio * 1e3:.0f} -> {fim * 1e3:.0f} ms")
+    print(f"Ferramentas escolhidas: {resultado['escolhidas']} | chamadas ao LLM: {resultado['chamadas_llm']} "
+          f"| {resultado['segundos']:.2f}s")
+    print("\n🧳 Plano de viagem final:\n", resultado["resposta"])
 
 # ---------- AGENTE ORQUESTRADOR ----------
 
-orquestrador = initialize_agent(
-    tools=tools,
-    llm=llm,
-    agent=AgentType.ZERO_SHOT_REACT_DESCRIPTION,
-    verbose=True
-)
+else:
+    orquestrador = AgenteParalelo(llm, tools, max_passos=5, tempo_max=90, verbose=True)
+
+    # Execução orquestrada
+    resultado = orquestrador.invoke(pedido)
+    print(f"Idas ao LLM: {resultado['passos']} | chamadas de ferramenta: {resultado['chamadas_ferramentas']}")
+    print("\n🧳 Plano de viagem final:\n", resultado["output"])
 
-# Execução orquestrada
-resposta = orquestrador.run("Quero planejar uma viagem em dezembro")
-print("\n🧳 Plano de viagem final:\n", resposta)
+for tool in tools:
+    print(f"Cache {tool.name}: {memo_da_tool(tool).estatisticas()}")
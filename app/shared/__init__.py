@@ -0,0 +1,4 @@
+# Utilitários compartilhados entre os exemplos de app/
+#
+# Os scripts que importam daqui rodam pelo app/executar.py, que põe app/ no
+# sys.path: python app/executar.py <pasta>/<script>.py [argumentos...]
@@ -0,0 +1,133 @@
+# Agente com chamada de ferramentas nativa (function calling) e execução paralela
+#
+# O agente ZERO_SHOT_REACT_DESCRIPTION (initialize_agent) faz o modelo escrever
+# linhas "Action: ..." em texto livre, que são interpretadas por regex, e executa
+# uma ferramenta por ida e volta ao LLM. Aqui:
+#
+# - as ferramentas vão para o modelo como funções (bind_tools) e as chamadas
+#   voltam estruturadas, sem parsing de texto;
+# - todas as chamadas de ferramenta de um mesmo turno do modelo rodam em
+#   paralelo (com limite de concorrência), e os resultados voltam juntos;
+# - orçamentos de passos (chamadas ao modelo) e de tempo encerram o laço: no
+#   último passo o modelo é chamado com tool_choice="none" e precisa responder.
+#
+# Substitui initialize_agent(...).invoke/run: invoke(pergunta) devolve
+# {"input", "output", ...} e run(pergunta) devolve só o texto da resposta.
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+
+PROMPT_PADRAO = (
+    "Use as ferramentas quando precisar de informações que não tem. Se várias chamadas "
+    "forem independentes entre si, faça todas no mesmo turno, em paralelo."
+)
+
+
+class AgenteParalelo:
+    """
+    Laço modelo -> ferramentas em paralelo -> modelo, até uma resposta sem tool_calls.
+
+    - llm: chat model com bind_tools (ChatOpenAI, LLMPreguicoso...); as
+      ferramentas são ligadas ao modelo na primeira pergunta, então um
+      LLMPreguicoso só é construído quando o agente é usado.
+    - max_passos: chamadas ao modelo por pergunta (inclui a resposta final).
+    - tempo_max: segundos por pergunta (None = sem limite).
+    - max_concorrencia: ferramentas executando ao mesmo tempo.
+    - prompt: mensagem de sistema (None = sem mensagem de sistema).
+    """
+    def __init__(self, llm, tools, max_passos=6, tempo_max=60.0, max_concorrencia=8, prompt=PROMPT_PADRAO,
+                 verbose=False):
+        self.tools = {tool.name: tool for tool in tools}
+        self.llm = llm
+        self._modelos = None  # (com ferramentas, resposta final sem ferramentas)
+        self.max_passos = max_passos
+        self.tempo_max = tempo_max
+        self.max_concorrencia = max_concorrencia
+        self.prompt = prompt
+        self.verbose = verbose
+
+    async def _executar_ferramenta(self, chamada, semaforo):
+        tool = self.tools.get(chamada["name"])
+        if tool is None:
+            return ToolMessage(content=f"Erro: ferramenta desconhecida '{chamada['name']}'. "
+                                       f"Disponíveis: {', '.join(self.tools)}",
+                               tool_call_id=chamada["id"], status="error")
+        try:
+            async with semaforo:
+                return await tool.ainvoke({**chamada, "type": "tool_call"})
+        except Exception as erro:
+            return ToolMessage(content=f"Erro: {type(erro).__name__}: {erro}", tool_call_id=chamada["id"], status="error")
+
+    def _ligar_ferramentas(self):
+        if self._modelos is None:
+            tools = list(self.tools.values())
+            self._modelos = (self.llm.bind_tools(tools), self.llm.bind_tools(tools, tool_choice="none"))
+        return self._modelos
+
+    def _log(self, texto):
+        if self.verbose:
+            print(texto)
+
+    async def ainvoke(self, entrada, config=None):
+        pergunta = entrada["input"] if isinstance(entrada, dict) else entrada
+        mensagens = ([SystemMessage(content=self.prompt)] if self.prompt else []) + [HumanMessage(content=pergunta)]
+        inicio = time.perf_counter()
+        semaforo = asyncio.Semaphore(self.max_concorrencia)
+        passos = chamadas_ferramentas = 0
+        passos_intermediarios = []
+        parada = "resposta"
+        resposta = None
+        modelo_com_ferramentas, modelo_final = self._ligar_ferramentas()
+
+        while True:
+            passos += 1
+            ultimo = passos >= self.max_passos
+            modelo = modelo_final if ultimo else modelo_com_ferramentas
+            restante = None if self.tempo_max is None else self.tempo_max - (time.perf_counter() - inicio)
+            try:
+                resposta = await asyncio.wait_for(modelo.ainvoke(mensagens, config), restante)
+            except asyncio.TimeoutError:
+                passos -= 1
+                parada = "tempo"
+                break
+            mensagens.append(resposta)
+            if not resposta.tool_calls:
+                if ultimo:
+                    parada = "passos"
+                break
+
+            self._log(f"[passo {passos}] " + ", ".join(f"{c['name']}({c['args']})" for c in resposta.tool_calls))
+            restante = None if self.tempo_max is None else self.tempo_max - (time.perf_counter() - inicio)
+            try:
+                resultados = await asyncio.wait_for(
+                    asyncio.gather(*(self._executar_ferramenta(c, semaforo) for c in resposta.tool_calls)), restante
+                )
+            except asyncio.TimeoutError:
+                parada = "tempo"
+                break
+            chamadas_ferramentas += len(resultados)
+            for chamada, resultado in zip(resposta.tool_calls, resultados):
+                self._log(f"  {chamada['name']} -> {str(resultado.content)[:200]}")
+                passos_intermediarios.append((chamada, resultado.content))
+            mensagens.extend(resultados)
+
+        if parada == "tempo":
+            saida = "Tempo esgotado antes de uma resposta final."
+        else:
+            saida = resposta.content
+        return {
+            "input": pergunta,
+            "output": saida,
+            "passos": passos,
+            "chamadas_ferramentas": chamadas_ferramentas,
+            "intermediate_steps": passos_intermediarios,
+            "parada": parada,
+            "segundos": time.perf_counter() - inicio,
+        }
+
+    def invoke(self, entrada, config=None):
+        return asyncio.run(self.ainvoke(entrada, config))
+
+    def run(self, entrada):
+        return self.invoke(entrada)["output"]
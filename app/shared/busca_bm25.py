@@ -0,0 +1,201 @@
+# Busca BM25 em trechos de um documento de texto
+#
+# Em vez de devolver o arquivo inteiro para o agente, o documento é dividido
+# em trechos uma única vez e indexado (índice invertido + BM25). A ferramenta
+# devolve só os trechos mais relevantes para a consulta, até um limite de
+# caracteres. O índice é salvo ao lado do arquivo (<arquivo>.bm25.json) e,
+# quando o arquivo muda, só os trechos alterados são reprocessados.
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import threading
+from collections import Counter
+
+from shared.cache_documentos import obter_documento
+
+VERSAO_INDICE = 1
+
+
+def tokenizar(texto):
+    return re.findall(r"\w+", texto.casefold())
+
+
+def dividir_em_trechos(texto, tamanho=800, sobreposicao=100):
+    """
+    Divide o texto em trechos de até `tamanho` caracteres, juntando parágrafos
+    (separados por linha em branco). Parágrafos maiores que o limite são
+    cortados em janelas com `sobreposicao`. Devolve pares (início, fim).
+    """
+    paragrafos = []
+    inicio = 0
+    for separador in re.finditer(r"\n\s*\n", texto):
+        paragrafos.append((inicio, separador.start()))
+        inicio = separador.end()
+    paragrafos.append((inicio, len(texto)))
+
+    trechos = []
+    atual = None
+    for inicio, fim in paragrafos:
+        if not texto[inicio:fim].strip():
+            continue
+        if fim - inicio > tamanho:
+            if atual:
+                trechos.append(atual)
+                atual = None
+            passo = max(1, tamanho - sobreposicao)
+            for janela in range(inicio, fim, passo):
+                trechos.append((janela, min(fim, janela + tamanho)))
+                if janela + tamanho >= fim:
+                    break
+        elif atual and fim - atual[0] <= tamanho:
+            atual = (atual[0], fim)
+        else:
+            if atual:
+                trechos.append(atual)
+            atual = (inicio, fim)
+    if atual:
+        trechos.append(atual)
+    return trechos
+
+
+class IndiceBM25:
+    """
+    Índice BM25 de um arquivo de texto, persistido em <arquivo>.bm25.json.
+
+    buscar(consulta, k, max_caracteres) devolve os k trechos mais relevantes
+    (em ordem de relevância), cortando no limite de caracteres.
+    """
+    def __init__(self, caminho, tamanho_trecho=800, sobreposicao=100, k1=1.5, b=0.75):
+        self.caminho = caminho
+        self.caminho_indice = f"{caminho}.bm25.json"
+        self.tamanho_trecho = tamanho_trecho
+        self.sobreposicao = sobreposicao
+        self.k1 = k1
+        self.b = b
+        self.documento = obter_documento(caminho)
+        self.reconstrucoes = 0
+        # Versão atual do índice: tupla imutável (assinatura, texto, trechos,
+        # postings, comprimentos, média), trocada inteira por _montar. As
+        # buscas leem uma única vez e não precisam da trava.
+        self._versao = (None, "", (), {}, (), 0.0)
+        self._trava = threading.Lock()
+
+    def _parametros(self):
+        return {"tamanho_trecho": self.tamanho_trecho, "sobreposicao": self.sobreposicao}
+
+    def atualizar(self):
+        """
+        Garante o índice da versão atual do documento e o devolve.
+        """
+        self.documento.atualizar()
+        assinatura, texto = self.documento.versao
+        assinatura = list(assinatura)
+        versao = self._versao
+        if assinatura == versao[0]:
+            return versao
+        with self._trava:
+            versao = self._versao
+            if assinatura == versao[0]:
+                return versao
+            salvo = self._carregar_salvo()
+            if salvo and salvo["assinatura"] == assinatura:
+                return self._montar(salvo["trechos"], assinatura, texto)
+            return self._reconstruir(salvo, assinatura, texto)
+
+    def _carregar_salvo(self):
+        try:
+            with open(self.caminho_indice, "r", encoding="utf-8") as f:
+                salvo = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if salvo.get("versao") != VERSAO_INDICE or salvo.get("parametros") != self._parametros():
+            return None
+        return salvo
+
+    def _reconstruir(self, salvo, assinatura, texto):
+        # Reaproveita as frequências dos trechos que não mudaram (mesmo hash)
+        frequencias_salvas = {trecho["hash"]: trecho["tf"] for trecho in (salvo or {}).get("trechos", [])}
+        trechos = []
+        for inicio, fim in dividir_em_trechos(texto, self.tamanho_trecho, self.sobreposicao):
+            conteudo = texto[inicio:fim]
+            chave = hashlib.sha1(conteudo.encode("utf-8")).hexdigest()
+            tf = frequencias_salvas.get(chave)
+            if tf is None:
+                tf = dict(Counter(tokenizar(conteudo)))
+            trechos.append({"hash": chave, "inicio": inicio, "fim": fim, "tf": tf})
+
+        versao = self._montar(trechos, assinatura, texto)
+        self.reconstrucoes += 1
+        temporario = f"{self.caminho_indice}.{os.getpid()}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump({
+                "versao": VERSAO_INDICE,
+                "parametros": self._parametros(),
+                "assinatura": assinatura,
+                "trechos": trechos,
+            }, f, ensure_ascii=False)
+        os.replace(temporario, self.caminho_indice)
+        return versao
+
+    def _montar(self, trechos, assinatura, texto):
+        postings = {}
+        comprimentos = []
+        for i, trecho in enumerate(trechos):
+            for termo, frequencia in trecho["tf"].items():
+                postings.setdefault(termo, []).append((i, frequencia))
+            comprimentos.append(sum(trecho["tf"].values()))
+        media = (sum(comprimentos) / len(comprimentos)) if comprimentos else 0.0
+        limites = tuple((trecho["inicio"], trecho["fim"]) for trecho in trechos)
+        self._versao = (assinatura, texto, limites, postings, tuple(comprimentos), media)
+        return self._versao
+
+    def pontuar(self, consulta, versao=None):
+        _, _, limites, postings, comprimentos, media = versao or self.atualizar()
+        total = len(limites)
+        pontuacoes = {}
+        for termo in set(tokenizar(consulta)):
+            lista = postings.get(termo)
+            if not lista:
+                continue
+            idf = math.log(1 + (total - len(lista) + 0.5) / (len(lista) + 0.5))
+            for i, frequencia in lista:
+                normalizacao = self.k1 * (1 - self.b + self.b * comprimentos[i] / media)
+                pontuacoes[i] = pontuacoes.get(i, 0.0) + idf * frequencia * (self.k1 + 1) / (frequencia + normalizacao)
+        return pontuacoes
+
+    def buscar(self, consulta, k=3, max_caracteres=2000):
+        # Pontuação e recorte sobre a mesma versão (texto e limites dos trechos batem)
+        versao = self.atualizar()
+        pontuacoes = self.pontuar(consulta, versao)
+        melhores = heapq.nlargest(k, pontuacoes.items(), key=lambda item: item[1])
+        texto, limites = versao[1], versao[2]
+        resultado = []
+        restante = max_caracteres
+        for i, _ in melhores:
+            if restante <= 0:
+                break
+            inicio, fim = limites[i]
+            trecho = texto[inicio:fim].strip()[:restante]
+            resultado.append(trecho)
+            restante -= len(trecho)
+        return resultado
+
+
+_indices = {}
+_trava_registro = threading.Lock()
+
+
+def obter_indice_bm25(caminho, **opcoes):
+    """
+    Devolve o IndiceBM25 compartilhado para o caminho (um por arquivo no processo).
+    """
+    chave = os.path.abspath(caminho)
+    with _trava_registro:
+        indice = _indices.get(chave)
+        if indice is None:
+            indice = IndiceBM25(caminho, **opcoes)
+            _indices[chave] = indice
+    return indice
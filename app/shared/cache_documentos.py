@@ -0,0 +1,94 @@
+# Cache de documentos de texto para ferramentas (ex.: info.txt)
+#
+# As ferramentas de leitura são chamadas a cada passo do agente (ReAct).
+# Em vez de abrir e ler o arquivo em toda chamada, o documento é lido uma vez
+# (via memory-map) e fica em memória junto com uma cópia já em minúsculas
+# (casefold). Ele só é relido quando o arquivo muda (mtime ou tamanho).
+import mmap
+import os
+import threading
+import time
+
+
+class DocumentoEmCache:
+    """
+    Documento de texto mantido em memória.
+
+    - texto: conteúdo completo decodificado.
+    - texto_casefold: mesmo conteúdo em casefold, calculado uma vez por versão.
+    - versao: par (assinatura, texto) trocado de uma vez a cada releitura.
+    - contem(termo): busca sem diferenciar maiúsculas, sem tocar no disco.
+
+    A verificação de mudança (os.stat) é feita no máximo a cada
+    `intervalo_verificacao` segundos; use 0 para verificar sempre.
+    """
+    def __init__(self, caminho, encoding="utf-8", intervalo_verificacao=1.0):
+        self.caminho = caminho
+        self.encoding = encoding
+        self.intervalo_verificacao = intervalo_verificacao
+        self.texto = ""
+        self.texto_casefold = ""
+        self.versao = (None, "")
+        self.leituras = 0
+        self._assinatura = None
+        self._ultima_verificacao = 0.0
+        self._trava = threading.Lock()
+        self.atualizar(forcar=True)
+
+    def _ler(self):
+        with open(self.caminho, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                # Decodifica direto do mapeamento, sem cópia intermediária em bytes
+                return str(mapa, self.encoding)
+
+    def atualizar(self, forcar=False):
+        agora = time.monotonic()
+        if not forcar and agora - self._ultima_verificacao < self.intervalo_verificacao:
+            return
+        with self._trava:
+            estado = os.stat(self.caminho)
+            assinatura = (estado.st_mtime_ns, estado.st_size)
+            self._ultima_verificacao = agora
+            if assinatura == self._assinatura:
+                return
+            texto = self._ler()
+            self.texto, self.texto_casefold = texto, texto.casefold()
+            self._assinatura = assinatura
+            self.versao = (assinatura, texto)
+            self.leituras += 1
+
+    @property
+    def assinatura(self):
+        """
+        (mtime_ns, tamanho) da versão em memória; muda quando o arquivo é relido.
+        """
+        return self._assinatura
+
+    def obter_texto(self):
+        self.atualizar()
+        return self.texto
+
+    def contem(self, termo):
+        self.atualizar()
+        return termo.casefold() in self.texto_casefold
+
+
+_documentos = {}
+_trava_registro = threading.Lock()
+
+
+def obter_documento(caminho, **opcoes):
+    """
+    Devolve o DocumentoEmCache compartilhado para o caminho (um por arquivo no processo).
+    """
+    chave = os.path.abspath(caminho)
+    documento = _documentos.get(chave)
+    if documento is None:
+        with _trava_registro:
+            documento = _documentos.get(chave)
+            if documento is None:
+                documento = DocumentoEmCache(caminho, **opcoes)
+                _documentos[chave] = documento
+    return documento
@@ -0,0 +1,232 @@
+# Fábrica de modelos LLM com pool HTTP compartilhado
+#
+# Cada ChatOpenAI criado do jeito padrão abre seu próprio cliente HTTP (e seu
+# próprio pool de conexões/TLS). Aqui todos os modelos do processo usam o
+# mesmo httpx.Client (sync) e o mesmo httpx.AsyncClient (async), com
+# keep-alive, e só são construídos no primeiro uso.
+#
+# Conexões async ficam presas ao event loop em que foram abertas: o
+# AsyncClient compartilhado mantém um pool por event loop, fechado quando o
+# loop termina (ex.: no fim de cada asyncio.run).
+#
+# Configuração por variáveis de ambiente (ou configurar_pool antes do 1º uso):
+#   LLM_MAX_CONEXOES        conexões simultâneas no pool (padrão 20)
+#   LLM_MAX_KEEPALIVE       conexões ociosas mantidas abertas (padrão 10)
+#   LLM_KEEPALIVE_EXPIRA    segundos até fechar uma conexão ociosa (padrão 30)
+#   LLM_TIMEOUT_CONEXAO     timeout de conexão em segundos (padrão 5)
+#   LLM_TIMEOUT_LEITURA     timeout de leitura/escrita em segundos (padrão 60)
+import asyncio
+import atexit
+import json
+import os
+import threading
+import weakref
+
+import httpx
+
+_config_pool = {
+    "max_conexoes": int(os.getenv("LLM_MAX_CONEXOES", "20")),
+    "max_keepalive": int(os.getenv("LLM_MAX_KEEPALIVE", "10")),
+    "keepalive_expira": float(os.getenv("LLM_KEEPALIVE_EXPIRA", "30")),
+    "timeout_conexao": float(os.getenv("LLM_TIMEOUT_CONEXAO", "5")),
+    "timeout_leitura": float(os.getenv("LLM_TIMEOUT_LEITURA", "60")),
+}
+
+_cliente_http = None
+_cliente_http_async = None
+_transporte_async = None
+_modelos = {}
+_trava = threading.RLock()
+
+
+def configurar_pool(**opcoes):
+    """
+    Ajusta o pool (max_conexoes, max_keepalive, keepalive_expira,
+    timeout_conexao, timeout_leitura). Só pode ser chamado antes do primeiro uso.
+    """
+    desconhecidas = set(opcoes) - set(_config_pool)
+    if desconhecidas:
+        raise ValueError(f"Opções de pool desconhecidas: {sorted(desconhecidas)}")
+    with _trava:
+        if _cliente_http is not None or _cliente_http_async is not None:
+            raise RuntimeError("O pool HTTP já foi criado; configure antes do primeiro uso.")
+        _config_pool.update(opcoes)
+
+
+def _limites():
+    return httpx.Limits(
+        max_connections=_config_pool["max_conexoes"],
+        max_keepalive_connections=_config_pool["max_keepalive"],
+        keepalive_expiry=_config_pool["keepalive_expira"],
+    )
+
+
+def _timeout():
+    leitura = _config_pool["timeout_leitura"]
+    return httpx.Timeout(leitura, connect=_config_pool["timeout_conexao"])
+
+
+def obter_cliente_http():
+    """
+    httpx.Client compartilhado (criado no primeiro uso).
+    """
+    global _cliente_http
+    if _cliente_http is None:
+        with _trava:
+            if _cliente_http is None:
+                _cliente_http = httpx.Client(limits=_limites(), timeout=_timeout())
+    return _cliente_http
+
+
+class _TransportePorLoop(httpx.AsyncBaseTransport):
+    """
+    Transporte async com um pool de conexões por event loop.
+
+    Reaproveitar uma conexão keep-alive aberta em outro loop (ex.: um segundo
+    asyncio.run) falha com "Event loop is closed". Cada loop ganha seu próprio
+    AsyncHTTPTransport, fechado pelo próprio loop quando ele termina: um async
+    generator "vigia" é registrado no loop, e o shutdown_asyncgens do
+    asyncio.run o encerra, o que fecha o transporte ainda com o loop ativo.
+    """
+    def __init__(self):
+        self._por_loop = weakref.WeakKeyDictionary()  # loop -> (transporte, vigia)
+        self._trava = threading.Lock()
+
+    async def _vigia(self, transporte):
+        try:
+            yield
+        finally:
+            with self._trava:
+                self._por_loop.pop(asyncio.get_running_loop(), None)
+            await transporte.aclose()
+
+    async def _transporte(self):
+        laco = asyncio.get_running_loop()
+        with self._trava:
+            item = self._por_loop.get(laco)
+        if item is None:
+            transporte = httpx.AsyncHTTPTransport(limits=_limites())
+            vigia = self._vigia(transporte)
+            await vigia.__anext__()  # registra o vigia nos hooks de async generators do loop
+            with self._trava:
+                self._por_loop[laco] = item = (transporte, vigia)
+        return item[0]
+
+    async def handle_async_request(self, request):
+        transporte = await self._transporte()
+        return await transporte.handle_async_request(request)
+
+    async def aclose(self):
+        with self._trava:
+            item = self._por_loop.get(asyncio.get_running_loop())
+        if item is not None:
+            await item[1].aclose()
+
+    def fechar(self):
+        """
+        Fecha os pools de loops parados que ainda estão abertos (fora de um loop).
+        """
+        with self._trava:
+            itens = list(self._por_loop.items())
+        for laco, (_, vigia) in itens:
+            if not laco.is_closed() and not laco.is_running():
+                laco.run_until_complete(vigia.aclose())
+
+
+def obter_cliente_http_async():
+    """
+    httpx.AsyncClient compartilhado (criado no primeiro uso), com um pool de
+    conexões por event loop: pode ser usado em vários asyncio.run seguidos.
+    """
+    global _cliente_http_async, _transporte_async
+    if _cliente_http_async is None:
+        with _trava:
+            if _cliente_http_async is None:
+                _transporte_async = _TransportePorLoop()
+                _cliente_http_async = httpx.AsyncClient(transport=_transporte_async, timeout=_timeout())
+    return _cliente_http_async
+
+
+def _chave_modelo(model, temperature, opcoes):
+    # Opções podem ser dicts/listas (model_kwargs, stop...): a chave é o JSON canônico.
+    # Objetos sem JSON (ex.: um cache) entram pelo repr.
+    return json.dumps({"model": model, "temperature": temperature, **opcoes}, sort_keys=True, default=repr)
+
+
+def _mascarar(nome, valor):
+    # Compara partes inteiras do nome: api_key/secret/token sim, max_tokens não
+    if valor and set(nome.lower().split("_")) & {"key", "secret", "token", "password"}:
+        texto = str(getattr(valor, "get_secret_value", lambda: valor)())
+        return f"{texto[:3]}***" if len(texto) > 8 else "***"
+    return valor
+
+
+def obter_llm(model="gpt-3.5-turbo", temperature=0, **opcoes):
+    """
+    Devolve o ChatOpenAI para essa configuração, criado uma vez por processo
+    e ligado aos clientes HTTP compartilhados. Chamadas com a mesma
+    configuração devolvem a mesma instância.
+    """
+    chave = _chave_modelo(model, temperature, opcoes)
+    modelo = _modelos.get(chave)
+    if modelo is None:
+        # Import tardio: scripts que nunca chamam o modelo não pagam o custo
+        from langchain_openai import ChatOpenAI
+
+        with _trava:
+            modelo = _modelos.get(chave)
+            if modelo is None:
+                modelo = ChatOpenAI(
+                    model=model,
+                    temperature=temperature,
+                    http_client=obter_cliente_http(),
+                    http_async_client=obter_cliente_http_async(),
+                    **opcoes,
+                )
+                _modelos[chave] = modelo
+    return modelo
+
+
+class LLMPreguicoso:
+    """
+    Referência a um modelo que só é construído no primeiro uso.
+
+    Repassa qualquer atributo (invoke, ainvoke, stream, batch, bind_tools...)
+    para o ChatOpenAI real. Para compor (prompt | modelo) ou para APIs que
+    validam o tipo do modelo (initialize_agent, create_react_agent), use `obter()`.
+    """
+    def __init__(self, model="gpt-3.5-turbo", temperature=0, **opcoes):
+        self._config = dict(model=model, temperature=temperature, **opcoes)
+
+    def obter(self):
+        return obter_llm(**self._config)
+
+    def __getattr__(self, nome):
+        if nome.startswith("__"):
+            raise AttributeError(nome)
+        return getattr(self.obter(), nome)
+
+    def __repr__(self):
+        opcoes = {k: v for k, v in self._config.items() if k not in ("model", "temperature")}
+        criado = _chave_modelo(self._config["model"], self._config["temperature"], opcoes) in _modelos
+        config = {nome: _mascarar(nome, valor) for nome, valor in self._config.items()}
+        return f"LLMPreguicoso({config}, {'criado' if criado else 'pendente'})"
+
+
+def fechar_clientes():
+    """
+    Fecha os pools HTTP (chamado automaticamente na saída do processo). Os
+    pools async de loops já encerrados foram fechados pelo próprio loop.
+    """
+    global _cliente_http, _cliente_http_async, _transporte_async
+    with _trava:
+        if _cliente_http is not None:
+            _cliente_http.close()
+            _cliente_http = None
+        if _transporte_async is not None:
+            _transporte_async.fechar()
+            _transporte_async = None
+        _cliente_http_async = None
+
+
+atexit.register(fechar_clientes)
@@ -0,0 +1,45 @@
+# Ferramenta LangChain que lê um arquivo de texto (ex.: app/langchain/info.txt)
+#
+# Modos de leitura:
+# - "bm25": devolve só os trechos mais relevantes para a consulta (índice em
+#   <arquivo>.bm25.json, atualizado quando o arquivo muda);
+# - "completo": devolve o arquivo inteiro (em cache, relido só quando muda).
+import os
+
+from langchain.tools import Tool
+
+from shared.busca_bm25 import obter_indice_bm25
+from shared.cache_documentos import obter_documento
+
+MODO_BM25 = "bm25"
+MODO_COMPLETO = "completo"
+
+
+def criar_leitor_info(caminho, modo=MODO_BM25, max_trechos=3, max_caracteres=2000, nome="LeitorDeArquivoTXT"):
+    """
+    Tool que consulta o arquivo em `caminho`; max_caracteres=2000 ≈ 500 tokens.
+    """
+    arquivo = os.path.basename(caminho)
+
+    def ler_arquivo_info(consulta: str) -> str:
+        try:
+            if modo == MODO_BM25:
+                trechos = obter_indice_bm25(caminho).buscar(consulta, max_trechos, max_caracteres)
+                if not trechos:
+                    return "Nenhum trecho do arquivo é relevante para essa consulta."
+                return "Trechos relevantes do arquivo:\n" + "\n---\n".join(trechos)
+            return f"Conteúdo do arquivo:\n{obter_documento(caminho).obter_texto()}"
+        except Exception as e:
+            return f"Erro ao ler o arquivo: {str(e)}"
+
+    if modo == MODO_BM25:
+        descricao = (
+            f"Use esta ferramenta para consultar informações armazenadas no arquivo {arquivo}. "
+            "Envie como entrada os termos que deseja procurar; ela retorna os trechos mais relevantes do arquivo."
+        )
+    else:
+        descricao = (
+            f"Use esta ferramenta para consultar informações armazenadas no arquivo {arquivo}. "
+            "Ela retorna o conteúdo completo do arquivo."
+        )
+    return Tool(name=nome, func=ler_arquivo_info, description=descricao)
@@ -0,0 +1,206 @@
+# Memoização com TTL e coalescência de chamadas para Tools do LangChain
+#
+# Ferramentas que fazem buscas externas (voos, hotéis...) são caras e o agente
+# ReAct muitas vezes repete a mesma chamada numa execução; pedidos simultâneos
+# de usuários diferentes também repetem buscas idênticas. memoizar_tool
+# devolve uma cópia da Tool em que:
+#
+# - o resultado fica em cache por `ttl` segundos, com chave na entrada
+#   normalizada (espaços colapsados, sem diferenciar maiúsculas; dicts com as
+#   chaves ordenadas);
+# - chamadas idênticas simultâneas compartilham uma única execução em voo
+#   (singleflight): só a primeira executa, as outras esperam o resultado;
+# - o cache é limitado a `max_itens` entradas (LRU);
+# - erros não ficam em cache (são repassados a quem estava esperando).
+#
+# Funciona com Tool e StructuredTool, síncronas (func) ou assíncronas (coroutine).
+import asyncio
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def normalizar_entrada(*args, **kwargs):
+    """
+    Chave de cache para a entrada de uma ferramenta.
+    """
+    def normalizar(valor):
+        if isinstance(valor, str):
+            return re.sub(r"\s+", " ", valor).strip().casefold()
+        if isinstance(valor, dict):
+            return {str(chave): normalizar(item) for chave, item in valor.items()}
+        if isinstance(valor, (list, tuple)):
+            return [normalizar(item) for item in valor]
+        return valor
+
+    return json.dumps([normalizar(list(args)), normalizar(kwargs)], sort_keys=True, ensure_ascii=False, default=str)
+
+
+class MemoTTL:
+    """
+    Cache LRU com expiração + coalescência de chamadas em voo.
+
+    - ttl: segundos de validade de um resultado (None = sem expiração).
+    - max_itens: entradas mantidas em memória.
+    """
+    def __init__(self, ttl=300.0, max_itens=1024):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens = OrderedDict()  # chave -> (expira_em, valor)
+        self._em_voo = {}            # chave -> Future (sync) ou asyncio.Future (async)
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+        self.coalescidas = 0
+        self.expiradas = 0
+
+    def _buscar(self, chave):
+        # Chamar com a trava
+        item = self._itens.get(chave)
+        if item is None:
+            return False, None
+        expira_em, valor = item
+        if expira_em is not None and expira_em <= time.monotonic():
+            del self._itens[chave]
+            self.expiradas += 1
+            return False, None
+        self._itens.move_to_end(chave)
+        self.acertos += 1
+        return True, valor
+
+    def _guardar(self, chave, valor):
+        with self._trava:
+            self._itens[chave] = (time.monotonic() + self.ttl if self.ttl is not None else None, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def chamar(self, chave, funcao, *args, **kwargs):
+        with self._trava:
+            achou, valor = self._buscar(chave)
+            if achou:
+                return valor
+            em_voo = self._em_voo.get(chave)
+            if em_voo is None:
+                em_voo = self._em_voo[chave] = Future()
+                dono = True
+                self.falhas += 1
+            else:
+                dono = False
+                self.coalescidas += 1
+        if not dono:
+            # Uma chamada async em voo com a mesma chave não pode ser esperada daqui
+            if isinstance(em_voo, asyncio.Future):
+                return funcao(*args, **kwargs)
+            return em_voo.result()
+
+        try:
+            valor = funcao(*args, **kwargs)
+        except BaseException as erro:
+            em_voo.set_exception(erro)
+            raise
+        else:
+            self._guardar(chave, valor)
+            em_voo.set_result(valor)
+            return valor
+        finally:
+            with self._trava:
+                self._em_voo.pop(chave, None)
+
+    async def achamar(self, chave, corotina, *args, **kwargs):
+        with self._trava:
+            achou, valor = self._buscar(chave)
+            if achou:
+                return valor
+            em_voo = self._em_voo.get(chave)
+            if em_voo is None:
+                em_voo = self._em_voo[chave] = asyncio.get_running_loop().create_future()
+                dono = True
+                self.falhas += 1
+            else:
+                dono = False
+                self.coalescidas += 1
+        if not dono:
+            if not isinstance(em_voo, asyncio.Future):
+                return await asyncio.wrap_future(em_voo)
+            if em_voo.get_loop() is asyncio.get_running_loop():
+                return await asyncio.shield(em_voo)
+            # Em voo em outro event loop: não dá para esperar daqui
+            return await corotina(*args, **kwargs)
+
+        try:
+            valor = await corotina(*args, **kwargs)
+        except BaseException as erro:
+            em_voo.set_exception(erro)
+            em_voo.exception()  # evita o aviso de exceção nunca lida quando ninguém esperava
+            raise
+        else:
+            self._guardar(chave, valor)
+            em_voo.set_result(valor)
+            return valor
+        finally:
+            with self._trava:
+                self._em_voo.pop(chave, None)
+
+    def limpar(self):
+        with self._trava:
+            self._itens.clear()
+
+    def estatisticas(self):
+        with self._trava:
+            consultas = self.acertos + self.falhas + self.coalescidas
+            return {
+                "itens": len(self._itens),
+                "acertos": self.acertos,
+                "falhas": self.falhas,
+                "coalescidas": self.coalescidas,
+                "expiradas": self.expiradas,
+                "taxa_acerto": (self.acertos + self.coalescidas) / consultas if consultas else 0.0,
+            }
+
+
+def memoizar_tool(tool, ttl=300.0, max_itens=1024):
+    """
+    Cópia da Tool com memoização por TTL e coalescência. O cache (MemoTTL)
+    pode ser obtido com memo_da_tool, para consultar estatísticas ou limpar.
+    """
+    memo = MemoTTL(ttl=ttl, max_itens=max_itens)
+    alteracoes = {}
+
+    if tool.func is not None:
+        func = tool.func
+
+        def func_memoizada(*args, **kwargs):
+            return memo.chamar(normalizar_entrada(*args, **kwargs), func, *args, **kwargs)
+
+        func_memoizada.memo = memo
+        alteracoes["func"] = func_memoizada
+
+    if tool.coroutine is not None:
+        corotina = tool.coroutine
+
+        async def corotina_memoizada(*args, **kwargs):
+            return await memo.achamar(normalizar_entrada(*args, **kwargs), corotina, *args, **kwargs)
+
+        corotina_memoizada.memo = memo
+        alteracoes["coroutine"] = corotina_memoizada
+
+    return tool.model_copy(update=alteracoes)
+
+
+def memo_da_tool(tool):
+    """
+    MemoTTL de uma Tool criada por memoizar_tool (None se não for memoizada).
+    """
+    return getattr(tool.func, "memo", None) or getattr(tool.coroutine, "memo", None)
+
+
+def memoizar_tools(tools, ttl=300.0, ttl_por_tool=None, max_itens=1024):
+    """
+    Aplica memoizar_tool a uma lista; ttl_por_tool = {nome: segundos} sobrepõe o ttl padrão.
+    """
+    ttl_por_tool = ttl_por_tool or {}
+    return [memoizar_tool(tool, ttl=ttl_por_tool.get(tool.name, ttl), max_itens=max_itens) for tool in tools]
@@ -0,0 +1,387 @@
+# Telemetria de latência e tokens para grafos LangGraph e agentes LangChain
+#
+# ColetorTelemetria é um callback handler: passado em config["callbacks"], ele
+# registra um span para cada nó do grafo, chamada de ferramenta e requisição
+# ao LLM, com:
+#   - tempo de parede (início -> fim);
+#   - espera: tempo entre o pai (ou o irmão anterior) liberar e o span começar,
+#     ou seja, quanto o passo ficou parado na fila antes de executar;
+#   - tokens de prompt/resposta (LLM);
+#   - tentativas extras (on_retry, ex.: .with_retry()) e erros.
+#
+# Os spans viram histogramas por (tipo, nome) e podem ser exportados como
+# Chrome trace JSON (chrome://tracing ou ui.perfetto.dev) e texto Prometheus.
+#
+# Desligada por padrão: obter_callbacks() devolve [] e nada é instrumentado.
+# Para ligar:
+#   TELEMETRIA=1                      coleta e, ao sair, grava os arquivos abaixo
+#   TELEMETRIA_TRACE=trace.json       destino do Chrome trace (padrão telemetria_trace.json)
+#   TELEMETRIA_PROMETHEUS=metricas.prom  destino do texto Prometheus (padrão telemetria.prom)
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+TIPO_GRAFO = "grafo"
+TIPO_NO = "no"
+TIPO_FERRAMENTA = "ferramenta"
+TIPO_LLM = "llm"
+
+# Limites superiores (segundos) dos baldes dos histogramas
+BALDES = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histograma:
+    """
+    Histograma cumulativo no formato Prometheus (baldes fixos + soma + contagem).
+    """
+    def __init__(self, baldes=BALDES):
+        self.baldes = baldes
+        self.contagens = [0] * (len(baldes) + 1)  # último: +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor):
+        i = 0
+        while i < len(self.baldes) and valor > self.baldes[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+    def quantil(self, q):
+        """
+        Estimativa pelo limite superior do balde que contém o quantil q.
+        """
+        if not self.total:
+            return 0.0
+        alvo = q * self.total
+        acumulado = 0
+        for limite, contagem in zip(self.baldes + (float("inf"),), self.contagens):
+            acumulado += contagem
+            if acumulado >= alvo:
+                return limite
+        return float("inf")
+
+
+class ColetorTelemetria(BaseCallbackHandler):
+    """
+    Callback que registra spans de nós, ferramentas e LLMs.
+
+    - max_spans: spans mantidos para o Chrome trace (os mais antigos saem; os
+      histogramas continuam acumulando tudo).
+    """
+    def __init__(self, max_spans=100000):
+        self.max_spans = max_spans
+        self.spans = deque(maxlen=max_spans)
+        self.histogramas = {}
+        self.espera = {}
+        self.tokens = {}
+        self.tentativas = {}
+        self.erros = {}
+        self._abertos = {}
+        self._pais = {}
+        self._ultimo_fim_filho = {}
+        self._origem = time.perf_counter()
+        self._trava = threading.Lock()
+
+    # --- registro ---------------------------------------------------------
+
+    def _abrir(self, run_id, parent_run_id, tipo, nome, no=None):
+        agora = time.perf_counter()
+        with self._trava:
+            self._pais[run_id] = parent_run_id
+            pai = self._ancestral_instrumentado(parent_run_id)
+            referencia = max(self._abertos[pai]["inicio"], self._ultimo_fim_filho.get(pai, 0.0)) if pai else agora
+            self._abertos[run_id] = {
+                "tipo": tipo,
+                "nome": nome,
+                "no": no,
+                "inicio": agora,
+                "espera": max(0.0, agora - referencia),
+                "tokens_prompt": 0,
+                "tokens_resposta": 0,
+                "tentativas": 0,
+            }
+
+    def _ancestral_instrumentado(self, run_id):
+        # Sobe pelos pais até um run com span aberto (chamar com a trava)
+        while run_id is not None and run_id not in self._abertos:
+            run_id = self._pais.get(run_id)
+        return run_id
+
+    def _marcar_filho(self, run_id, parent_run_id):
+        # Runs não instrumentados (ex.: RunnableSequence dentro de um nó) só guardam o pai
+        with self._trava:
+            self._pais[run_id] = parent_run_id
+
+    def _fechar(self, run_id, erro=None):
+        agora = time.perf_counter()
+        with self._trava:
+            pai = self._ancestral_instrumentado(self._pais.pop(run_id, None))
+            span = self._abertos.pop(run_id, None)
+            self._ultimo_fim_filho.pop(run_id, None)
+            if pai is not None and span is not None:
+                self._ultimo_fim_filho[pai] = agora
+            if span is None:
+                return
+            span["fim"] = agora
+            span["erro"] = erro
+            self.spans.append(span)
+
+            chave = (span["tipo"], span["nome"])
+            if chave not in self.histogramas:
+                self.histogramas[chave] = Histograma()
+            self.histogramas[chave].observar(agora - span["inicio"])
+            self.espera[chave] = self.espera.get(chave, 0.0) + span["espera"]
+            if span["tentativas"]:
+                self.tentativas[chave] = self.tentativas.get(chave, 0) + span["tentativas"]
+            if erro:
+                self.erros[chave] = self.erros.get(chave, 0) + 1
+            if span["tipo"] == TIPO_LLM:
+                chave_tokens = (span["nome"], span["no"] or "")
+                prompt, resposta = self.tokens.get(chave_tokens, (0, 0))
+                self.tokens[chave_tokens] = (prompt + span["tokens_prompt"], resposta + span["tokens_resposta"])
+
+    # --- callbacks ----------------------------------------------------------
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        nome = kwargs.get("name") or (serialized or {}).get("name", "")
+        no = (metadata or {}).get("langgraph_node")
+        if parent_run_id is None:
+            self._abrir(run_id, None, TIPO_GRAFO, nome)
+        elif no is not None and nome == no:
+            self._abrir(run_id, parent_run_id, TIPO_NO, nome, no)
+        else:
+            self._marcar_filho(run_id, parent_run_id)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._fechar(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, type(error).__name__)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        nome = kwargs.get("name") or (serialized or {}).get("name", "")
+        self._abrir(run_id, parent_run_id, TIPO_FERRAMENTA, nome, (metadata or {}).get("langgraph_node"))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._fechar(run_id)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, type(error).__name__)
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        metadata = metadata or {}
+        nome = metadata.get("ls_model_name") or kwargs.get("name") or (serialized or {}).get("name", "llm")
+        self._abrir(run_id, parent_run_id, TIPO_LLM, nome, metadata.get("langgraph_node"))
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        self.on_llm_start(serialized, [], run_id=run_id, parent_run_id=parent_run_id, metadata=metadata, **kwargs)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        prompt, resposta = _tokens_da_resposta(response)
+        with self._trava:
+            span = self._abertos.get(run_id)
+            if span is not None:
+                span["tokens_prompt"] += prompt
+                span["tokens_resposta"] += resposta
+        self._fechar(run_id)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._fechar(run_id, type(error).__name__)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        # A tentativa é atribuída ao span instrumentado mais próximo (o próprio run ou um ancestral)
+        with self._trava:
+            atual = self._ancestral_instrumentado(run_id)
+            if atual is not None:
+                self._abertos[atual]["tentativas"] += 1
+
+    # --- consulta e exportação ---------------------------------------------
+
+    def resumo(self):
+        """
+        Tabela de texto com contagem, latência (média, p50, p95), espera e tokens por (tipo, nome).
+        """
+        with self._trava:
+            linhas = [f"{'tipo':<11} {'nome':<28} {'n':>5} {'média ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'espera ms':>10} {'tent.':>5} {'erros':>5}"]
+            for (tipo, nome), histograma in sorted(self.histogramas.items()):
+                chave = (tipo, nome)
+                linhas.append(
+                    f"{tipo:<11} {nome[:28]:<28} {histograma.total:>5} "
+                    f"{histograma.soma / histograma.total * 1e3:>9.1f} "
+                    f"{histograma.quantil(0.5) * 1e3:>8.0f} {histograma.quantil(0.95) * 1e3:>8.0f} "
+                    f"{self.espera.get(chave, 0.0) / histograma.total * 1e3:>10.1f} "
+                    f"{self.tentativas.get(chave, 0):>5} {self.erros.get(chave, 0):>5}"
+                )
+            for (modelo, no), (prompt, resposta) in sorted(self.tokens.items()):
+                linhas.append(f"tokens {modelo} [{no or '-'}]: prompt={prompt} resposta={resposta}")
+        return "\n".join(linhas)
+
+    def exportar_chrome_trace(self, caminho):
+        """
+        Grava os spans como eventos "X" do Chrome trace. Spans que se sobrepõem
+        sem estar aninhados (ex.: nós em paralelo) vão para pistas (tid) diferentes.
+        """
+        with self._trava:
+            spans = sorted(self.spans, key=lambda span: (span["inicio"], -span["fim"]))
+        pistas = []  # pilha de fins por pista
+        eventos = []
+        for span in spans:
+            for numero, pilha in enumerate(pistas):
+                while pilha and pilha[-1] <= span["inicio"]:
+                    pilha.pop()
+                if not pilha or pilha[-1] >= span["fim"]:
+                    break
+            else:
+                numero, pilha = len(pistas), []
+                pistas.append(pilha)
+            pilha.append(span["fim"])
+            argumentos = {"espera_ms": round(span["espera"] * 1e3, 3)}
+            if span["no"] and span["tipo"] != TIPO_NO:
+                argumentos["no"] = span["no"]
+            if span["tipo"] == TIPO_LLM:
+                argumentos["tokens_prompt"] = span["tokens_prompt"]
+                argumentos["tokens_resposta"] = span["tokens_resposta"]
+            if span["tentativas"]:
+                argumentos["tentativas"] = span["tentativas"]
+            if span["erro"]:
+                argumentos["erro"] = span["erro"]
+            eventos.append({
+                "name": span["nome"],
+                "cat": span["tipo"],
+                "ph": "X",
+                "ts": round((span["inicio"] - self._origem) * 1e6, 1),
+                "dur": round((span["fim"] - span["inicio"]) * 1e6, 1),
+                "pid": os.getpid(),
+                "tid": numero,
+                "args": argumentos,
+            })
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f, ensure_ascii=False)
+        return len(eventos)
+
+    def exportar_prometheus(self):
+        """
+        Texto no formato de exposição do Prometheus.
+        """
+        def rotulos(**valores):
+            return ",".join(f'{chave}="{_escapar_rotulo(valor)}"' for chave, valor in valores.items())
+
+        with self._trava:
+            linhas = [
+                "# HELP telemetria_span_segundos Duração dos spans por tipo e nome.",
+                "# TYPE telemetria_span_segundos histogram",
+            ]
+            for (tipo, nome), histograma in sorted(self.histogramas.items()):
+                acumulado = 0
+                for limite, contagem in zip(histograma.baldes + (float("inf"),), histograma.contagens):
+                    acumulado += contagem
+                    le = "+Inf" if limite == float("inf") else repr(limite)
+                    linhas.append(f"telemetria_span_segundos_bucket{{{rotulos(tipo=tipo, nome=nome, le=le)}}} {acumulado}")
+                linhas.append(f"telemetria_span_segundos_sum{{{rotulos(tipo=tipo, nome=nome)}}} {histograma.soma}")
+                linhas.append(f"telemetria_span_segundos_count{{{rotulos(tipo=tipo, nome=nome)}}} {histograma.total}")
+
+            linhas += ["# HELP telemetria_espera_segundos_total Tempo em fila antes de cada span começar.",
+                       "# TYPE telemetria_espera_segundos_total counter"]
+            linhas += [f"telemetria_espera_segundos_total{{{rotulos(tipo=tipo, nome=nome)}}} {valor}"
+                       for (tipo, nome), valor in sorted(self.espera.items())]
+
+            linhas += ["# HELP telemetria_tokens_total Tokens consumidos por modelo e nó.",
+                       "# TYPE telemetria_tokens_total counter"]
+            for (modelo, no), (prompt, resposta) in sorted(self.tokens.items()):
+                linhas.append(f"telemetria_tokens_total{{{rotulos(modelo=modelo, no=no, tipo='prompt')}}} {prompt}")
+                linhas.append(f"telemetria_tokens_total{{{rotulos(modelo=modelo, no=no, tipo='resposta')}}} {resposta}")
+
+            linhas += ["# HELP telemetria_tentativas_total Tentativas extras (retries).",
+                       "# TYPE telemetria_tentativas_total counter"]
+            linhas += [f"telemetria_tentativas_total{{{rotulos(tipo=tipo, nome=nome)}}} {valor}"
+                       for (tipo, nome), valor in sorted(self.tentativas.items())]
+
+            linhas += ["# HELP telemetria_erros_total Spans encerrados com erro.",
+                       "# TYPE telemetria_erros_total counter"]
+            linhas += [f"telemetria_erros_total{{{rotulos(tipo=tipo, nome=nome)}}} {valor}"
+                       for (tipo, nome), valor in sorted(self.erros.items())]
+        return "\n".join(linhas) + "\n"
+
+    def salvar_prometheus(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            f.write(self.exportar_prometheus())
+
+
+def _escapar_rotulo(valor):
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _tokens_da_resposta(resposta):
+    """
+    (tokens de prompt, tokens de resposta) de um LLMResult: usa usage_metadata
+    das mensagens e, se não houver, llm_output["token_usage"].
+    """
+    prompt = resposta_tokens = 0
+    for geracoes in resposta.generations:
+        for geracao in geracoes:
+            uso = getattr(getattr(geracao, "message", None), "usage_metadata", None)
+            if uso:
+                prompt += uso.get("input_tokens", 0)
+                resposta_tokens += uso.get("output_tokens", 0)
+    if not (prompt or resposta_tokens):
+        uso = (resposta.llm_output or {}).get("token_usage") or {}
+        prompt = uso.get("prompt_tokens", 0)
+        resposta_tokens = uso.get("completion_tokens", 0)
+    return prompt, resposta_tokens
+
+
+_coletor = None
+_trava_coletor = threading.Lock()
+
+
+def telemetria_ativa():
+    return os.getenv("TELEMETRIA", "").lower() in ("1", "true", "sim")
+
+
+def obter_coletor():
+    """
+    Coletor do processo (criado no primeiro uso), ou None se a telemetria estiver desligada.
+    """
+    global _coletor
+    if not telemetria_ativa():
+        return None
+    with _trava_coletor:
+        if _coletor is None:
+            _coletor = ColetorTelemetria()
+            atexit.register(_exportar_ao_sair)
+    return _coletor
+
+
+def obter_callbacks():
+    """
+    Lista para config["callbacks"]: vazia quando a telemetria está desligada.
+    """
+    coletor = obter_coletor()
+    return [coletor] if coletor else []
+
+
+def com_telemetria(config=None):
+    """
+    Devolve o config com o coletor acrescentado aos callbacks (ou o próprio
+    config, sem cópia, quando a telemetria está desligada).
+    """
+    callbacks = obter_callbacks()
+    if not callbacks:
+        return config
+    config = dict(config or {})
+    config["callbacks"] = list(config.get("callbacks") or []) + callbacks
+    return config
+
+
+def _exportar_ao_sair():
+    if _coletor is None or not _coletor.spans:
+        return
+    _coletor.exportar_chrome_trace(os.getenv("TELEMETRIA_TRACE", "telemetria_trace.json"))
+    _coletor.salvar_prometheus(os.getenv("TELEMETRIA_PROMETHEUS", "telemetria.prom"))
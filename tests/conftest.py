@@ -0,0 +1,11 @@
+# Os módulos de app/ são scripts importados pelo nome, a partir da própria pasta
+# (ex.: `from armazenamento import ...`); as pastas entram no sys.path aqui.
+import os
+import sys
+
+RAIZ_APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app")
+
+for pasta in ("", "contextEngineeringConcept", "langgraph", "llm_strategies", "orchestration", "guardrailsAI"):
+    caminho = os.path.join(RAIZ_APP, pasta)
+    if caminho not in sys.path:
+        sys.path.append(caminho)
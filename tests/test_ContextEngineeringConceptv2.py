@@ -0,0 +1,152 @@
+import pytest
+
+from armazenamento import ArmazenamentoSQLite
+from ContextEngineeringConceptv2 import (
+    ActionTools,
+    Agent,
+    LongTermMemory,
+    ShortTermMemory,
+    process_turn,
+    query_words,
+)
+
+
+def contar_palavras(texto):
+    return len(texto.split())
+
+
+# ---------- ShortTermMemory ----------
+
+def test_janela_respeita_o_orcamento_de_tokens():
+    memoria = ShortTermMemory(max_tokens=5, count_tokens=contar_palavras)
+    for mensagem in ["um dois", "tres quatro", "cinco seis"]:
+        memoria.store(mensagem)
+    assert memoria.history == ["tres quatro", "cinco seis"]
+    assert memoria.tokens == 4
+    assert memoria.get_context() == "tres quatro cinco seis"
+
+
+def test_mensagens_removidas_viram_resumo():
+    resumos = []
+
+    def resumir(resumo, removidas):
+        resumos.append(list(removidas))
+        return "r"
+
+    memoria = ShortTermMemory(max_tokens=4, count_tokens=contar_palavras, summarize=resumir)
+    memoria.store("a b")
+    memoria.store("c d")
+    memoria.store("e f")
+    assert resumos == [["a b"], ["c d"]]
+    assert memoria.summary == "r"
+    assert memoria.get_context() == "Resumo: r\ne f"
+    assert memoria.tokens <= 4
+
+
+def test_mensagem_mais_nova_e_truncada_e_nunca_removida():
+    memoria = ShortTermMemory(max_tokens=3, count_tokens=contar_palavras)
+    memoria.store("antiga")
+    memoria.store("uma mensagem nova grande demais")
+    # Maior prefixo que cabe no orçamento
+    assert [mensagem.strip() for mensagem in memoria.history] == ["uma mensagem nova"]
+    assert memoria.tokens == 3
+
+
+def test_resumo_grande_demais_da_lugar_a_mensagem_atual():
+    memoria = ShortTermMemory(max_tokens=3, count_tokens=contar_palavras,
+                              summarize=lambda resumo, removidas: "um resumo longo demais")
+    memoria.store("a")
+    memoria.store("b c d")
+    assert memoria.summary == ""
+    assert memoria.history == ["b c d"]
+
+
+def test_contexto_montado_sob_demanda_e_invalidado_no_store():
+    memoria = ShortTermMemory()
+    memoria.store("oi")
+    contexto = memoria.get_context()
+    assert memoria.get_context() is contexto
+    memoria.store("tudo bem?")
+    assert memoria.get_context() == "oi tudo bem?"
+
+
+def test_snapshot_ida_e_volta():
+    memoria = ShortTermMemory(max_tokens=6, count_tokens=contar_palavras, summarize=lambda resumo, removidas: "r")
+    for mensagem in ["a b", "c d", "e f", "g h"]:
+        memoria.store(mensagem)
+    copia = ShortTermMemory.from_snapshot(memoria.snapshot(), count_tokens=contar_palavras)
+    assert copia.history == memoria.history
+    assert copia.summary == memoria.summary
+    assert copia.tokens == memoria.tokens
+    assert copia.get_context() == memoria.get_context()
+
+
+# ---------- LongTermMemory ----------
+
+def test_query_words_com_e_sem_pontuacao():
+    assert query_words("O que é Python?") == {"o": 0, "que": 2, "é": 6, "python?": 8, "python": 8}
+
+
+def test_busca_no_dict_prefere_a_chave_mais_longa():
+    memoria = LongTermMemory()
+    memoria.add("py é uma abreviação")
+    assert memoria.search("fale de python") == "Python é uma linguagem de programação popular."
+    assert memoria.search_all("python e openai")[1] == "OpenAI é uma empresa de pesquisa em IA."
+    assert memoria.search("nada aqui") is None
+
+
+def test_busca_no_sqlite_pela_chave_primaria(tmp_path):
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "m.db"), intervalo_compactacao=None)
+    memoria = LongTermMemory(armazenamento)
+    memoria.add("Rust é focada em segurança de memória")
+    assert memoria._index is None  # sem Aho-Corasick sobre o SQLite
+    assert memoria.search("O que é Rust?") == "Rust é focada em segurança de memória"
+    # Mesmo tamanho de chave: vale a que aparece antes na consulta
+    assert memoria.search_all("claude ou python?") == [
+        "Claude é um modelo de linguagem da Anthropic.",
+        "Python é uma linguagem de programação popular.",
+    ]
+    assert memoria.search_all("openai, claude ou python?")[0] == "OpenAI é uma empresa de pesquisa em IA."
+    armazenamento.fechar()
+
+
+def test_fato_vazio_e_recusado():
+    with pytest.raises(ValueError):
+        LongTermMemory().add("   ")
+
+
+def test_fato_adicionado_depois_da_primeira_busca_entra_no_indice():
+    memoria = LongTermMemory()
+    assert memoria.search("rust") is None
+    memoria.add("rust é uma linguagem")
+    assert memoria.search("e rust?") == "rust é uma linguagem"
+
+
+# ---------- Agent / process_turn ----------
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_agente_ferramenta_antes_do_rag(parallel):
+    agente = Agent(LongTermMemory(), ActionTools(), parallel=parallel)
+    assert agente.decide("Quanto é 2 + 2 em python?") == "A resposta de 2 + 2 é 4."
+    assert agente.decide("o que é python") == "Python é uma linguagem de programação popular."
+    assert agente.decide("qual a capital?") == "Desculpe, não tenho essa informação."
+
+
+def test_executor_paralelo_e_recriado_depois_do_shutdown():
+    agente = Agent(LongTermMemory(), ActionTools(), parallel=True)
+    Agent.shutdown()
+    assert Agent._executor is None
+    assert agente.decide("python") == "Python é uma linguagem de programação popular."
+    Agent.shutdown()
+
+
+def test_process_turn_guarda_historico_e_adiciona_fato():
+    memoria_longa = LongTermMemory()
+    memoria_curta = ShortTermMemory()
+    agente = Agent(memoria_longa, ActionTools())
+    resposta, adicionado = process_turn(agente, memoria_curta, memoria_longa,
+                                        "adicionar memória: Rust é focada em segurança")
+    assert adicionado
+    assert memoria_curta.history == ["adicionar memória: Rust é focada em segurança", resposta]
+    resposta, adicionado = process_turn(agente, memoria_curta, memoria_longa, "o que é rust?")
+    assert (resposta, adicionado) == ("Rust é focada em segurança", False)
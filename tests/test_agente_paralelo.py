@@ -0,0 +1,100 @@
+import asyncio
+import time
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from shared.agente_paralelo import AgenteParalelo
+
+
+class ModeloRoteirizado:
+    """
+    Chat model falso: devolve as respostas do roteiro em ordem e registra as chamadas.
+    """
+    def __init__(self, respostas, demora=0.0):
+        self.respostas = list(respostas)
+        self.demora = demora
+        self.ligacoes = []
+        self.chamadas = []
+
+    def bind_tools(self, tools, **opcoes):
+        self.ligacoes.append(opcoes)
+        modelo = self
+
+        class Ligado:
+            async def ainvoke(self, mensagens, config=None):
+                modelo.chamadas.append((opcoes, list(mensagens)))
+                await asyncio.sleep(modelo.demora)
+                return modelo.respostas.pop(0)
+
+        return Ligado()
+
+
+def chamada(nome, id_chamada, **args):
+    return {"name": nome, "args": args, "id": id_chamada, "type": "tool_call"}
+
+
+@tool
+async def clima(cidade: str) -> str:
+    """Clima atual da cidade."""
+    await asyncio.sleep(0.1)
+    return f"sol em {cidade}"
+
+
+@tool
+def falhar(x: int) -> int:
+    """Sempre falha."""
+    raise RuntimeError("quebrou")
+
+
+def test_ferramentas_do_mesmo_turno_rodam_em_paralelo():
+    modelo = ModeloRoteirizado([
+        AIMessage("", tool_calls=[chamada("clima", "1", cidade="Rio"), chamada("clima", "2", cidade="SP")]),
+        AIMessage("Sol nas duas."),
+    ])
+    agente = AgenteParalelo(modelo, [clima])
+    inicio = time.perf_counter()
+    resultado = agente.invoke({"input": "clima no Rio e em SP?"})
+    assert time.perf_counter() - inicio < 0.19
+    assert resultado["output"] == "Sol nas duas."
+    assert (resultado["passos"], resultado["chamadas_ferramentas"], resultado["parada"]) == (2, 2, "resposta")
+    assert [conteudo for _, conteudo in resultado["intermediate_steps"]] == ["sol em Rio", "sol em SP"]
+
+
+def test_ferramentas_so_sao_ligadas_no_primeiro_uso():
+    modelo = ModeloRoteirizado([AIMessage("a"), AIMessage("b")])
+    agente = AgenteParalelo(modelo, [clima])
+    assert modelo.ligacoes == []
+    agente.run("oi")
+    agente.run("de novo")
+    assert modelo.ligacoes == [{}, {"tool_choice": "none"}]
+
+
+def test_erros_viram_mensagens_para_o_modelo():
+    modelo = ModeloRoteirizado([
+        AIMessage("", tool_calls=[chamada("falhar", "1", x=1), chamada("nao_existe", "2")]),
+        AIMessage("desculpe"),
+    ])
+    resultado = AgenteParalelo(modelo, [falhar], prompt=None).invoke("teste")
+    conteudos = [conteudo for _, conteudo in resultado["intermediate_steps"]]
+    assert conteudos[0] == "Erro: RuntimeError: quebrou"
+    assert conteudos[1].startswith("Erro: ferramenta desconhecida 'nao_existe'")
+    assert resultado["output"] == "desculpe"
+
+
+def test_ultimo_passo_obriga_resposta_sem_ferramentas():
+    modelo = ModeloRoteirizado([
+        AIMessage("", tool_calls=[chamada("clima", "1", cidade="Rio")]),
+        AIMessage("resposta forçada"),
+    ])
+    resultado = AgenteParalelo(modelo, [clima], max_passos=2).invoke("clima?")
+    assert modelo.chamadas[-1][0] == {"tool_choice": "none"}
+    assert (resultado["output"], resultado["parada"]) == ("resposta forçada", "passos")
+
+
+def test_tempo_esgotado():
+    modelo = ModeloRoteirizado([AIMessage("tarde demais")], demora=0.2)
+    resultado = AgenteParalelo(modelo, [clima], tempo_max=0.05).invoke("oi")
+    assert (resultado["output"], resultado["parada"], resultado["passos"]) == (
+        "Tempo esgotado antes de uma resposta final.", "tempo", 0
+    )
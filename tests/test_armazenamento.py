@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from armazenamento import ArmazenamentoSQLite, abrir_armazenamento
+
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "memoria.db"), tamanho_lote=3, intervalo_compactacao=None)
+    yield armazenamento
+    armazenamento.fechar()
+
+
+def test_interface_de_dicionario(armazenamento):
+    armazenamento["python"] = "Python é uma linguagem."
+    armazenamento["python"] = "Python é uma linguagem de programação."
+    armazenamento["rust"] = "Rust é focada em segurança."
+    assert armazenamento["python"] == "Python é uma linguagem de programação."
+    assert len(armazenamento) == 2
+    assert "rust" in armazenamento and "go" not in armazenamento
+    assert sorted(armazenamento) == ["python", "rust"]
+    assert dict(armazenamento.items())["rust"] == "Rust é focada em segurança."
+
+    del armazenamento["rust"]
+    assert "rust" not in armazenamento
+    with pytest.raises(KeyError):
+        armazenamento["rust"]
+    with pytest.raises(KeyError):
+        del armazenamento["rust"]
+
+
+def test_commit_em_lote_e_persistencia(tmp_path):
+    caminho = str(tmp_path / "memoria.db")
+    armazenamento = ArmazenamentoSQLite(caminho, tamanho_lote=3, intervalo_compactacao=None)
+
+    def confirmadas():
+        with sqlite3.connect(caminho) as outra:
+            return outra.execute("SELECT COUNT(*) FROM memoria").fetchone()[0]
+
+    armazenamento["a"] = "1"
+    armazenamento["b"] = "2"
+    assert confirmadas() == 0  # lote ainda aberto
+    armazenamento["c"] = "3"
+    assert confirmadas() == 3
+    armazenamento["d"] = "4"
+    armazenamento.fechar()
+    assert confirmadas() == 4
+
+    reaberto = ArmazenamentoSQLite(caminho, intervalo_compactacao=None)
+    assert reaberto["d"] == "4"
+    assert reaberto.versao == 4
+    reaberto.fechar()
+
+
+def test_buscar_chaves_pela_chave_primaria(armazenamento):
+    for i in range(10):
+        armazenamento[f"k{i}"] = f"v{i}"
+    chaves = [f"k{i}" for i in range(0, 20, 2)] + ["k0"]
+    assert armazenamento.buscar_chaves(chaves, tamanho_bloco=3) == {f"k{i}": f"v{i}" for i in range(0, 10, 2)}
+    assert armazenamento.buscar_chaves([]) == {}
+
+
+def test_versao_conta_escritas(armazenamento):
+    versao = armazenamento.versao
+    armazenamento["a"] = "1"
+    del armazenamento["a"]
+    assert armazenamento.versao == versao + 2
+
+
+def test_abrir_armazenamento_sem_caminho_e_um_dict(tmp_path):
+    assert abrir_armazenamento(None) == {}
+    armazenamento = abrir_armazenamento(str(tmp_path / "m.db"), intervalo_compactacao=None)
+    assert isinstance(armazenamento, ArmazenamentoSQLite)
+    armazenamento.fechar()
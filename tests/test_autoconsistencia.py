@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from autoconsistencia import AutoConsistencia, extrair_numero, extrair_opcao, extrair_resposta_final, extrair_sim_nao
+
+
+@pytest.mark.parametrize("extrator, texto, esperado", [
+    (extrair_numero, "tinha 3, comeu 1, ficou com 2.0 maçãs", "2"),
+    (extrair_numero, "custa 2,5 reais", "2.5"),
+    (extrair_numero, "nenhum número", None),
+    (extrair_resposta_final, "raciocínio 7... Resposta final: 12 maçãs.", "12"),
+    (extrair_resposta_final, "Resposta final: Paris.", "paris"),
+    (extrair_resposta_final, "então são 9", "9"),
+    (extrair_opcao, "A) não, B) talvez. Resposta final: (c)", "C"),
+    (extrair_opcao, "fico com D)", "D"),
+    (extrair_sim_nao, "Não sei... sim, é verdadeiro", "sim"),
+    (extrair_sim_nao, "talvez", None),
+])
+def test_extratores(extrator, texto, esperado):
+    assert extrator(texto) == esperado
+
+
+def roteiro(textos, demoras=None):
+    """
+    amostrar() que devolve os textos em ordem, cada um depois da sua demora.
+    """
+    fila = list(zip(textos, demoras or [0.0] * len(textos)))
+    iniciadas = []
+
+    async def amostrar(prompt):
+        texto, demora = fila.pop(0)
+        iniciadas.append(texto)
+        await asyncio.sleep(demora)
+        return texto, 5
+
+    return amostrar, iniciadas
+
+
+def test_maioria_vence_sem_parada_antecipada():
+    amostrar, _ = roteiro(["Resposta final: 4", "Resposta final: 5", "Resposta final: 4", "nada", "Resposta final: 5"])
+    resultado = asyncio.run(AutoConsistencia(amostrar, amostras=5, margem=3).resolver("p"))
+    assert resultado["votos"] == {"4": 2, "5": 2}
+    assert resultado["invalidas"] == 1
+    assert (resultado["amostras_usadas"], resultado["tokens"], resultado["parada"]) == (5, 25, "todas_amostras")
+
+
+def test_margem_atingida_cancela_as_pendentes():
+    amostrar, _ = roteiro(["Resposta final: 4"] * 2 + ["Resposta final: 5"] * 3, [0.0, 0.0, 1.0, 1.0, 1.0])
+    resultado = asyncio.run(AutoConsistencia(amostrar, amostras=5, margem=2).resolver("p"))
+    assert resultado["resposta"] == "4"
+    assert resultado["cadeia"] == "Resposta final: 4"
+    assert (resultado["parada"], resultado["amostras_usadas"], resultado["canceladas"]) == ("margem", 2, 3)
+    assert resultado["segundos"] < 0.5
+
+
+def test_concorrencia_limitada():
+    amostrar, iniciadas = roteiro(["1"] * 4, [0.05] * 4)
+
+    async def cenario():
+        tarefa = asyncio.ensure_future(AutoConsistencia(amostrar, "numero", amostras=4, max_concorrencia=2,
+                                                        margem=10).resolver("p"))
+        await asyncio.sleep(0.02)
+        em_voo = len(iniciadas)
+        await tarefa
+        return em_voo
+
+    assert asyncio.run(cenario()) == 2
@@ -0,0 +1,53 @@
+import asyncio
+import time
+
+from busca_arvore import BuscaEmFeixe, Orcamento
+
+
+def criar_busca(demora=0.0, **opcoes):
+    async def gerar(problema, passos, indice):
+        await asyncio.sleep(demora)
+        return f" {len(passos)}.{indice} ", 10
+
+    async def avaliar(problema, passos):
+        await asyncio.sleep(demora)
+        # Nota maior para o ramo de índice mais alto em cada passo
+        return sum(int(passo.split(".")[1]) for passo in passos), 1
+
+    return BuscaEmFeixe(gerar, avaliar, **opcoes)
+
+
+def test_feixe_mantem_os_melhores_ramos():
+    resultado = asyncio.run(criar_busca(ramos=3, feixe=2).buscar("p", profundidade=2))
+    assert resultado["melhor"] == {"passos": ["0.2", "1.2"], "nota": 4}
+    assert len(resultado["feixe"]) == 2
+    assert (resultado["niveis"], resultado["parada"]) == (2, "profundidade")
+    # Nível 1: 3 filhos; nível 2: 2 ramos x 3 filhos; 2 chamadas por filho
+    assert resultado["chamadas"] == (3 + 6) * 2
+    assert resultado["tokens"] == (3 + 6) * 11
+
+
+def test_nivel_expandido_em_paralelo():
+    busca = criar_busca(demora=0.05, ramos=4, feixe=4, max_concorrencia=16)
+    inicio = time.perf_counter()
+    asyncio.run(busca.expandir_nivel("p", [{"passos": ["0.1"], "nota": 1}, {"passos": ["0.2"], "nota": 2}]))
+    assert time.perf_counter() - inicio < 0.3  # 8 filhos x (gerar + avaliar) em série levariam 0.8s
+
+
+def test_orcamento_de_chamadas_nunca_e_ultrapassado():
+    resultado = asyncio.run(criar_busca(ramos=3, feixe=2, orcamento=Orcamento(max_chamadas=10)).buscar("p", 5))
+    assert resultado["chamadas"] <= 10
+    assert resultado["parada"] == "orcamento_chamadas"
+    assert resultado["melhor"] is not None
+
+
+def test_orcamento_de_tokens_para_entre_niveis():
+    resultado = asyncio.run(criar_busca(ramos=2, feixe=1, orcamento=Orcamento(max_tokens=20)).buscar("p", 5))
+    assert (resultado["niveis"], resultado["parada"]) == (1, "orcamento_tokens")
+
+
+def test_sem_orcamento_para_o_primeiro_filho_nao_ha_resultado():
+    resultado = asyncio.run(criar_busca(orcamento=Orcamento(max_chamadas=1)).buscar("p", 3))
+    assert resultado["melhor"] is None
+    assert resultado["feixe"] == []
+    assert (resultado["niveis"], resultado["parada"], resultado["chamadas"]) == (0, "orcamento_chamadas", 0)
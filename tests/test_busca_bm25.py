@@ -0,0 +1,80 @@
+import json
+
+from shared.busca_bm25 import IndiceBM25, dividir_em_trechos, obter_indice_bm25
+from shared.cache_documentos import obter_documento
+from shared.leitor_info import MODO_COMPLETO, criar_leitor_info
+
+TEXTO = (
+    "Python é uma linguagem de programação.\n\n"
+    "Rust garante segurança de memória sem coletor de lixo.\n\n"
+    "O café da manhã tem pão e café."
+)
+
+
+def criar_arquivo(tmp_path, texto=TEXTO):
+    caminho = tmp_path / "info.txt"
+    caminho.write_text(texto, encoding="utf-8")
+    # Verifica o arquivo a cada chamada: os testes mudam o conteúdo na hora
+    obter_documento(str(caminho), intervalo_verificacao=0)
+    return str(caminho)
+
+
+def test_trechos_juntam_paragrafos_e_cortam_os_grandes():
+    texto = "a" * 10 + "\n\n" + "b" * 10 + "\n\n" + "c" * 50
+    trechos = dividir_em_trechos(texto, tamanho=30, sobreposicao=5)
+    assert [texto[inicio:fim] for inicio, fim in trechos[:1]] == ["a" * 10 + "\n\n" + "b" * 10]
+    assert [fim - inicio for inicio, fim in trechos[1:]] == [30, 25]
+    assert trechos[-1][1] == len(texto)
+
+
+def test_buscar_devolve_o_trecho_mais_relevante(tmp_path):
+    indice = IndiceBM25(criar_arquivo(tmp_path), tamanho_trecho=60, sobreposicao=0)
+    assert indice.buscar("segurança de memória", k=1) == ["Rust garante segurança de memória sem coletor de lixo."]
+    assert indice.buscar("café")[0].startswith("O café")
+    assert indice.buscar("inexistente") == []
+    assert len("".join(indice.buscar("de", k=3, max_caracteres=20))) <= 20
+
+
+def test_indice_salvo_e_reaproveitado(tmp_path):
+    caminho = criar_arquivo(tmp_path)
+    IndiceBM25(caminho, tamanho_trecho=60, sobreposicao=0).atualizar()
+    with open(f"{caminho}.bm25.json", encoding="utf-8") as f:
+        assert len(json.load(f)["trechos"]) == 3
+    outro = IndiceBM25(caminho, tamanho_trecho=60, sobreposicao=0)
+    outro.atualizar()
+    assert outro.reconstrucoes == 0
+    # Parâmetros diferentes invalidam o índice salvo
+    diferente = IndiceBM25(caminho, tamanho_trecho=30, sobreposicao=0)
+    diferente.atualizar()
+    assert diferente.reconstrucoes == 1
+
+
+def test_arquivo_alterado_gera_nova_versao(tmp_path):
+    caminho = criar_arquivo(tmp_path)
+    indice = IndiceBM25(caminho, tamanho_trecho=60, sobreposicao=0)
+    versao = indice.atualizar()
+    assert indice.atualizar() is versao
+    with open(caminho, "a", encoding="utf-8") as f:
+        f.write("\n\nGo tem goroutines.")
+    nova = indice.atualizar()
+    assert nova is not versao
+    assert indice.buscar("goroutines", k=1)[0].endswith("Go tem goroutines.")
+    # Busca em uma versão antiga continua consistente com o texto dela
+    assert indice.pontuar("goroutines", versao) == {}
+
+
+def test_registro_compartilha_o_indice(tmp_path):
+    caminho = criar_arquivo(tmp_path)
+    assert obter_indice_bm25(caminho) is obter_indice_bm25(caminho)
+
+
+def test_leitor_info_nos_dois_modos(tmp_path):
+    caminho = criar_arquivo(tmp_path)
+    trechos = criar_leitor_info(caminho).func("rust")
+    assert trechos.startswith("Trechos relevantes do arquivo:\n")
+    assert "Rust garante" in trechos
+    assert criar_leitor_info(caminho).func("xyz") == "Nenhum trecho do arquivo é relevante para essa consulta."
+    completo = criar_leitor_info(caminho, modo=MODO_COMPLETO, nome="Leitor")
+    assert completo.name == "Leitor"
+    assert completo.func("qualquer coisa") == f"Conteúdo do arquivo:\n{TEXTO}"
+    assert criar_leitor_info(str(tmp_path / "nao_existe.txt")).func("x").startswith("Erro ao ler o arquivo")
@@ -0,0 +1,73 @@
+import numpy as np
+
+from armazenamento import ArmazenamentoSQLite
+from busca_vetorial import EmbedderHash, IndiceVetorial
+from ContextEngineeringConceptv2 import LongTermMemory
+
+FATOS = {
+    "python": "Python é uma linguagem de programação popular.",
+    "sqlite": "SQLite é um banco de dados embutido em um arquivo.",
+    "numpy": "NumPy faz operações com matrizes e vetores.",
+}
+
+
+def test_salvar_carregar_mmap_e_busca_em_lote(tmp_path):
+    indice = IndiceVetorial(EmbedderHash())
+    indice.adicionar_lote(list(FATOS), list(FATOS.values()))
+    prefixo = str(tmp_path / "indice")
+    indice.salvar(prefixo)
+
+    carregado = IndiceVetorial.carregar(prefixo, EmbedderHash(), mmap=True)
+    assert isinstance(carregado._matriz, np.memmap)
+    assert carregado.chaves == list(FATOS)
+
+    consultas = ["linguagem de programação", "banco de dados em arquivo", "matrizes e vetores"]
+    esperado = indice.buscar_lote(consultas, k=1)
+    resultados = carregado.buscar_lote(consultas, k=1)
+    assert [r[0][0] for r in resultados] == ["python", "sqlite", "numpy"]
+    assert [r[0][0] for r in resultados] == [e[0][0] for e in esperado]
+
+
+def test_indice_carregado_aceita_novos_fatos_e_salva_sobre_o_mmap(tmp_path):
+    prefixo = str(tmp_path / "indice")
+    indice = IndiceVetorial(EmbedderHash())
+    indice.adicionar_lote(list(FATOS), list(FATOS.values()))
+    indice.salvar(prefixo)
+
+    carregado = IndiceVetorial.carregar(prefixo, EmbedderHash(), mmap=True)
+    carregado.adicionar("gato", "Gato é um animal que mia.")
+    carregado.salvar(prefixo)  # sobrescreve os arquivos abertos com memory-map
+    assert IndiceVetorial.carregar(prefixo, EmbedderHash()).buscar("animal que mia", k=1)[0][0] == "gato"
+
+
+def test_memoria_em_dia_nao_recalcula_embeddings(tmp_path):
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "memoria.db"), intervalo_compactacao=None)
+    memoria = LongTermMemory(armazenamento, semantic_index=IndiceVetorial(EmbedderHash()))
+    memoria.add("Gato é um animal que mia.")
+    prefixo = str(tmp_path / "indice")
+    memoria.save_semantic_index(prefixo)
+
+    indice = IndiceVetorial.carregar(prefixo, EmbedderHash(), mmap=True)
+    reaberta = LongTermMemory(armazenamento, semantic_index=indice)
+    assert reaberta.sync_semantic_index() == 0
+    assert reaberta.search_semantic("animal que mia", k=1) == ["Gato é um animal que mia."]
+    armazenamento.fechar()
+
+
+def test_troca_de_chave_com_mesmo_tamanho_e_detectada(tmp_path):
+    armazenamento = ArmazenamentoSQLite(str(tmp_path / "memoria.db"), intervalo_compactacao=None)
+    memoria = LongTermMemory(armazenamento, semantic_index=IndiceVetorial(EmbedderHash()))
+    prefixo = str(tmp_path / "indice")
+    memoria.save_semantic_index(prefixo)
+
+    # Fora do índice: uma chave sai e outra entra, o tamanho não muda
+    del armazenamento["openai"]
+    armazenamento["gato"] = "Gato é um animal que mia."
+
+    indice = IndiceVetorial.carregar(prefixo, EmbedderHash(), mmap=True)
+    reaberta = LongTermMemory(armazenamento, semantic_index=indice)
+    assert "gato" in indice
+    assert reaberta.search_semantic("animal que mia", k=1) == ["Gato é um animal que mia."]
+    # Chave apagada que ficou no índice é ignorada
+    assert all(fato is not None for fato in reaberta.search_semantic("OpenAI pesquisa em IA", k=4))
+    armazenamento.fechar()
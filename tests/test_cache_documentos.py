@@ -0,0 +1,41 @@
+import os
+
+from shared.cache_documentos import DocumentoEmCache, obter_documento
+
+
+def test_le_uma_vez_e_reler_so_quando_muda(tmp_path):
+    caminho = tmp_path / "info.txt"
+    caminho.write_text("Python e Rust", encoding="utf-8")
+    documento = DocumentoEmCache(str(caminho), intervalo_verificacao=0)
+    assert documento.obter_texto() == "Python e Rust"
+    assert documento.contem("RUST")
+    assert documento.leituras == 1
+
+    caminho.write_text("Só Go agora", encoding="utf-8")
+    assert documento.obter_texto() == "Só Go agora"
+    assert not documento.contem("rust")
+    assert documento.leituras == 2
+    assert documento.versao == (documento.assinatura, "Só Go agora")
+
+
+def test_intervalo_de_verificacao_evita_stat(tmp_path):
+    caminho = tmp_path / "info.txt"
+    caminho.write_text("antes", encoding="utf-8")
+    documento = DocumentoEmCache(str(caminho), intervalo_verificacao=3600)
+    caminho.write_text("depois!", encoding="utf-8")
+    assert documento.obter_texto() == "antes"
+    documento.atualizar(forcar=True)
+    assert documento.obter_texto() == "depois!"
+
+
+def test_arquivo_vazio(tmp_path):
+    caminho = tmp_path / "vazio.txt"
+    caminho.write_bytes(b"")
+    assert DocumentoEmCache(str(caminho)).obter_texto() == ""
+
+
+def test_registro_por_caminho_absoluto(tmp_path):
+    caminho = tmp_path / "info.txt"
+    caminho.write_text("x", encoding="utf-8")
+    relativo = os.path.relpath(caminho)
+    assert obter_documento(str(caminho)) is obter_documento(relativo)
@@ -0,0 +1,64 @@
+import json
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration
+
+from cache_llm import CacheRespostasLLM, cache_para, normalizar_prompt
+
+
+def prompt(texto, id_mensagem="1"):
+    return json.dumps([{"kwargs": {"content": texto, "id": id_mensagem, "response_metadata": {"t": id_mensagem}}}])
+
+
+def geracao(texto):
+    return [ChatGeneration(message=AIMessage(texto))]
+
+
+def test_normalizar_remove_ids_e_bordas_mas_mantem_espacos_internos():
+    assert normalizar_prompt(prompt("  oi  ", "a")) == normalizar_prompt(prompt("oi", "b"))
+    assert normalizar_prompt(prompt("def f():\n    return 1")) != normalizar_prompt(prompt("def f(): return 1"))
+    assert normalizar_prompt("  texto livre ") == "texto livre"
+
+
+def test_arquivo_so_e_aberto_no_primeiro_uso(tmp_path):
+    caminho = tmp_path / "cache.db"
+    cache = CacheRespostasLLM(str(caminho))
+    assert not caminho.exists()
+    assert cache.lookup(prompt("oi"), "modelo") is None
+    assert caminho.exists()
+    cache.fechar()
+
+
+def test_memoria_disco_e_lote(tmp_path):
+    caminho = str(tmp_path / "cache.db")
+    cache = CacheRespostasLLM(caminho, max_itens_memoria=1, tamanho_lote=2)
+    cache.update(prompt("a"), "modelo", geracao("A"))
+    assert cache._conexao.in_transaction  # primeira gravação fica no lote
+    cache.update(prompt("b"), "modelo", geracao("B"))
+    assert not cache._conexao.in_transaction  # lote cheio: COMMIT
+
+    assert cache.lookup(prompt("b"), "modelo")[0].message.content == "B"  # memória
+    assert cache.lookup(prompt("a"), "modelo")[0].message.content == "A"  # disco (saiu do LRU)
+    assert cache.lookup(prompt("a"), "outro modelo") is None
+    estatisticas = cache.estatisticas()
+    assert (estatisticas["acertos_memoria"], estatisticas["acertos_disco"], estatisticas["falhas"]) == (1, 1, 1)
+    cache.fechar()
+
+
+def test_fechar_confirma_o_lote_pendente(tmp_path):
+    caminho = str(tmp_path / "cache.db")
+    cache = CacheRespostasLLM(caminho, tamanho_lote=100)
+    cache.update(prompt("a"), "modelo", geracao("A"))
+    cache.fechar()
+    reaberto = CacheRespostasLLM(caminho)
+    assert reaberto.lookup(prompt("a", "outro id"), "modelo")[0].message.content == "A"
+    reaberto.clear()
+    assert reaberto.lookup(prompt("a"), "modelo") is None
+    reaberto.fechar()
+
+
+def test_cache_so_para_chamadas_deterministicas(tmp_path):
+    cache = CacheRespostasLLM(str(tmp_path / "cache.db"))
+    assert cache_para(cache, 0) is cache
+    assert cache_para(cache, 0.7) is None
+    assert cache_para(cache, 0.7, permitir_amostragem=True) is cache
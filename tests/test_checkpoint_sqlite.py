@@ -0,0 +1,101 @@
+import operator
+from typing import Annotated, TypedDict
+
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, START, StateGraph
+
+from checkpoint_sqlite import CheckpointSQLite, abrir_checkpointer
+
+
+class Estado(TypedDict):
+    passos: Annotated[list, operator.add]
+
+
+def grafo_com(checkpointer):
+    grafo = StateGraph(Estado)
+    grafo.add_node("passo", lambda estado: {"passos": [len(estado["passos"])]})
+    grafo.add_edge(START, "passo")
+    grafo.add_edge("passo", END)
+    return grafo.compile(checkpointer=checkpointer)
+
+
+def abrir(tmp_path, **opcoes):
+    opcoes.setdefault("intervalo_compactacao", None)
+    return CheckpointSQLite(str(tmp_path / "checkpoints.db"), **opcoes)
+
+
+def test_put_sem_checkpoint_ns_usa_o_namespace_raiz(tmp_path):
+    checkpointer = abrir(tmp_path)
+    checkpoint = empty_checkpoint()
+    config = checkpointer.put({"configurable": {"thread_id": "t"}}, checkpoint, {}, {})
+    assert config["configurable"] == {"thread_id": "t", "checkpoint_ns": "", "checkpoint_id": checkpoint["id"]}
+    checkpointer.put_writes(config, [("passos", [1])], "tarefa")
+    tupla = checkpointer.get_tuple({"configurable": {"thread_id": "t"}})
+    assert tupla.checkpoint["id"] == checkpoint["id"]
+    assert tupla.pending_writes == [("tarefa", "passos", [1])]
+    checkpointer.fechar()
+
+
+def test_estado_persiste_entre_aberturas(tmp_path):
+    checkpointer = abrir(tmp_path)
+    config = {"configurable": {"thread_id": "conversa"}}
+    grafo = grafo_com(checkpointer)
+    grafo.invoke({"passos": []}, config)
+    grafo.invoke({"passos": []}, config)
+    checkpointer.fechar()
+
+    reaberto = abrir(tmp_path)
+    assert grafo_com(reaberto).get_state(config).values == {"passos": [0, 1]}
+    reaberto.fechar()
+
+
+def test_escritas_agrupadas_em_lotes(tmp_path):
+    checkpointer = abrir(tmp_path, tamanho_lote=1000)
+    grafo_com(checkpointer).invoke({"passos": []}, {"configurable": {"thread_id": "t"}})
+    assert checkpointer._pendentes > 0  # put e put_writes ainda no lote aberto
+    assert checkpointer._conexao.in_transaction
+    checkpointer.flush()
+    assert checkpointer._pendentes == 0
+    assert not checkpointer._conexao.in_transaction
+    checkpointer.fechar()
+
+
+def test_list_e_poda_mantem_os_ultimos(tmp_path):
+    checkpointer = abrir(tmp_path, manter_ultimos=3)
+    config = {"configurable": {"thread_id": "t"}}
+    grafo = grafo_com(checkpointer)
+    for _ in range(4):
+        grafo.invoke({"passos": []}, config)
+    antes = list(checkpointer.list(config))
+    assert len(antes) > 3
+    assert [tupla.config["configurable"]["checkpoint_id"] for tupla in antes] == sorted(
+        (tupla.config["configurable"]["checkpoint_id"] for tupla in antes), reverse=True
+    )
+    assert checkpointer.podar() == len(antes) - 3
+    depois = list(checkpointer.list(config))
+    assert depois == antes[:3]
+    assert grafo.get_state(config).values["passos"] == [0, 1, 2, 3]
+    checkpointer.fechar()
+
+
+def test_fechar_para_a_thread_de_compactacao(tmp_path):
+    checkpointer = abrir(tmp_path, intervalo_compactacao=0.01)
+    grafo_com(checkpointer).invoke({"passos": []}, {"configurable": {"thread_id": "t"}})
+    checkpointer.fechar()
+    assert not checkpointer._compactador.is_alive()
+    checkpointer.fechar()  # idempotente
+    checkpointer.compactar()  # depois de fechar, não faz nada
+
+
+def test_delete_thread(tmp_path):
+    checkpointer = abrir(tmp_path)
+    config = {"configurable": {"thread_id": "t"}}
+    grafo_com(checkpointer).invoke({"passos": []}, config)
+    checkpointer.delete_thread("t")
+    assert checkpointer.get_tuple(config) is None
+    checkpointer.fechar()
+
+
+def test_abrir_checkpointer_sem_caminho_usa_memoria():
+    from langgraph.checkpoint.memory import MemorySaver
+    assert isinstance(abrir_checkpointer(), MemorySaver)
@@ -0,0 +1,98 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.tools import Tool
+
+from dag_ferramentas import GrafoDeFerramentas, OrquestradorDAG, extrair_lista_ferramentas
+
+
+def lenta(nome, demora=0.1):
+    async def ferramenta(entrada):
+        await asyncio.sleep(demora)
+        return f"{nome}<{entrada.count(':')}>"
+    return ferramenta
+
+
+def grafo_de_viagem():
+    grafo = GrafoDeFerramentas()
+    grafo.adicionar("voos", lenta("voos"), descricao="busca voos")
+    grafo.adicionar("hoteis", lenta("hoteis"), descricao="busca hotéis")
+    grafo.adicionar("roteiro", lenta("roteiro"), depende_de=["voos", "hoteis"], descricao="monta o roteiro")
+    return grafo
+
+
+def test_fechamento_em_ordem_topologica():
+    grafo = grafo_de_viagem()
+    assert grafo.fechamento(["roteiro"]) == ["voos", "hoteis", "roteiro"]
+    assert grafo.fechamento(["hoteis"]) == ["hoteis"]
+    with pytest.raises(ValueError, match="desconhecida"):
+        grafo.fechamento(["trem"])
+    grafo.adicionar("a", lenta("a"), depende_de=["b"]).adicionar("b", lenta("b"), depende_de=["a"])
+    with pytest.raises(ValueError, match="Ciclo"):
+        grafo.fechamento(["a"])
+
+
+def test_independentes_em_paralelo_e_dependentes_recebem_os_resultados():
+    inicio = time.perf_counter()
+    execucao = asyncio.run(grafo_de_viagem().executar("Lisboa"))
+    # voos e hoteis juntos (0.1s) e depois roteiro (0.1s), em vez de 0.3s em série
+    assert time.perf_counter() - inicio < 0.28
+    assert execucao["resultados"] == {"voos": "voos<0>", "hoteis": "hoteis<0>", "roteiro": "roteiro<2>"}
+    assert execucao["tempos"]["roteiro"][0] >= execucao["tempos"]["voos"][1]
+
+
+def test_falha_vira_texto_para_as_dependentes():
+    def quebrar(entrada):
+        raise RuntimeError("fora do ar")
+
+    grafo = GrafoDeFerramentas().adicionar("voos", quebrar)
+    grafo.adicionar("roteiro", lambda entrada: entrada.split("\n\n")[-1], depende_de=["voos"])
+    resultados = asyncio.run(grafo.executar("pedido"))["resultados"]
+    assert resultados["voos"] == "Erro: RuntimeError: fora do ar"
+    assert resultados["roteiro"] == "voos: Erro: RuntimeError: fora do ar"
+
+
+def test_de_tools_e_descricao():
+    tools = [Tool(name="voos", func=str.upper, description="busca voos"),
+             Tool(name="roteiro", func=str.lower, description="monta o roteiro")]
+    grafo = GrafoDeFerramentas.de_tools(tools, {"roteiro": ["voos"]})
+    assert grafo.descrever() == "- voos: busca voos\n- roteiro: monta o roteiro (usa o resultado de: voos)"
+    assert asyncio.run(grafo.executar("rio", ["voos"]))["resultados"] == {"voos": "RIO"}
+
+
+@pytest.mark.parametrize("texto, esperado", [
+    ('["roteiro", "trem"]', ["roteiro"]),
+    ('Plano: {"ferramentas": ["voos"]}', ["voos"]),
+    ("vou usar hoteis e voos", ["voos", "hoteis"]),
+    ("[quebrado", []),
+])
+def test_extrair_lista_ferramentas(texto, esperado):
+    assert extrair_lista_ferramentas(texto, ["voos", "hoteis", "roteiro"]) == esperado
+
+
+def test_orquestrador_faz_duas_chamadas_ao_llm():
+    prompts = []
+
+    async def planejar(prompt):
+        prompts.append(prompt)
+        return '["hoteis"]'
+
+    async def sintetizar(prompt):
+        prompts.append(prompt)
+        return "pronto"
+
+    resultado = asyncio.run(OrquestradorDAG(grafo_de_viagem(), planejar, sintetizar).executar("Lisboa"))
+    assert resultado["resposta"] == "pronto"
+    assert resultado["escolhidas"] == ["hoteis"]
+    assert resultado["resultados"] == {"hoteis": "hoteis<0>"}
+    assert len(prompts) == 2
+    assert "- hoteis: hoteis<0>" in prompts[1]
+
+
+def test_plano_sem_ferramenta_valida_roda_todas():
+    async def planejar(prompt):
+        return "não sei"
+
+    resultado = asyncio.run(OrquestradorDAG(grafo_de_viagem(), planejar).executar("x"))
+    assert resultado["escolhidas"] == ["voos", "hoteis", "roteiro"]
@@ -0,0 +1,107 @@
+import asyncio
+import json
+from typing import TypedDict
+
+from langgraph.graph import END, START, StateGraph
+
+from executor_lote import executar_lote, linhas_concluidas
+
+
+class Estado(TypedDict):
+    x: int
+    dobro: int
+
+
+def criar_grafo(executadas):
+    async def dobrar(estado):
+        executadas.append(estado["x"])
+        if estado["x"] < 0:
+            raise ValueError("negativo")
+        # Os primeiros terminam por último: testa a ordem da saída
+        await asyncio.sleep(0.01 * (10 - estado["x"]))
+        return {"dobro": 2 * estado["x"]}
+
+    grafo = StateGraph(Estado)
+    grafo.add_node("dobrar", dobrar)
+    grafo.add_edge(START, "dobrar")
+    grafo.add_edge("dobrar", END)
+    return grafo.compile()
+
+
+def escrever_linhas(caminho, linhas):
+    caminho.write_text("".join(linha + "\n" for linha in linhas), encoding="utf-8")
+
+
+def ler_saida(caminho):
+    return [json.loads(linha) for linha in caminho.read_text(encoding="utf-8").splitlines()]
+
+
+def test_saida_na_ordem_da_entrada_com_erros_por_linha(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    escrever_linhas(entrada, ['{"x": 1}', '{"x": 2}', "nao e json", "", '{"x": -1}', '{"x": 3}'])
+    estatisticas = asyncio.run(executar_lote(criar_grafo([]), str(entrada), str(saida), max_concorrencia=4))
+    registros = ler_saida(saida)
+    assert [registro["linha"] for registro in registros] == [1, 2, 3, 5, 6]
+    assert registros[0]["saida"] == {"x": 1, "dobro": 2}
+    assert registros[2]["erro"].startswith("JSONDecodeError")
+    assert registros[3]["erro"] == "ValueError: negativo"
+    assert (estatisticas["processadas"], estatisticas["erros"]) == (5, 2)
+
+
+def test_fora_de_ordem_grava_na_ordem_de_conclusao(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    escrever_linhas(entrada, [json.dumps({"x": x}) for x in range(1, 5)])
+    asyncio.run(executar_lote(criar_grafo([]), str(entrada), str(saida), ordenado=False))
+    assert [registro["linha"] for registro in ler_saida(saida)] == [4, 3, 2, 1]
+
+
+def test_retomada_pula_concluidas_e_descarta_linha_incompleta(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    escrever_linhas(entrada, [json.dumps({"x": x}) for x in range(1, 5)])
+    saida.write_bytes(b'{"linha": 1, "saida": {}}\n{"linha": 2, "saida": {}}\n{"linha": 3, "sa')
+    executadas = []
+    estatisticas = asyncio.run(executar_lote(criar_grafo(executadas), str(entrada), str(saida)))
+    assert sorted(executadas) == [3, 4]
+    assert estatisticas["puladas"] == 2
+    assert [registro["linha"] for registro in ler_saida(saida)] == [1, 2, 3, 4]
+
+
+def test_linhas_concluidas_deduplica_e_refaz_erros(tmp_path):
+    saida = tmp_path / "saida.jsonl"
+    saida.write_text(
+        '{"linha": 1, "erro": "x"}\n{"linha": 2, "saida": {}}\n{"linha": 1, "saida": {"ok": true}}\n'
+        '{"linha": 3, "erro": "y"}\nlixo\n',
+        encoding="utf-8",
+    )
+    assert linhas_concluidas(str(saida)) == {1, 2, 3}
+    # Duplicata e registro corrompido saem do arquivo; vale o último registro de cada linha
+    assert [registro["linha"] for registro in ler_saida(saida)] == [2, 1, 3]
+    assert linhas_concluidas(str(saida), refazer_erros=True) == {1, 2}
+    assert all("erro" not in registro for registro in ler_saida(saida))
+    assert linhas_concluidas(str(tmp_path / "nao_existe.jsonl")) == set()
+
+
+def test_refazer_erros_deixa_um_registro_por_linha(tmp_path):
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    escrever_linhas(entrada, ['{"x": 1}', '{"x": 2}'])
+    saida.write_text('{"linha": 1, "saida": {}}\n{"linha": 2, "erro": "falhou"}\n', encoding="utf-8")
+    executadas = []
+    asyncio.run(executar_lote(criar_grafo(executadas), str(entrada), str(saida), refazer_erros=True))
+    assert executadas == [2]
+    assert ler_saida(saida) == [{"linha": 1, "saida": {}}, {"linha": 2, "saida": {"x": 2, "dobro": 4}}]
+
+
+def test_executor_padrao_de_quem_chama_nao_e_trocado(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    entrada, saida = tmp_path / "entrada.jsonl", tmp_path / "saida.jsonl"
+    escrever_linhas(entrada, ['{"x": 1}'])
+
+    async def cenario():
+        laco = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1)
+        laco.set_default_executor(executor)
+        await executar_lote(criar_grafo([]), str(entrada), str(saida))
+        return laco._default_executor is executor
+
+    assert asyncio.run(cenario())
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from shared import fabrica_llm
+from shared.fabrica_llm import LLMPreguicoso, _chave_modelo, _mascarar, _TransportePorLoop, obter_llm
+
+
+@pytest.fixture
+def chave_falsa(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "sk-teste-nao-usada")
+
+
+def test_chave_do_modelo_aceita_opcoes_nao_hashaveis():
+    a = _chave_modelo("m", 0, {"model_kwargs": {"top_p": 1, "seed": 2}, "stop": ["\n"]})
+    b = _chave_modelo("m", 0, {"stop": ["\n"], "model_kwargs": {"seed": 2, "top_p": 1}})
+    assert a == b
+    assert a != _chave_modelo("m", 0.5, {"stop": ["\n"], "model_kwargs": {"seed": 2, "top_p": 1}})
+    assert _chave_modelo("m", 0, {"cache": object()})  # sem JSON: entra pelo repr
+
+
+def test_mascarar_segredos():
+    assert _mascarar("api_key", "sk-1234567890") == "sk-***"
+    assert _mascarar("openai_api_key", "curta") == "***"
+    assert _mascarar("max_tokens", 100) == 100
+
+
+def test_mesma_configuracao_mesma_instancia(chave_falsa):
+    modelo = obter_llm("gpt-teste", 0, max_tokens=10)
+    assert obter_llm("gpt-teste", 0, max_tokens=10) is modelo
+    assert obter_llm("gpt-teste", 0, max_tokens=20) is not modelo
+    assert modelo.http_client is fabrica_llm.obter_cliente_http()
+    assert modelo.http_async_client is fabrica_llm.obter_cliente_http_async()
+
+
+def test_llm_preguicoso_so_cria_no_primeiro_uso(chave_falsa):
+    preguicoso = LLMPreguicoso("gpt-preguicoso", 0, api_key="sk-abcdefghijkl")
+    assert "pendente" in repr(preguicoso)
+    assert "sk-abcdefghijkl" not in repr(preguicoso)
+    assert preguicoso.model_name == "gpt-preguicoso"
+    assert "criado" in repr(preguicoso)
+    assert preguicoso.obter() is obter_llm("gpt-preguicoso", 0, api_key="sk-abcdefghijkl")
+
+
+def test_configurar_pool_recusa_opcao_desconhecida():
+    with pytest.raises(ValueError):
+        fabrica_llm.configurar_pool(conexoes=1)
+
+
+def test_um_pool_por_event_loop_fechado_com_o_loop():
+    transporte = _TransportePorLoop()
+
+    async def usar():
+        primeiro = await transporte._transporte()
+        assert await transporte._transporte() is primeiro
+        return primeiro
+
+    a = asyncio.run(usar())
+    b = asyncio.run(usar())
+    assert a is not b
+    # O asyncio.run encerra o vigia de cada loop, que fecha e remove o pool
+    assert len(transporte._por_loop) == 0
+    assert a._pool.connections == []
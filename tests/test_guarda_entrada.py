@@ -0,0 +1,48 @@
+import re
+
+from guarda_entrada import BLOQUEAR, MASCARAR, PERMITIR, ROTEAR, GuardaEntrada, cpf_valido, regex_de_trie
+
+
+def test_regex_de_trie_equivale_a_alternancia():
+    palavras = ["porra", "porcaria", "por", "bosta", "b"]
+    regex = re.compile(rf"\b{regex_de_trie(palavras)}\b", re.IGNORECASE)
+    for palavra in palavras:
+        assert regex.fullmatch(palavra)
+        assert regex.fullmatch(palavra.upper())
+    for outra in ["porc", "bost", "porrada", "bb"]:
+        assert not regex.fullmatch(outra)
+
+
+def test_cpf_valido():
+    assert cpf_valido("529.982.247-25")
+    assert not cpf_valido("529.982.247-24")
+    assert not cpf_valido("111.111.111-11")
+
+
+def test_mascara_pii_e_permite_texto_limpo():
+    guarda = GuardaEntrada()
+    assert guarda.verificar("Qual o horário da loja?")["acao"] == PERMITIR
+    resultado = guarda.verificar("Sou maria@example.com, CPF 529.982.247-25, fone (11) 98765-4321")
+    assert resultado["acao"] == MASCARAR
+    assert resultado["texto"] == "Sou [EMAIL], CPF [CPF], fone [TELEFONE]"
+    assert [categoria for categoria, _ in resultado["achados"]] == ["email", "cpf", "telefone"]
+
+
+def test_onze_digitos_que_nao_sao_cpf_podem_ser_celular():
+    guarda = GuardaEntrada()
+    assert guarda.verificar("liga 11987654321")["achados"] == [("telefone", "11987654321")]
+    assert guarda.verificar("pedido 12345678901")["acao"] == PERMITIR
+
+
+def test_palavrao_bloqueia_e_acoes_configuraveis():
+    assert GuardaEntrada().verificar("que porra é essa")["acao"] == BLOQUEAR
+    guarda = GuardaEntrada(acoes={"palavrao": ROTEAR}, rota="humano")
+    resultado = guarda.verificar("que PORRA, meu email é a@b.com")
+    assert (resultado["acao"], resultado["rota"]) == (ROTEAR, "humano")
+    assert GuardaEntrada(palavroes=()).verificar("que porra")["acao"] == PERMITIR
+
+
+def test_lote_igual_a_verificacao_individual():
+    guarda = GuardaEntrada()
+    textos = ["oi", "email a@b.com", "que merda", "fone 11 98765-4321", "", "x\x00y@z.com"]
+    assert guarda.verificar_lote(textos) == [guarda.verificar(texto.replace("\x00", " ")) for texto in textos]
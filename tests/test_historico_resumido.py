@@ -0,0 +1,78 @@
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+from langgraph.graph.message import REMOVE_ALL_MESSAGES
+
+from historico_resumido import PREFIXO_ID_RESUMO, PREFIXO_TEXTO_RESUMO, HistoricoResumido
+
+
+def contar_palavras(texto):
+    return len(texto.split())
+
+
+def historico(max_tokens, **opcoes):
+    return HistoricoResumido(max_tokens=max_tokens, contar_tokens=contar_palavras, tokens_por_mensagem=0, **opcoes)
+
+
+def conversa():
+    return [
+        SystemMessage("seja breve", id="s"),
+        HumanMessage("primeira pergunta longa aqui", id="h1"),
+        AIMessage("primeira resposta longa aqui", id="a1"),
+        HumanMessage("segunda pergunta", id="h2"),
+        AIMessage("", id="a2", tool_calls=[{"name": "dobrar", "args": {"x": 2}, "id": "c1"}]),
+        ToolMessage("4", tool_call_id="c1", id="t1"),
+        AIMessage("deu quatro", id="a3"),
+        HumanMessage("terceira", id="h3"),
+    ]
+
+
+def test_dentro_do_orcamento_nada_muda():
+    mensagens = conversa()
+    assert historico(1000)(({"messages": mensagens})) == {"llm_input_messages": mensagens}
+
+
+def test_corte_mantem_sistema_turno_atual_e_gera_resumo():
+    hook = historico(12)
+    saida = hook({"messages": conversa()})["messages"]
+    assert isinstance(saida[0], RemoveMessage) and saida[0].id == REMOVE_ALL_MESSAGES
+    assert saida[1].id == "s"
+    resumo = saida[2]
+    assert resumo.id.startswith(PREFIXO_ID_RESUMO)
+    assert resumo.content.startswith(PREFIXO_TEXTO_RESUMO)
+    assert "primeira pergunta" in resumo.content
+    assert [mensagem.id for mensagem in saida[3:]][-1] == "h3"
+    assert hook.cortes == 1
+
+
+def test_chamada_de_ferramenta_nao_e_separada_do_resultado():
+    saida = historico(8, resumir=None)({"messages": conversa()})["messages"]
+    ids = [mensagem.id for mensagem in saida[1:]]
+    assert ("a2" in ids) == ("t1" in ids)
+    assert ids[0] == "s" and ids[-1] == "h3"
+
+
+def test_prompt_de_sistema_conta_no_orcamento():
+    mensagens = conversa()
+    total = sum(contar_palavras(mensagem.content) for mensagem in mensagens) + contar_palavras("dobrar({'x': 2})")
+    assert "llm_input_messages" in historico(total)({"messages": mensagens})
+    # O mesmo orçamento com um prompt de sistema fora do estado força um corte
+    assert "messages" in historico(total, prompt="responda sempre em português")({"messages": mensagens})
+
+
+def test_resumo_anterior_e_reaproveitado():
+    vistos = []
+
+    def resumir(resumo, removidas):
+        vistos.append(resumo)
+        return resumo + "+" + ",".join(mensagem.id for mensagem in removidas)
+
+    hook = historico(12, resumir=resumir)
+    estado = hook({"messages": conversa()})["messages"][1:]
+    estado += [AIMessage("resposta final três " * 3, id="a4"), HumanMessage("quarta", id="h4")]
+    hook({"messages": estado})
+    assert vistos[0] == ""
+    assert vistos[1] == hook_resumo_sem_prefixo(estado)
+
+
+def hook_resumo_sem_prefixo(mensagens):
+    resumo = next(mensagem for mensagem in mensagens if (mensagem.id or "").startswith(PREFIXO_ID_RESUMO))
+    return resumo.content[len(PREFIXO_TEXTO_RESUMO):]
@@ -0,0 +1,35 @@
+import pytest
+
+from indice_aho_corasick import IndiceAhoCorasick
+
+
+def test_encontra_todas_as_chaves_em_uma_passada():
+    indice = IndiceAhoCorasick(["python", "openai", "claude"])
+    assert set(indice.buscar("me fale de python e da openai")) == {"python", "openai"}
+    assert indice.buscar("nada relevante aqui") == []
+
+
+def test_ordem_mais_longa_depois_posicao_depois_insercao():
+    indice = IndiceAhoCorasick(["ab", "x", "abc", "y"])
+    # "abc" (mais longa) vence "ab"; entre "x" e "y", quem aparece antes no texto
+    assert indice.buscar("y x abc") == ["abc", "ab", "y", "x"]
+
+
+def test_chaves_sobrepostas_e_sufixos():
+    indice = IndiceAhoCorasick(["he", "she", "hers", "his"])
+    assert indice.ocorrencias("ushers") == {"she": 1, "he": 2, "hers": 2}
+
+
+def test_adicionar_depois_de_buscar_recalcula_os_links():
+    indice = IndiceAhoCorasick(["python"])
+    assert indice.buscar("rust e python") == ["python"]
+    indice.adicionar("rust")
+    indice.adicionar("rust")  # repetida: ignorada
+    assert len(indice) == 2
+    assert "rust" in indice
+    assert indice.buscar("rust e python") == ["python", "rust"]
+
+
+def test_chave_vazia_e_recusada():
+    with pytest.raises(ValueError):
+        IndiceAhoCorasick().adicionar("")
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.tools import StructuredTool, Tool
+
+from shared.memo_ferramentas import MemoTTL, memo_da_tool, memoizar_tool, memoizar_tools, normalizar_entrada
+
+
+def test_normalizar_entrada():
+    assert normalizar_entrada("  Voos  SAO\tRio ") == normalizar_entrada("voos sao rio")
+    assert normalizar_entrada(b=1, a="X") == normalizar_entrada(a="x", b=1)
+    assert normalizar_entrada("a") != normalizar_entrada("b")
+
+
+def test_ttl_expira(monkeypatch):
+    agora = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: agora[0])
+    memo = MemoTTL(ttl=10)
+    chamadas = []
+    funcao = lambda x: chamadas.append(x) or x * 2  # noqa: E731
+    assert memo.chamar("k", funcao, 2) == 4
+    assert memo.chamar("k", funcao, 2) == 4
+    agora[0] += 11
+    assert memo.chamar("k", funcao, 2) == 4
+    assert chamadas == [2, 2]
+    assert memo.estatisticas()["expiradas"] == 1
+
+
+def test_lru_limita_itens():
+    memo = MemoTTL(max_itens=2)
+    for chave in ("a", "b", "a", "c"):
+        memo.chamar(chave, str.upper, chave)
+    assert list(memo._itens) == ["a", "c"]
+
+
+def test_erros_nao_ficam_em_cache():
+    memo = MemoTTL()
+    tentativas = []
+
+    def instavel():
+        tentativas.append(1)
+        if len(tentativas) == 1:
+            raise RuntimeError("falhou")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        memo.chamar("k", instavel)
+    assert memo.chamar("k", instavel) == "ok"
+    assert len(tentativas) == 2
+
+
+def test_chamadas_simultaneas_sao_coalescidas():
+    memo = MemoTTL()
+    liberar = threading.Event()
+    execucoes = []
+
+    def lenta():
+        execucoes.append(1)
+        liberar.wait(5)
+        return "resultado"
+
+    resultados = []
+    threads = [threading.Thread(target=lambda: resultados.append(memo.chamar("k", lenta))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while memo.estatisticas()["coalescidas"] < 4:
+        time.sleep(0.001)
+    liberar.set()
+    for thread in threads:
+        thread.join()
+    assert execucoes == [1]
+    assert resultados == ["resultado"] * 5
+
+
+def test_coalescencia_async():
+    memo = MemoTTL()
+    execucoes = []
+
+    async def buscar(x):
+        execucoes.append(x)
+        await asyncio.sleep(0.01)
+        return x + 1
+
+    async def cenario():
+        return await asyncio.gather(*(memo.achamar("k", buscar, 1) for _ in range(4)))
+
+    assert asyncio.run(cenario()) == [2, 2, 2, 2]
+    assert execucoes == [1]
+
+
+def test_memoizar_tool_e_tools():
+    chamadas = []
+
+    def buscar_voos(destino: str) -> str:
+        chamadas.append(destino)
+        return f"voos para {destino}"
+
+    tool = Tool(name="voos", func=buscar_voos, description="busca voos")
+    memoizada = memoizar_tool(tool)
+    assert memoizada.run("Rio") == "voos para Rio"
+    assert memoizada.run("  rio ") == "voos para Rio"
+    assert chamadas == ["Rio"]
+    assert tool.func is buscar_voos  # a original não muda
+    assert memo_da_tool(memoizada).estatisticas()["acertos"] == 1
+    assert memo_da_tool(tool) is None
+
+    estruturada = StructuredTool.from_function(buscar_voos, name="voos2", description="busca voos")
+    tools = memoizar_tools([tool, estruturada], ttl=60, ttl_por_tool={"voos2": 5})
+    assert [memo_da_tool(t).ttl for t in tools] == [60, 5]
+    assert tools[1].invoke({"destino": "SP"}) == tools[1].invoke({"destino": "sp"})
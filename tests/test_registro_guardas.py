@@ -0,0 +1,35 @@
+import pytest
+
+# O import tira app/guardrailsAI do sys.path (o exemplo guardrails.py esconderia o pacote)
+registro_guardas = pytest.importorskip("registro_guardas", reason="guardrails-ai não instalado")
+
+RAIL = """
+<rail version="0.1">
+    <output>
+        <object>
+            <string name="resposta" description="A resposta"/>
+        </object>
+    </output>
+</rail>
+"""
+
+
+def test_chave_ignora_indentacao_e_depende_das_opcoes():
+    reindentado = "\n".join(linha.strip() for linha in RAIL.splitlines())
+    assert registro_guardas.chave_guarda(RAIL, {}) == registro_guardas.chave_guarda(reindentado, {})
+    assert registro_guardas.chave_guarda(RAIL, {}) != registro_guardas.chave_guarda(RAIL, {"palavroes": ["x"]})
+
+
+def test_guarda_montada_uma_vez_e_lida_do_disco(tmp_path):
+    registro = registro_guardas.RegistroGuardas(str(tmp_path))
+    guard = registro.obter(RAIL)
+    assert registro.obter(RAIL) is guard
+    outro = registro_guardas.RegistroGuardas(str(tmp_path))
+    outro.obter(RAIL)
+    assert (registro.montagens, outro.montagens, outro.leituras_disco) == (1, 0, 1)
+
+
+def test_parse_many_valida_na_ordem(tmp_path):
+    guard = registro_guardas.RegistroGuardas(str(tmp_path)).obter(RAIL)
+    resultados = registro_guardas.parse_many(guard, ['{"resposta": "tudo certo"}', '{"resposta": "que merda"}'])
+    assert [resultado.validation_passed for resultado in resultados] == [True, False]
@@ -0,0 +1,46 @@
+import os
+
+import pytest
+
+from roteador_cascata import CAMADA_CLASSIFICADOR, CAMADA_LLM, CAMADA_REGEX, ClassificadorNgramas, RoteadorCascata
+
+INTENCOES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app", "langgraph", "intencoes.tsv")
+REGRAS = {
+    "saudacao": [r"^\s*(oi+|ol[áa]|bom dia)\b"],
+    "despedida": [r"\b(tchau|at[ée] (logo|mais))\b"],
+}
+
+
+@pytest.fixture(scope="module")
+def classificador():
+    return ClassificadorNgramas.de_arquivo(INTENCOES)
+
+
+def test_regex_resolve_primeiro():
+    roteador = RoteadorCascata(REGRAS)
+    assert roteador.classificar("Oi, tudo bem?") == ("saudacao", CAMADA_REGEX, 1.0)
+    # Padrão com grupos próprios: a intenção vem do grupo externo da regra
+    assert roteador.classificar("ok, até logo") == ("despedida", CAMADA_REGEX, 1.0)
+
+
+def test_sem_camada_barata_vai_para_o_llm():
+    roteador = RoteadorCascata(REGRAS)
+    assert roteador.classificar("explique recursão") == ("pergunta", CAMADA_LLM, 0.0)
+    estatisticas = roteador.estatisticas()
+    assert estatisticas["total"] == 1
+    assert estatisticas["taxa_desvio_llm"] == 0.0
+
+
+def test_classificador_treinado_no_tsv(classificador):
+    assert set(classificador.rotulos) == {"agradecimento", "ajuda", "despedida", "pergunta", "saudacao"}
+    roteador = RoteadorCascata({}, classificador, confianca_minima=0.3)
+    intencao, camada, confianca = roteador.classificar("muito obrigado pela ajuda")
+    assert (intencao, camada) == ("agradecimento", CAMADA_CLASSIFICADOR)
+    assert confianca >= 0.3
+
+
+def test_confianca_baixa_cai_no_llm(classificador):
+    roteador = RoteadorCascata({}, classificador, confianca_minima=1.01)
+    assert roteador.classificar("obrigado")[1] == CAMADA_LLM
+    roteador.registrar_tempo_llm(0.5)
+    assert roteador.estatisticas()["camadas"][CAMADA_LLM]["latencia_media_ms"] >= 500
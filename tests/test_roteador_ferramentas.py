@@ -0,0 +1,49 @@
+import pytest
+
+from roteador_ferramentas import RoteadorFerramentas
+
+
+def ecoar(nome):
+    return lambda query, match: f"{nome}:{match.group(0)}"
+
+
+def test_primeiro_gatilho_no_texto_vence():
+    roteador = RoteadorFerramentas()
+    roteador.registrar("clima", ecoar("clima"), palavras=["previsão do tempo"])
+    roteador.registrar("calculadora", ecoar("calculadora"), padroes=[r"\d+\s*[+*/-]\s*\d+"])
+    assert roteador.rotear("quanto é 2 + 2 e a previsão do tempo?") == "calculadora:2 + 2"
+    assert roteador.rotear("previsão do tempo, e 3*4?") == "clima:previsão do tempo"
+    assert roteador.rotear("sem gatilho") is None
+    assert roteador.estatisticas()["acertos"] == {"calculadora": 1, "clima": 1}
+    assert roteador.estatisticas()["roteamentos"] == 3
+
+
+def test_empate_fica_com_a_registrada_primeiro():
+    roteador = RoteadorFerramentas()
+    roteador.registrar("primeira", ecoar("primeira"), palavras=["python"])
+    roteador.registrar("segunda", ecoar("segunda"), padroes=[r"python"])
+    assert roteador.rotear("python") == "primeira:python"
+
+
+def test_padrao_com_grupos_proprios_roteia_pelo_grupo_externo():
+    # O padrão da primeira ferramenta tem grupos internos: o roteamento usa lastgroup
+    # (grupo externo), não o último grupo com valor
+    roteador = RoteadorFerramentas()
+    roteador.registrar("soma", lambda query, match: int(match.group("a")) + int(match.group("b")),
+                       padroes=[r"(?P<a>\d+)\s*\+\s*(?P<b>\d+)"])
+    roteador.registrar("nome", lambda query, match: match.group("nome"), padroes=[r"meu nome é (?P<nome>\w+)"])
+    assert roteador.rotear("some 10 + 32") == 42
+    assert roteador.rotear("oi, meu nome é Ana") == "Ana"
+
+
+def test_ignorar_caixa():
+    roteador = RoteadorFerramentas()
+    roteador.registrar("clima", ecoar("clima"), palavras=["Tempo"], ignorar_caixa=True)
+    roteador.registrar("ajuda", ecoar("ajuda"), padroes=["ajuda"], ignorar_caixa=True)
+    assert roteador.rotear("como está o TEMPO?") == "clima:TEMPO"
+    assert roteador.rotear("AJUDA!") == "ajuda:AJUDA"
+
+
+def test_ferramenta_sem_gatilho_e_recusada():
+    with pytest.raises(ValueError):
+        RoteadorFerramentas().registrar("vazia", ecoar("vazia"))
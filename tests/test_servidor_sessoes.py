@@ -0,0 +1,79 @@
+import asyncio
+import json
+import threading
+
+from ContextEngineeringConceptv2 import ActionTools, LongTermMemory
+from servidor_sessoes import GerenciadorSessoes, ServidorSessoes
+
+
+def test_sessao_despejada_vai_para_o_disco_e_volta(tmp_path):
+    sessoes = GerenciadorSessoes(max_sessoes=2, pasta=str(tmp_path))
+    sessoes.obter("ana").store("oi, sou a ana")
+    sessoes.obter("bia")
+    sessoes.obter("caio")  # passa do limite: "ana" é a menos recente
+    assert len(sessoes) == 2
+    assert sessoes.despejos == 1
+    assert sessoes.obter("ana").history == ["oi, sou a ana"]
+
+
+def test_sem_pasta_a_sessao_despejada_e_descartada():
+    sessoes = GerenciadorSessoes(max_sessoes=1)
+    sessoes.obter("ana").store("oi")
+    sessoes.obter("bia")
+    assert sessoes.obter("ana").history == []
+
+
+def test_sessao_em_uso_nao_e_despejada(tmp_path):
+    sessoes = GerenciadorSessoes(max_sessoes=1, pasta=str(tmp_path))
+    with sessoes.usar("ana") as memoria:
+        sessoes.obter("bia")
+        assert sessoes.obter("ana") is memoria
+    assert not sessoes._travas_sessao  # a trava da sessão some quando ninguém a usa
+
+
+def test_turnos_concorrentes_nao_se_perdem(tmp_path):
+    sessoes = GerenciadorSessoes(max_sessoes=3, pasta=str(tmp_path), max_tokens=100_000)
+    servidor = ServidorSessoes(LongTermMemory(), ActionTools(), sessoes, trabalhadores=4)
+
+    def conversar(i):
+        for j in range(50):
+            servidor.responder({"sessao": f"s{(i + j) % 6}", "mensagem": f"pergunta {i}-{j}"})
+
+    threads = [threading.Thread(target=conversar, args=(i,)) for i in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    servidor.encerrar()
+
+    perguntas = 0
+    for i in range(6):
+        with sessoes.usar(f"s{i}") as memoria:
+            perguntas += sum(mensagem.startswith("pergunta") for mensagem in memoria.history)
+    assert perguntas == 6 * 50
+
+
+def test_servidor_responde_por_linha_e_isola_erros():
+    async def cenario():
+        servidor = ServidorSessoes(LongTermMemory(), ActionTools(), GerenciadorSessoes())
+        tcp = await servidor.iniciar("127.0.0.1", 0)
+        porta = tcp.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", porta)
+        respostas = []
+        for linha in [b'{"sessao": "ana", "mensagem": "O que \\u00e9 python?"}\n', b"isso nao e json\n",
+                      b'{"sessao": "ana"}\n', b'{"sessao": "ana", "mensagem": "Quanto \\u00e9 2 + 2?"}\n']:
+            writer.write(linha)
+            await writer.drain()
+            respostas.append(json.loads(await reader.readline()))
+        writer.close()
+        tcp.close()
+        await tcp.wait_closed()
+        servidor.encerrar()
+        return respostas, servidor.sessoes.obter("ana").history
+
+    respostas, historico = asyncio.run(cenario())
+    assert respostas[0] == {"sessao": "ana", "resposta": "Python é uma linguagem de programação popular."}
+    assert "Requisição inválida" in respostas[1]["erro"]
+    assert "Requisição inválida" in respostas[2]["erro"]
+    assert respostas[3]["resposta"] == "A resposta de 2 + 2 é 4."
+    assert len(historico) == 4
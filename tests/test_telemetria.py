@@ -0,0 +1,89 @@
+import json
+import time
+from typing import TypedDict
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langgraph.graph import END, START, StateGraph
+
+from shared import telemetria
+from shared.telemetria import TIPO_GRAFO, TIPO_NO, ColetorTelemetria, Histograma, _tokens_da_resposta, com_telemetria
+
+
+class Estado(TypedDict):
+    x: int
+
+
+def grafo_de_dois_nos():
+    grafo = StateGraph(Estado)
+    grafo.add_node("lento", lambda estado: time.sleep(0.02) or {"x": estado["x"] + 1})
+    grafo.add_node("rapido", lambda estado: {"x": estado["x"] * 2})
+    grafo.add_edge(START, "lento")
+    grafo.add_edge("lento", "rapido")
+    grafo.add_edge("rapido", END)
+    return grafo.compile()
+
+
+def test_histograma_e_quantis():
+    histograma = Histograma(baldes=(0.1, 1.0))
+    for valor in (0.05, 0.05, 0.5, 5.0):
+        histograma.observar(valor)
+    assert histograma.contagens == [2, 1, 1]
+    assert histograma.quantil(0.5) == 0.1
+    assert histograma.quantil(0.75) == 1.0
+    assert histograma.quantil(1.0) == float("inf")
+    assert Histograma().quantil(0.5) == 0.0
+
+
+def test_spans_por_no_e_exportacao(tmp_path):
+    coletor = ColetorTelemetria()
+    assert grafo_de_dois_nos().invoke({"x": 1}, {"callbacks": [coletor]}) == {"x": 4}
+    assert {chave for chave in coletor.histogramas if chave[0] == TIPO_NO} == {(TIPO_NO, "lento"), (TIPO_NO, "rapido")}
+    assert sum(1 for chave in coletor.histogramas if chave[0] == TIPO_GRAFO) == 1
+    assert coletor.histogramas[(TIPO_NO, "lento")].soma >= 0.02
+
+    prometheus = coletor.exportar_prometheus()
+    assert 'telemetria_span_segundos_count{tipo="no",nome="lento"} 1' in prometheus
+    assert 'le="+Inf"' in prometheus
+
+    caminho = tmp_path / "trace.json"
+    assert coletor.exportar_chrome_trace(str(caminho)) == 3
+    eventos = json.loads(caminho.read_text(encoding="utf-8"))["traceEvents"]
+    assert {evento["name"] for evento in eventos} >= {"lento", "rapido"}
+    assert "lento" in coletor.resumo()
+
+
+def test_erro_no_no_e_contado():
+    def falhar(estado):
+        raise ValueError("x")
+
+    grafo = StateGraph(Estado)
+    grafo.add_node("falha", falhar)
+    grafo.add_edge(START, "falha")
+    coletor = ColetorTelemetria()
+    try:
+        grafo.compile().invoke({"x": 1}, {"callbacks": [coletor]})
+    except ValueError:
+        pass
+    assert coletor.erros[(TIPO_NO, "falha")] == 1
+
+
+def test_tokens_da_resposta():
+    mensagem = AIMessage("oi", usage_metadata={"input_tokens": 7, "output_tokens": 3, "total_tokens": 10})
+    assert _tokens_da_resposta(LLMResult(generations=[[ChatGeneration(message=mensagem)]])) == (7, 3)
+    sem_uso = LLMResult(generations=[[]], llm_output={"token_usage": {"prompt_tokens": 2, "completion_tokens": 1}})
+    assert _tokens_da_resposta(sem_uso) == (2, 1)
+
+
+def test_desligada_nao_instrumenta(monkeypatch):
+    monkeypatch.delenv("TELEMETRIA", raising=False)
+    config = {"configurable": {"thread_id": "t"}}
+    assert com_telemetria(config) is config
+    assert telemetria.obter_callbacks() == []
+
+
+def test_ligada_acrescenta_o_coletor_do_processo(monkeypatch):
+    monkeypatch.setenv("TELEMETRIA", "1")
+    monkeypatch.setattr(telemetria, "_coletor", ColetorTelemetria())
+    config = com_telemetria({"callbacks": ["outro"]})
+    assert config["callbacks"] == ["outro", telemetria._coletor]
@@ -0,0 +1,92 @@
+import pytest
+
+from validacao_streaming import AnalisadorJSONIncremental, ValidadorPalavroes, ViolacaoStreaming, gerar_validado
+
+
+def alimentar_em_pedacos(analisador, texto, tamanho=3):
+    for i in range(0, len(texto), tamanho):
+        analisador.alimentar(texto[i:i + tamanho])
+    return analisador.finalizar()
+
+
+def test_json_valido_em_pedacos():
+    texto = '```json\n{"resposta": "ol\\u00e1 \\"mundo\\"", "nota": -1.5e2, "ok": true, "itens": [1, null]}\n```'
+    analisador = AnalisadorJSONIncremental({"resposta": str, "nota": float, "ok": bool, "itens": list})
+    assert alimentar_em_pedacos(analisador, texto) == {
+        "resposta": 'olá "mundo"', "nota": -150.0, "ok": True, "itens": [1, None],
+    }
+
+
+@pytest.mark.parametrize("texto, motivo", [
+    ('Claro! {"a": 1}', "deve ser um objeto"),
+    ('{"resposta": 1', "deveria ser str"),
+    ('{"extra": ', "campo fora do esquema"),
+    ('{"resposta": "x"} obrigado', "texto depois do JSON"),
+    ('{"ok": tru ', "valor inválido"),
+    ('{"ok": trn', "literal inválido"),
+    ('{"resposta": "x" "y"', "esperava ',' ou fechamento"),
+    ('[1]', "deve ser um objeto"),
+])
+def test_violacao_detectada_cedo(texto, motivo):
+    analisador = AnalisadorJSONIncremental({"resposta": str, "ok": bool})
+    with pytest.raises(ViolacaoStreaming, match=motivo) as erro:
+        analisador.alimentar(texto)
+    assert erro.value.posicao < len(texto)
+
+
+def test_fim_do_stream_incompleto_ou_sem_campo_obrigatorio():
+    with pytest.raises(ViolacaoStreaming, match="incompleto"):
+        alimentar_em_pedacos(AnalisadorJSONIncremental(), '{"a": [1, 2')
+    with pytest.raises(ViolacaoStreaming, match="ausentes: nota"):
+        alimentar_em_pedacos(AnalisadorJSONIncremental({"resposta": str, "nota": int}), '{"resposta": "x"}')
+
+
+def test_palavrao_em_texto_parcial_so_com_a_palavra_terminada():
+    validador = ValidadorPalavroes()
+    validador(("resposta",), "isso é uma merd", False)  # ainda pode ser outra palavra
+    with pytest.raises(ViolacaoStreaming, match="resposta"):
+        validador(("resposta",), "isso é uma merda ", False)
+    with pytest.raises(ViolacaoStreaming):
+        validador(("resposta",), "MERDA", True)
+
+
+class Stream:
+    def __init__(self, pedacos):
+        self.pedacos = pedacos
+        self.lidos = 0
+        self.fechado = False
+
+    def __iter__(self):
+        for pedaco in self.pedacos:
+            self.lidos += 1
+            yield pedaco
+
+    def close(self):
+        self.fechado = True
+
+
+def test_stream_interrompido_na_violacao_e_reask():
+    streams = [
+        Stream(['{"resposta": "que ', 'merda ', 'de pergunta', ' longa demais"}']),
+        Stream(['{"resposta": ', '"tudo bem"}']),
+    ]
+    pedidos = []
+
+    def abrir_stream(mensagens):
+        pedidos.append(list(mensagens))
+        return streams[len(pedidos) - 1]
+
+    resultado = gerar_validado(abrir_stream, [{"role": "user", "content": "oi"}], {"resposta": str},
+                               validadores=[ValidadorPalavroes()])
+    assert resultado["valido"] and resultado["saida"] == {"resposta": "tudo bem"}
+    assert resultado["tentativas"] == 2
+    assert streams[0].lidos == 2 and streams[0].fechado
+    assert resultado["pedacos_descartados"] == 2
+    assert "palavra proibida" in pedidos[1][-1]["content"]
+
+
+def test_sem_reask_devolve_invalido():
+    resultado = gerar_validado(lambda mensagens: Stream(["nada de json"]), [], {"resposta": str}, reask=False)
+    assert not resultado["valido"]
+    assert resultado["saida"] is None
+    assert len(resultado["violacoes"]) == 1